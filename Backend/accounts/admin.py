@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
-from .models import User, Department, Doctor, Appointment
+from .models import User, Department, Doctor, Appointment, DoctorAvailability, AvailabilityException
 
 
 class CustomUserCreationForm(UserCreationForm):
@@ -82,3 +82,5 @@ admin.site.register(User, UserAdmin)
 admin.site.register(Department)
 admin.site.register(Doctor)
 admin.site.register(Appointment)
+admin.site.register(DoctorAvailability)
+admin.site.register(AvailabilityException)
@@ -0,0 +1,109 @@
+# accounts/analytics.py
+from datetime import timedelta
+
+from django.db.models import Count, DateField, F, Q, Sum
+from django.db.models.functions import Trunc
+
+from .exports import day_range
+from .models import Appointment, AppointmentDailyRollup
+
+GRANULARITIES = ["day", "week", "month"]
+MAX_BUCKETS = 400
+
+# Dimension -> [(output key, rollup field, appointment field)]. A rollup field of
+# None means the rollups do not carry it and the Appointment table is queried.
+DIMENSIONS = {
+    "department": [("department", "department__name", "doctor__department__name")],
+    "doctor": [("doctor_id", None, "doctor_id"), ("doctor", None, "doctor__name")],
+    "status": [("status", "status", "status")],
+}
+
+
+# -------------------- BUCKETS --------------------
+
+def bucket_start(day, granularity):
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, granularity):
+    if granularity == "week":
+        return start + timedelta(days=7)
+    if granularity == "month":
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def buckets(start, end, granularity):
+    """Every bucket start from the one holding `start` through the one holding `end`."""
+    current = bucket_start(start, granularity)
+    periods = []
+    while current <= end:
+        periods.append(current)
+        current = next_bucket(current, granularity)
+    return periods
+
+
+# -------------------- QUERY --------------------
+
+def grouped_rows(start, end, granularity, group_by):
+    """
+    One grouped query returning (period, *dimensions, count, revenue) rows.
+
+    Department and status groupings read the daily rollups; grouping by doctor
+    needs the Appointment table. Either way periods follow the booking date
+    (created_at), like admin_stats, and revenue only counts paid appointments.
+    """
+    columns = [column for dimension in group_by for column in DIMENSIONS[dimension]]
+    paid = Q(status="paid")
+
+    if all(rollup_field for _, rollup_field, _ in columns):
+        queryset = AppointmentDailyRollup.objects.filter(day__gte=start, day__lte=end)
+        period = F("day") if granularity == "day" else Trunc("day", granularity, output_field=DateField())
+        fields = {key: F(rollup_field) for key, rollup_field, _ in columns}
+        totals = {"n": Sum("count"), "paid_revenue": Sum("revenue", filter=paid)}
+    else:
+        lower, upper = day_range(start, end)
+        queryset = Appointment.objects.filter(created_at__gte=lower, created_at__lt=upper)
+        period = Trunc("created_at", granularity, output_field=DateField())
+        fields = {key: F(appointment_field) for key, _, appointment_field in columns}
+        totals = {"n": Count("id"), "paid_revenue": Sum("amount", filter=paid)}
+
+    return (
+        queryset.annotate(period=period, **{f"group_{key}": value for key, value in fields.items()})
+        .values("period", *(f"group_{key}" for key in fields))
+        .annotate(**totals)
+        .order_by()
+    ), list(fields)
+
+
+def time_series(start, end, granularity="month", group_by=()):
+    """
+    Appointment counts and paid revenue per period between `start` and `end`
+    (inclusive dates), one series per combination of the `group_by`
+    dimensions, with empty periods filled with zeros.
+    """
+    rows, keys = grouped_rows(start, end, granularity, group_by)
+    periods = buckets(start, end, granularity)
+
+    series = {}
+    for row in rows:
+        group = tuple(row[f"group_{key}"] for key in keys)
+        series.setdefault(group, {})[row["period"]] = (row["n"] or 0, row["paid_revenue"] or 0)
+    if not keys and not series:
+        series[()] = {}
+
+    result = []
+    for group in sorted(series, key=lambda values: [str(value) for value in values]):
+        values = series[group]
+        result.append({
+            **dict(zip(keys, group)),
+            "points": [
+                {"period": period, "count": values.get(period, (0, 0))[0], "revenue": float(values.get(period, (0, 0))[1])}
+                for period in periods
+            ],
+        })
+    return result
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from django.core import checks
+
+        from backend.db_routers import check_sticky_cache
+
+        from . import metrics, signals  # noqa: F401
+        metrics.install()
+        checks.register(check_sticky_cache, checks.Tags.caches)
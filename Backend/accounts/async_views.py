@@ -0,0 +1,169 @@
+# accounts/async_views.py
+from functools import wraps
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import exceptions
+from rest_framework.request import Request
+
+from backend.db_routers import primary_reads
+
+from .authentication import CachedJWTAuthentication
+from .caching import acatalog_version, catalog_cache_key, catalog_entry, etag_matches
+from .metrics import serializing
+from .models import Appointment, Doctor
+from .pagination import KeysetPagination
+from .projections import AppointmentProjection, DoctorProjection
+from .renderers import FastJSONRenderer
+from .serializers import AdminStatsSerializer
+from .stats import aadmin_stats_payload
+
+# Async versions of the hot read endpoints. Under ASGI (backend/asgi.py sets
+# ASYNC_READ_VIEWS) accounts/urls.py routes the same paths, under the same
+# names, to read_or(): GETs are answered here, everything else by the DRF view.
+# They answer like their DRF views: same JSON, cursors, catalog cache, ETags and
+# auth errors, but every query goes through the async ORM so a slow client or
+# a slow query never holds a worker thread.
+
+renderer = FastJSONRenderer()
+doctor_projection = DoctorProjection()
+appointment_projection = AppointmentProjection()
+
+
+def render(data, status=200, headers=None):
+    return HttpResponse(renderer.render(data), status=status, content_type="application/json", headers=headers)
+
+
+def error(exc):
+    headers = {"WWW-Authenticate": 'Bearer realm="api"'} if exc.status_code == 401 else None
+    return render(exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail}, exc.status_code, headers)
+
+
+def read_or(view, fallback):
+    """
+    `view` for the GETs it answers; `fallback`, the DRF view on the same path,
+    for writes, HEAD and OPTIONS, ?format= and the browsable API. The DRF view
+    stays reachable as `.sync_view`, for callers that dispatch synchronously
+    (accounts/batch.py).
+    """
+    sync_view, fallback = fallback, sync_to_async(fallback)
+
+    @csrf_exempt  # as DRF's views are; its authentication enforces CSRF itself
+    @wraps(view)
+    async def dispatch(request, *args, **kwargs):
+        browsable = "text/html" in request.headers.get("Accept", "")
+        if request.method == "GET" and "format" not in request.GET and not browsable:
+            return await view(request, *args, **kwargs)
+        return await fallback(request, *args, **kwargs)
+    dispatch.sync_view = sync_view
+    return dispatch
+
+
+def api_errors(view):
+    """Answer DRF APIExceptions (auth, permissions, 404s, bad cursors) the way DRF's handler would."""
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            return await view(request, *args, **kwargs)
+        except exceptions.APIException as exc:
+            return error(exc)
+    return wrapper
+
+
+async def authenticated_user(request):
+    """Return the JWT user for `request`, or raise NotAuthenticated / AuthenticationFailed."""
+    result = await CachedJWTAuthentication().aauthenticate(request)
+    if result is None:
+        raise exceptions.NotAuthenticated()
+    request.user = result[0]  # as DRF does; replica routing keys stickiness on it
+    return result[0]
+
+
+def requested(projection, request):
+    """`projection` narrowed to the request's ?fields= and ?expand=."""
+    return projection.select(request.GET.get("fields"), request.GET.get("expand"))
+
+
+async def page_or_list(request, queryset, projection, cursor_ordering):
+    """Project `queryset` as one KeysetPagination page, or whole with ?paginate=false."""
+    projection = requested(projection, request)
+    queryset = projection.values(queryset, cursor_ordering)
+    paginator = KeysetPagination()
+    page = await paginator.apaginate_queryset(
+        queryset, Request(request), view=SimpleNamespace(cursor_ordering=cursor_ordering)
+    )
+    if page is None:
+        page = [row async for row in queryset]
+        with serializing():
+            return projection.many(page)
+    with serializing():
+        return paginator.get_paginated_response(projection.many(page)).data
+
+
+async def cached_catalog(request, build):
+    """CachedCatalogMixin.cached_response for async views; `build` returns the response data."""
+    key = catalog_cache_key(request, await acatalog_version(), renderer.format)
+    entry = await cache.aget(key)
+    if entry is None:
+        with primary_reads():
+            entry = catalog_entry(await build(), renderer.format)
+        await cache.aset(key, entry, getattr(settings, "CATALOG_CACHE_TIMEOUT", 300))
+
+    headers = {"ETag": entry["etag"], "Vary": "Accept"}
+    if etag_matches(request, entry["etag"]):
+        return HttpResponse(status=304, headers=headers)
+    return render(entry["data"], headers=headers)
+
+
+# -------------------- DOCTORS --------------------
+
+@api_errors
+async def doctor_list(request):
+    async def build():
+        queryset = Doctor.objects.order_by("id")
+        department_name = request.GET.get("department")
+        if department_name:
+            queryset = queryset.filter(department__name__iexact=department_name)
+        return await page_or_list(request, queryset, doctor_projection, ("id",))
+
+    return await cached_catalog(request, build)
+
+
+@api_errors
+async def doctor_detail(request, pk):
+    async def build():
+        projection = requested(doctor_projection, request)
+        doctor = await projection.values(Doctor.objects.filter(pk=pk)).afirst()
+        if doctor is None:
+            raise exceptions.NotFound("No Doctor matches the given query.")
+        with serializing():
+            return projection.represent(doctor)
+
+    return await cached_catalog(request, build)
+
+
+# -------------------- APPOINTMENTS --------------------
+
+@api_errors
+async def appointment_list(request):
+    user = await authenticated_user(request)
+
+    queryset = Appointment.objects.order_by("-created_at", "-id")
+    if not (user.is_staff or user.is_superuser):
+        queryset = queryset.filter(patient=user)
+    return render(await page_or_list(request, queryset, appointment_projection, ("-created_at", "-id")))
+
+
+# -------------------- ADMIN STATS --------------------
+
+@api_errors
+async def admin_stats(request):
+    user = await authenticated_user(request)
+    if not (user.is_staff or user.is_superuser):
+        raise exceptions.PermissionDenied()
+
+    return render(AdminStatsSerializer(await aadmin_stats_payload()).data)
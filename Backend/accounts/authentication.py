@@ -0,0 +1,76 @@
+# accounts/authentication.py
+from contextvars import ContextVar
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .caching import AUTH_USER_FIELDS, acached_user, cached_user
+
+# The (user, token) a batch request (accounts/batch.py) authenticated with,
+# while it runs its sub-requests: they reuse it instead of decoding the JWT and
+# looking the user up again.
+batch_credentials = ContextVar("batch_credentials", default=None)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the token's user through the auth user
+    cache instead of querying the users table on every request.
+
+    Saving or deleting a user (password changes and deactivation included)
+    invalidates the entry, see accounts/signals.py. aauthenticate() does the
+    same for the async views.
+    """
+
+    def authenticate(self, request):
+        credentials = batch_credentials.get()
+        if credentials is not None:
+            return credentials
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        user_id = self.get_user_id(validated_token)
+        user = cached_user(user_id, lambda: self.user_queryset(user_id).first())
+        return self.check_user(user, validated_token)
+
+    async def aauthenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+
+        user_id = self.get_user_id(validated_token)
+        user = await acached_user(user_id, lambda: self.user_queryset(user_id).afirst())
+        return self.check_user(user, validated_token), validated_token
+
+    def user_queryset(self, user_id):
+        return self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).only(
+            *AUTH_USER_FIELDS, "password"
+        )
+
+    def get_user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    def check_user(self, user, validated_token):
+        if user is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # Cached users carry only a digest of the hash (accounts/caching.py).
+            digest = getattr(user, "password_digest", None) or get_md5_hash_password(user.password)
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != digest:
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
@@ -0,0 +1,91 @@
+# accounts/availability.py
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+
+from .models import Appointment, AvailabilityException, DoctorAvailability
+
+MAX_SEARCH_DAYS = 31
+
+
+def _aware(day, at):
+    return timezone.make_aware(datetime.combine(day, at))
+
+
+def merge_intervals(intervals):
+    """Merge overlapping (start, end) intervals into a sorted, disjoint list."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _overlaps(merged, starts, ends, slot_start, slot_end):
+    i = bisect_right(ends, slot_start)
+    return i < len(merged) and starts[i] < slot_end
+
+
+def open_slots(doctor_ids, start_date, end_date, now=None):
+    """
+    Return {doctor_id: [(slot_start, slot_end), ...]} for every open slot between
+    start_date and end_date inclusive.
+
+    Runs three queries whatever the range: the weekly windows, the exceptions
+    and the booked appointments. Everything else is merged in memory.
+    """
+    now = now or timezone.now()
+    range_start = _aware(start_date, time.min)
+    range_end = _aware(end_date + timedelta(days=1), time.min)
+
+    windows = defaultdict(lambda: defaultdict(list))
+    for window in DoctorAvailability.objects.filter(doctor_id__in=doctor_ids):
+        windows[window.doctor_id][window.weekday].append(window)
+
+    blocked = defaultdict(list)
+    exceptions = AvailabilityException.objects.filter(doctor_id__in=doctor_ids, date__range=(start_date, end_date))
+    for exception in exceptions:
+        start = _aware(exception.date, exception.start_time or time.min)
+        if exception.end_time:
+            end = _aware(exception.date, exception.end_time)
+        else:
+            end = _aware(exception.date + timedelta(days=1), time.min)
+        blocked[exception.doctor_id].append((start, end))
+
+    booked = defaultdict(list)
+    appointments = (
+        Appointment.objects.filter(doctor_id__in=doctor_ids, date_time__gte=range_start, date_time__lt=range_end)
+        .exclude(status="cancelled")
+        .values_list("doctor_id", "date_time")
+    )
+    for doctor_id, date_time in appointments:
+        booked[doctor_id].append(date_time)
+
+    result = {}
+    for doctor_id in doctor_ids:
+        merged = merge_intervals(blocked[doctor_id])
+        starts = [start for start, _ in merged]
+        ends = [end for _, end in merged]
+        taken = sorted(booked[doctor_id])
+
+        slots = []
+        day = start_date
+        while day <= end_date:
+            for window in sorted(windows[doctor_id][day.weekday()], key=lambda w: w.start_time):
+                step = timedelta(minutes=window.slot_minutes)
+                slot_start = _aware(day, window.start_time)
+                window_end = _aware(day, window.end_time)
+                while slot_start + step <= window_end:
+                    slot_end = slot_start + step
+                    j = bisect_left(taken, slot_start)
+                    is_booked = j < len(taken) and taken[j] < slot_end
+                    if slot_start > now and not is_booked and not _overlaps(merged, starts, ends, slot_start, slot_end):
+                        slots.append((slot_start, slot_end))
+                    slot_start = slot_end
+            day += timedelta(days=1)
+        result[doctor_id] = slots
+    return result
@@ -5,14 +5,24 @@ from django.contrib.auth import get_user_model
 User = get_user_model()
 
 class EmailBackend(ModelBackend):
+    """
+    The only authentication backend: email login, case-insensitive.
+
+    Every attempt costs exactly one password hash. Unknown emails hash a
+    throwaway password so they take as long as a wrong password, and
+    check_password() rehashes stored hashes whose hasher or cost is out of date.
+    """
+
     def authenticate(self, request, username=None, password=None, **kwargs):
         email = username or kwargs.get("email")
         if email is None or password is None:
             return None
+
         try:
-            user = User.objects.get(email=email)
+            user = User.objects.get_by_email(email)
         except User.DoesNotExist:
+            User().set_password(password)
             return None
-        if user.check_password(password):
+        if user.check_password(password) and self.user_can_authenticate(user):
             return user
         return None
@@ -0,0 +1,151 @@
+# accounts/batch.py
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from io import BytesIO
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import close_old_connections, connection
+from django.urls import Resolver404, resolve, reverse
+
+from .authentication import batch_credentials
+
+logger = logging.getLogger(__name__)
+
+# POST /accounts/batch/ runs several API calls in one round trip, under the one
+# authentication of the batch request itself:
+#
+#   {"requests": [{"method": "GET", "path": "/doctors/?paginate=false"},
+#                 {"method": "DELETE", "path": "/appointments/7/"}]}
+#
+#   -> {"responses": [{"status": 200, "body": [...]}, {"status": 204, "body": null}]}
+#
+# Paths are relative to /accounts/, as in the frontend's apiFetch(). Responses
+# come back in request order. Requests also run in order, except that each run
+# of consecutive GETs runs concurrently, on a per-process pool of
+# BATCH_MAX_CONCURRENCY threads; a write therefore sees every request before it
+# and none after it.
+
+BATCH_MAX_CONCURRENCY = getattr(settings, "BATCH_MAX_CONCURRENCY", 4)
+
+executor = None
+executor_lock = threading.Lock()
+
+# Passed on from the batch request so sub-requests see the same client (for
+# throttling, absolute URLs and host validation).
+FORWARDED_META = (
+    "REMOTE_ADDR", "SERVER_NAME", "SERVER_PORT", "HTTP_HOST", "HTTP_X_FORWARDED_FOR", "HTTP_X_FORWARDED_PROTO",
+    "HTTP_USER_AGENT", "HTTP_ACCEPT_LANGUAGE",
+)
+
+
+def failure(status, detail):
+    return {"status": status, "body": {"detail": detail}}
+
+
+def api_root():
+    return reverse("batch").removesuffix("batch/")
+
+
+def sub_request(request, method, path, query, body):
+    """A WSGIRequest for one batch item, from the batch request's client."""
+    payload = b"" if body is None else json.dumps(body).encode()
+    environ = {key: request.META[key] for key in FORWARDED_META if key in request.META}
+    environ.update({
+        "REQUEST_METHOD": method,
+        "SCRIPT_NAME": "",
+        "PATH_INFO": path,
+        "QUERY_STRING": query,
+        "CONTENT_TYPE": "application/json",
+        "CONTENT_LENGTH": str(len(payload)),
+        "HTTP_ACCEPT": "application/json, */*;q=0.1",
+        "wsgi.input": BytesIO(payload),
+        "wsgi.url_scheme": request.scheme,
+    })
+    return WSGIRequest(environ)
+
+
+def dispatch(request, item):
+    """Run one batch item through its view and return its {"status", "body"}."""
+    path, _, query = item["path"].partition("?")
+    path = api_root() + path.lstrip("/")
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return failure(404, "Not found.")
+    # Under ASGI the hot reads resolve to async_views.read_or() dispatchers;
+    # their DRF view answers here, as it does for other methods and formats.
+    view = getattr(match.func, "sync_view", match.func)
+    if match.url_name == "batch" or iscoroutinefunction(view):
+        return failure(400, f"{item['path']} cannot be batched.")
+
+    sub = sub_request(request, item["method"], path, query, item.get("body"))
+    sub.resolver_match = match
+    try:
+        response = view(sub, *match.args, **match.kwargs)
+    except Exception:
+        logger.exception("Batch item %s %s failed", item["method"], item["path"])
+        return failure(500, "Internal server error.")
+
+    if response.streaming:
+        response.close()
+        return failure(400, f"{item['path']} streams its response and cannot be batched.")
+    if hasattr(response, "data"):
+        body = response.data
+    else:
+        try:
+            body = json.loads(response.content) if response.content else None
+        except ValueError:
+            body = response.content.decode(response.charset, "replace")
+    return {"status": response.status_code, "body": body}
+
+
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=BATCH_MAX_CONCURRENCY, thread_name_prefix="batch")
+        return executor
+
+
+def dispatch_in_thread(request, item):
+    # Pool threads keep their connections between items the way request
+    # threads do, so they close them on the same terms (CONN_MAX_AGE, errors).
+    close_old_connections()
+    try:
+        return dispatch(request, item)
+    finally:
+        close_old_connections()
+
+
+def dispatch_concurrently(request, items):
+    if len(items) < 2 or BATCH_MAX_CONCURRENCY < 2 or connection.in_atomic_block:
+        # Inside a transaction other threads' connections could not see its
+        # uncommitted writes, so everything stays on this one.
+        return [dispatch(request, item) for item in items]
+    # Each item runs in a copy of this context: it keeps the batch's
+    # credentials, replica routing and metrics.
+    futures = [get_executor().submit(copy_context().run, dispatch_in_thread, request, item) for item in items]
+    return [future.result() for future in futures]
+
+
+def run_batch(request, items):
+    """Dispatch `items` (validated BatchSerializer requests) as `request`'s user; one result per item."""
+    token = batch_credentials.set((request.user, request.auth))
+    try:
+        results, reads = [], []
+        for item in items:
+            if item["method"] == "GET":
+                reads.append(item)
+                continue
+            results.extend(dispatch_concurrently(request, reads))
+            reads = []
+            results.append(dispatch(request, item))
+        results.extend(dispatch_concurrently(request, reads))
+        return results
+    finally:
+        batch_credentials.reset(token)
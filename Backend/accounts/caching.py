@@ -0,0 +1,189 @@
+# accounts/caching.py
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import DEFERRED
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from backend.db_routers import primary_reads
+
+from .renderers import FastJSONRenderer
+
+CATALOG_VERSION_KEY = "doctor_catalog:version"
+AUTH_USER_KEY = "auth_user:{}"
+AUTH_USER_VERSION_KEY = "auth_user:{}:version"
+
+
+# -------------------- CATALOG VERSION --------------------
+
+def catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+async def acatalog_version():
+    version = await cache.aget(CATALOG_VERSION_KEY)
+    if version is None:
+        await cache.aadd(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = await cache.aget(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    # A fresh timestamp rather than incr(): if the key is evicted we must never
+    # fall back to a version that older cache entries were stored under.
+    cache.set(CATALOG_VERSION_KEY, time.time_ns(), None)
+
+
+# -------------------- AUTHENTICATED USERS --------------------
+
+# What authentication and permission checks read. Nothing else is cached: no
+# password hash (only a digest of it, for token revocation) and no profile
+# columns, which load from the database on first access.
+AUTH_USER_FIELDS = ("id", "email", "is_active", "is_staff", "is_superuser")
+
+
+def user_snapshot(user):
+    """The cacheable part of `user`: AUTH_USER_FIELDS and a digest of the password hash."""
+    snapshot = {field: getattr(user, field) for field in AUTH_USER_FIELDS}
+    snapshot["password_digest"] = get_md5_hash_password(user.password)
+    return snapshot
+
+
+def snapshot_user(snapshot):
+    """
+    A fresh User with only the snapshot's fields loaded; the rest are deferred.
+
+    Request code gets its own instance, never one shared through the cache,
+    but its fields may be up to AUTH_USER_CACHE_TIMEOUT old: write paths must
+    reload the user from the database before saving it.
+    """
+    User = get_user_model()
+    values = [
+        snapshot[field.attname] if field.attname in AUTH_USER_FIELDS else DEFERRED
+        for field in User._meta.concrete_fields
+    ]
+    user = User.from_db(DEFAULT_DB_ALIAS, AUTH_USER_FIELDS, values)
+    user.password_digest = snapshot["password_digest"]
+    return user
+
+
+def cached_user(user_id, load):
+    """
+    Return the user with `user_id` as a snapshot_user(), calling `load()` only
+    on a cache miss.
+
+    Entries are stamped with the user's auth version and both keys are read in
+    one round trip, so a load that races with invalidate_cached_user() is
+    stored under a stale version and never served. `load()` reads the primary:
+    a replica could still return the row from before the invalidating write.
+    """
+    entry_key, version_key = AUTH_USER_KEY.format(user_id), AUTH_USER_VERSION_KEY.format(user_id)
+    found = cache.get_many([entry_key, version_key])
+    version, entry = found.get(version_key), found.get(entry_key)
+    if version is not None and entry is not None and entry["version"] == version:
+        return snapshot_user(entry["user"])
+
+    if version is None:
+        cache.add(version_key, time.time_ns(), None)
+        version = cache.get(version_key)
+    with primary_reads():
+        user = load()
+    if user is None:
+        return None
+    snapshot = user_snapshot(user)
+    cache.set(entry_key, {"version": version, "user": snapshot}, settings.AUTH_USER_CACHE_TIMEOUT)
+    return snapshot_user(snapshot)
+
+
+async def acached_user(user_id, load):
+    """cached_user() for async views; `load` is a coroutine function."""
+    entry_key, version_key = AUTH_USER_KEY.format(user_id), AUTH_USER_VERSION_KEY.format(user_id)
+    found = await cache.aget_many([entry_key, version_key])
+    version, entry = found.get(version_key), found.get(entry_key)
+    if version is not None and entry is not None and entry["version"] == version:
+        return snapshot_user(entry["user"])
+
+    if version is None:
+        await cache.aadd(version_key, time.time_ns(), None)
+        version = await cache.aget(version_key)
+    with primary_reads():
+        user = await load()
+    if user is None:
+        return None
+    snapshot = user_snapshot(user)
+    await cache.aset(entry_key, {"version": version, "user": snapshot}, settings.AUTH_USER_CACHE_TIMEOUT)
+    return snapshot_user(snapshot)
+
+
+def invalidate_cached_user(user_id):
+    cache.set(AUTH_USER_VERSION_KEY.format(user_id), time.time_ns(), None)
+    cache.delete(AUTH_USER_KEY.format(user_id))
+
+
+# -------------------- CONDITIONAL GET --------------------
+
+def etag_matches(request, etag):
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    # Weak comparison: compressed responses carry the ETag as W/"...".
+    candidates = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in candidates or etag.removeprefix("W/") in candidates
+
+
+def catalog_cache_key(request, version, format):
+    path = f"{request.get_host()}{request.get_full_path()}"
+    return f"doctor_catalog:{version}:{format}:{hashlib.sha1(path.encode()).hexdigest()}"
+
+
+def catalog_entry(data, format):
+    """
+    The cached data and its ETag. `format` is the negotiated renderer's: the
+    JSON and the browsable API's HTML of the same data are different
+    representations and must not validate each other.
+    """
+    body = FastJSONRenderer().render(data)
+    return {"data": data, "etag": f'"{hashlib.sha256(format.encode() + b":" + body).hexdigest()[:32]}"'}
+
+
+class CachedCatalogMixin:
+    """
+    Read-through cache for list/retrieve on a public catalog viewset.
+
+    Entries are keyed by the catalog version, so any Doctor or Department
+    write (see accounts/signals.py) makes every cached response unreachable.
+    Entries are built from the primary, never a possibly lagging replica.
+    Responses carry a strong ETag and honour If-None-Match with a 304.
+    """
+    catalog_cache_timeout = getattr(settings, "CATALOG_CACHE_TIMEOUT", 300)
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(CachedCatalogMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, lambda: super(CachedCatalogMixin, self).retrieve(request, *args, **kwargs))
+
+    def cached_response(self, request, build):
+        format = request.accepted_renderer.format
+        key = catalog_cache_key(request, catalog_version(), format)
+
+        entry = cache.get(key)
+        if entry is None:
+            with primary_reads():
+                entry = catalog_entry(build().data, format)
+            cache.set(key, entry, self.catalog_cache_timeout)
+
+        headers = {"ETag": entry["etag"], "Vary": "Accept"}
+        if etag_matches(request, entry["etag"]):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(entry["data"], headers=headers)
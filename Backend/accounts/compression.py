@@ -0,0 +1,108 @@
+# accounts/compression.py
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # optional: without it responses are only gzipped
+    brotli = None
+
+# Text formats worth compressing; images and other binary bodies are not.
+COMPRESSIBLE_TYPES = (
+    "application/json", "application/x-ndjson", "application/javascript", "application/xml", "image/svg+xml", "text/",
+)
+
+
+def accepted_encodings(header):
+    """{coding: q} from an Accept-Encoding header."""
+    weights = {}
+    for item in header.split(","):
+        coding, *params = item.split(";")
+        weight = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name.lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        if coding.strip():
+            weights[coding.strip().lower()] = weight
+    return weights
+
+
+def negotiate_encoding(header):
+    """The coding to answer with: "br" or "gzip", whichever the client weighs higher (br on a tie), or None."""
+    weights = accepted_encodings(header)
+    chosen, best = None, 0.0
+    for coding in ("br", "gzip") if brotli else ("gzip",):
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best:
+            chosen, best = coding, weight
+    return chosen
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compress text responses of at least COMPRESS_MIN_BYTES with brotli or gzip,
+    as negotiated from Accept-Encoding.
+
+    gzip is GZipMiddleware's, with its BREACH mitigation; brotli needs the
+    `brotli` package and uses COMPRESS_BROTLI_QUALITY, a level meant for
+    compressing on every request rather than ahead of time.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_bytes = getattr(settings, "COMPRESS_MIN_BYTES", 1024)
+        self.brotli_quality = getattr(settings, "COMPRESS_BROTLI_QUALITY", 5)
+
+    def process_response(self, request, response):
+        if not response.streaming and len(response.content) < self.min_bytes:
+            return response
+        if response.has_header("Content-Encoding") or not response.get("Content-Type", "").startswith(
+            COMPRESSIBLE_TYPES
+        ):
+            return response
+
+        encoding = negotiate_encoding(request.headers.get("Accept-Encoding", ""))
+        if encoding == "gzip":
+            return super().process_response(request, response)
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self.brotli_stream(response)
+            del response.headers["Content-Length"]
+        else:
+            compressed = brotli.compress(response.content, quality=self.brotli_quality)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        # As GZipMiddleware: the compressed body is no longer byte-identical.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+        return response
+
+    def brotli_stream(self, response):
+        content = response.streaming_content
+        compressor = brotli.Compressor(quality=self.brotli_quality)
+        if response.is_async:
+            async def compress():
+                async for chunk in content:
+                    if data := compressor.process(chunk):
+                        yield data
+                yield compressor.finish()
+        else:
+            def compress():
+                for chunk in content:
+                    if data := compressor.process(chunk):
+                        yield data
+                yield compressor.finish()
+        return compress()
@@ -0,0 +1,187 @@
+# accounts/exports.py
+import csv
+import io
+import json
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.renderers import BaseRenderer
+
+from .models import Appointment, User
+
+# Rows fetched per database round trip, and rows per chunk written to the socket.
+EXPORT_CHUNK_SIZE = getattr(settings, "EXPORT_CHUNK_SIZE", 2000)
+ROWS_PER_WRITE = 500
+
+APPOINTMENT_COLUMNS = [
+    ("id", "id"),
+    ("date_time", "date_time"),
+    ("status", "status"),
+    ("amount", "amount"),
+    ("payment_id", "payment_id"),
+    ("payment_status", "payment_status"),
+    ("created_at", "created_at"),
+    ("doctor_id", "doctor_id"),
+    ("doctor_name", "doctor__name"),
+    ("department", "doctor__department__name"),
+    ("patient_id", "patient_id"),
+    ("patient_email", "patient__email"),
+    ("patient_first_name", "patient__first_name"),
+    ("patient_last_name", "patient__last_name"),
+]
+
+USER_COLUMNS = [
+    ("id", "id"),
+    ("email", "email"),
+    ("first_name", "first_name"),
+    ("last_name", "last_name"),
+    ("is_active", "is_active"),
+    ("is_staff", "is_staff"),
+    ("is_patient", "is_patient"),
+    ("is_doctor", "is_doctor"),
+    ("is_verified", "is_verified"),
+    ("date_joined", "date_joined"),
+    ("last_login", "last_login"),
+]
+
+USER_STATUSES = {
+    "active": {"is_active": True},
+    "inactive": {"is_active": False},
+}
+
+
+# -------------------- RENDERERS --------------------
+# Export actions stream their own response; these only drive content
+# negotiation (?format=csv|ndjson or the Accept header) and render errors.
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if not isinstance(data, dict):
+            data = {"detail": data}
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(data.keys())
+        writer.writerow(data.values())
+        return buffer.getvalue().encode(self.charset)
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return (json.dumps(data, cls=DjangoJSONEncoder) + "\n").encode(self.charset)
+
+
+EXPORT_RENDERERS = [CSVRenderer, NDJSONRenderer]
+
+
+# -------------------- QUERIES --------------------
+
+def day_range(start, end):
+    """Aware [start 00:00, day after end 00:00) bounds, so range filters stay index-friendly."""
+    tz = timezone.get_current_timezone()
+    lower = timezone.make_aware(datetime.combine(start, time.min), tz) if start else None
+    upper = timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min), tz) if end else None
+    return lower, upper
+
+
+def appointment_rows(start=None, end=None, status=None):
+    queryset = Appointment.objects.order_by("id")
+    lower, upper = day_range(start, end)
+    if lower:
+        queryset = queryset.filter(date_time__gte=lower)
+    if upper:
+        queryset = queryset.filter(date_time__lt=upper)
+    if status:
+        queryset = queryset.filter(status__in=status)
+    return queryset.values_list(*(field for _, field in APPOINTMENT_COLUMNS))
+
+
+def user_rows(start=None, end=None, status=None):
+    queryset = User.objects.order_by("id")
+    lower, upper = day_range(start, end)
+    if lower:
+        queryset = queryset.filter(date_joined__gte=lower)
+    if upper:
+        queryset = queryset.filter(date_joined__lt=upper)
+    if status and set(status) != set(USER_STATUSES):
+        for name in status:
+            queryset = queryset.filter(**USER_STATUSES[name])
+    return queryset.values_list(*(field for _, field in USER_COLUMNS))
+
+
+# -------------------- STREAMING --------------------
+
+# Spreadsheets run a cell starting with one of these as a formula, so a name
+# like "=HYPERLINK(...)" typed at registration would run on the admin's machine
+# (CSV injection). Such text is exported with a leading apostrophe instead.
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _cell(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return "" if value is None else value
+
+
+def stream_csv(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([name for name, _ in columns])
+    for i, row in enumerate(rows, 1):
+        writer.writerow([_cell(value) for value in row])
+        if i % ROWS_PER_WRITE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def stream_ndjson(columns, rows):
+    names = [name for name, _ in columns]
+    encoder = DjangoJSONEncoder()
+    lines = []
+    for row in rows:
+        lines.append(encoder.encode(dict(zip(names, row))))
+        if len(lines) == ROWS_PER_WRITE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+def export_response(fmt, name, columns, queryset):
+    """
+    Stream `queryset` (a values_list matching `columns`) as CSV or NDJSON.
+
+    .iterator() fetches EXPORT_CHUNK_SIZE rows at a time (a server-side cursor
+    on PostgreSQL) and rows are written as they arrive, so memory stays flat
+    however large the export is.
+
+    Not under DB_POOL_MODE=pgbouncer: server-side cursors are disabled there
+    (backend/database.py), so the driver receives the whole result set before
+    the first row is written, and memory grows with the export's size.
+    """
+    rows = queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    if fmt == "ndjson":
+        response = StreamingHttpResponse(stream_ndjson(columns, rows), content_type="application/x-ndjson")
+    else:
+        response = StreamingHttpResponse(stream_csv(columns, rows), content_type="text/csv; charset=utf-8")
+    stamp = timezone.localdate().isoformat()
+    response["Content-Disposition"] = f'attachment; filename="{name}-{stamp}.{fmt}"'
+    return response
@@ -0,0 +1,17 @@
+# accounts/hashers.py
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the iteration count taken from settings.
+
+    It shares the stock "pbkdf2_sha256" algorithm name, so existing hashes
+    still verify, and any hash with a different count is rewritten at the
+    configured cost on the user's next successful login.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, "PASSWORD_PBKDF2_ITERATIONS", PBKDF2PasswordHasher.iterations)
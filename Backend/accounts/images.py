@@ -0,0 +1,142 @@
+# accounts/images.py
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from PIL import Image, ImageOps
+
+from .models import Doctor
+from .caching import bump_catalog_version
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> longest edge in pixels. Images are never upscaled.
+VARIANT_SIZES = {
+    "thumbnail": 96,
+    "card": 320,
+    "full": 1024,
+}
+FORMATS = [
+    ("webp", "WEBP", "image/webp"),
+    ("jpeg", "JPEG", "image/jpeg"),
+]
+QUALITY = 82
+
+# Saving a doctor schedules the rebuild on this per-process thread, after the
+# transaction commits, so an upload answers without waiting on Pillow and the
+# storage uploads. Work still queued when a worker is killed is lost; the
+# `build_image_variants` command catches up on any doctor left behind.
+executor = None
+executor_lock = threading.Lock()
+
+
+def build_variants(name, source, storage):
+    """
+    Resize the image in `source` to every VARIANT_SIZES entry, save each as WebP
+    and JPEG under doctors/variants/, and return the map stored on
+    Doctor.image_variants.
+    """
+    base = os.path.splitext(os.path.basename(name))[0]
+    variants = {"source": name}
+
+    with Image.open(source) as original:
+        image = ImageOps.exif_transpose(original).convert("RGB")
+
+    for variant, edge in VARIANT_SIZES.items():
+        resized = image.copy()
+        resized.thumbnail((edge, edge), Image.LANCZOS)
+        entry = {"width": resized.width, "height": resized.height}
+        for ext, pil_format, content_type in FORMATS:
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, quality=QUALITY, optimize=True)
+            content = ContentFile(buffer.getvalue())
+            content.content_type = content_type
+            entry[ext] = storage.save(f"doctors/variants/{base}_{variant}.{ext}", content)
+        variants[variant] = entry
+    return variants
+
+
+def stored_names(variants):
+    """Every file name in an image_variants map."""
+    return {
+        entry[ext]
+        for entry in variants.values() if isinstance(entry, dict)
+        for ext, _, _ in FORMATS if entry.get(ext)
+    }
+
+
+def variants_outdated(doctor):
+    image, current = doctor.profile_image, doctor.image_variants or {}
+    return current.get("source") != image.name if image else bool(current)
+
+
+def refresh_doctor_variants(doctor, force=False):
+    """
+    Bring doctor.image_variants in line with doctor.profile_image, and delete
+    the files of the variants it replaces.
+
+    Returns True when the row was updated. Failures are logged rather than
+    raised so a bad upload never blocks saving the doctor.
+    """
+    image = doctor.profile_image
+    current = doctor.image_variants or {}
+
+    if not force and not variants_outdated(doctor):
+        return False
+    if not image:
+        variants = {}
+    else:
+        try:
+            with image.storage.open(image.name) as source:
+                variants = build_variants(image.name, source, image.storage)
+        except Exception:
+            logger.warning("Could not build image variants for doctor %s", doctor.pk, exc_info=True)
+            return False
+
+    if variants == current:
+        return False
+    doctor.image_variants = variants
+    Doctor.objects.filter(pk=doctor.pk).update(image_variants=variants)
+    # .update() skips the save signals that invalidate the doctor catalog cache.
+    bump_catalog_version()
+
+    for name in stored_names(current) - stored_names(variants):
+        try:
+            doctor.profile_image.storage.delete(name)
+        except Exception:
+            logger.warning("Could not delete old image variant %s of doctor %s", name, doctor.pk, exc_info=True)
+    return True
+
+
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="image-variants")
+        return executor
+
+
+def refresh_variants_in_thread(doctor_id):
+    # Like accounts/batch.py's pool threads: close connections on the terms
+    # request threads do (CONN_MAX_AGE, errors).
+    close_old_connections()
+    try:
+        doctor = Doctor.objects.filter(pk=doctor_id).only("id", "profile_image", "image_variants").first()
+        if doctor is not None:
+            refresh_doctor_variants(doctor)
+    except Exception:
+        logger.exception("Image variant refresh for doctor %s failed", doctor_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_variant_refresh(doctor):
+    """Refresh `doctor`'s variants on the background thread once the current transaction commits."""
+    if not variants_outdated(doctor):
+        return
+    doctor_id = doctor.pk
+    transaction.on_commit(lambda: get_executor().submit(refresh_variants_in_thread, doctor_id))
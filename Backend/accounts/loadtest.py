@@ -0,0 +1,288 @@
+# accounts/loadtest.py
+import http.client
+import json
+import random
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import count
+from urllib.parse import urlencode, urlsplit
+
+# -------------------- SERVERS --------------------
+
+SERVERS = {
+    "runserver": lambda workers, port: [
+        sys.executable, "manage.py", "runserver", f"127.0.0.1:{port}", "--noreload",
+    ],
+    "gunicorn-sync": lambda workers, port: [
+        sys.executable, "-m", "gunicorn", "backend.wsgi:application",
+        "--workers", str(workers), "--bind", f"127.0.0.1:{port}", "--log-level", "warning",
+    ],
+    "uvicorn": lambda workers, port: [
+        sys.executable, "-m", "uvicorn", "backend.asgi:application",
+        "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning",
+        "--no-access-log",
+    ],
+}
+
+
+class ServerError(Exception):
+    pass
+
+
+def wait_until_ready(process, port, path, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise ServerError(f"Server exited with status {process.returncode}; is it installed?")
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", path)
+            if conn.getresponse().status == 200:
+                conn.close()
+                return
+        except OSError:
+            pass
+        time.sleep(0.25)
+    raise ServerError(f"Server on port {port} did not answer {path} within {timeout}s")
+
+
+@contextmanager
+def running_server(name, workers, port, ready_path, env, cwd):
+    """Launch one of SERVERS on 127.0.0.1:`port` and stop it on exit."""
+    process = subprocess.Popen(SERVERS[name](workers, port), env=env, cwd=cwd)
+    try:
+        wait_until_ready(process, port, ready_path)
+        yield process
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+# -------------------- SCENARIO --------------------
+
+# Relative weight of each operation in a virtual user's loop. Every user
+# registers and logs in once before the loop, so those two always have samples.
+MIX = {
+    "doctor_list": 40,
+    "appointment_create": 15,
+    "verify_payment": 10,
+    "token_refresh": 10,
+    "admin_stats": 5,
+    "login": 10,
+    "register": 10,
+}
+ENDPOINTS = ["register", "login", "token_refresh", "doctor_list", "appointment_create", "verify_payment", "admin_stats"]
+EMAIL_DOMAIN = "loadtest.invalid"
+PASSWORD = "loadtest-pass"
+
+
+class Recorder:
+    """Thread-safe (endpoint -> latencies, statuses) collector."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {name: [] for name in ENDPOINTS}
+        self.statuses = {name: {} for name in ENDPOINTS}
+
+    def add(self, endpoint, status, elapsed):
+        with self.lock:
+            self.latencies[endpoint].append(elapsed)
+            self.statuses[endpoint][status] = self.statuses[endpoint].get(status, 0) + 1
+
+
+class VirtualUser:
+    """One client thread: a keep-alive connection, its own tokens and a seeded RNG."""
+
+    def __init__(self, harness, number):
+        self.harness = harness
+        self.number = number
+        self.rng = random.Random(harness.seed * 1000 + number)
+        self.registered = count()
+        self.conn = None
+        self.email = None
+        self.access = None
+        self.refresh = None
+
+    def request(self, endpoint, method, path, body=None, token=None):
+        """Send one request and record it. Returns (status, parsed JSON or None)."""
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        payload = json.dumps(body) if body is not None else None
+
+        began = time.perf_counter()
+        try:
+            self.conn = self.conn or self.harness.connection()
+            self.conn.request(method, self.harness.prefix + path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            raw = response.read()
+            status = response.status
+            if response.getheader("Connection", "").lower() == "close":
+                self.conn.close()
+                self.conn = None
+        except OSError as exc:
+            status, raw = type(exc).__name__, b""
+            self.conn = None
+        self.harness.recorder.add(endpoint, status, time.perf_counter() - began)
+
+        try:
+            return status, json.loads(raw) if raw else None
+        except ValueError:
+            return status, None
+
+    def new_email(self):
+        return f"lt-{self.harness.run_id}-{self.number}-{next(self.registered)}@{EMAIL_DOMAIN}"
+
+    # Operations, named after the endpoints they time.
+
+    def register(self):
+        email = self.new_email()
+        status, _ = self.request("register", "POST", "/accounts/auth/register/", {
+            "email": email, "full_name": f"Load User {self.number}",
+            "password": PASSWORD, "confirm_password": PASSWORD,
+        })
+        if status == 201 and self.email is None:
+            self.email = email
+
+    def login(self):
+        if self.email is None:
+            return
+        status, data = self.request("login", "POST", "/accounts/auth/login/", {"email": self.email, "password": PASSWORD})
+        if status == 200:
+            self.access, self.refresh = data["access"], data["refresh"]
+
+    def token_refresh(self):
+        if self.refresh is None:
+            return
+        status, data = self.request("token_refresh", "POST", "/accounts/auth/token/refresh/", {"refresh": self.refresh})
+        if status == 200:
+            self.access = data["access"]
+
+    def doctor_list(self):
+        query = urlencode({"department": self.rng.choice(self.harness.departments)}) if self.harness.departments else ""
+        self.request("doctor_list", "GET", f"/accounts/doctors/?{query}")
+
+    def appointment_create(self):
+        if self.access is None:
+            return
+        self.request("appointment_create", "POST", "/accounts/appointments/", {
+            "doctor_id": self.rng.choice(self.harness.doctor_ids), "date_time": self.harness.next_slot(),
+            "notes": "load test",
+        }, token=self.access)
+
+    def verify_payment(self):
+        if self.access is None:
+            return
+        self.request("verify_payment", "POST", "/accounts/appointments/verify_payment/", {
+            "payment_id": f"LT-{self.harness.run_id}-{self.number}-{self.rng.getrandbits(32)}",
+            "doctor_id": self.rng.choice(self.harness.doctor_ids), "date_time": self.harness.next_slot(),
+        }, token=self.access)
+
+    def admin_stats(self):
+        self.request("admin_stats", "GET", "/accounts/admin/stats/", token=self.harness.admin_token)
+
+    def run(self, stop):
+        self.register()
+        self.login()
+        operations = list(MIX)
+        weights = list(MIX.values())
+        while not stop.is_set():
+            getattr(self, self.rng.choices(operations, weights)[0])()
+        if self.conn:
+            self.conn.close()
+
+
+class LoadTest:
+    """
+    Drive `base_url` with `concurrency` virtual users for `duration` seconds.
+
+    `departments` and `doctor_ids` come from the seeded database the server
+    reads; `admin_token` is a JWT for a staff user. Bookings take consecutive
+    minutes from `slot_origin`, which should lie after every existing booking
+    so that none of them conflicts.
+    """
+
+    def __init__(self, base_url, departments, doctor_ids, admin_token, slot_origin, seed=0):
+        url = urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or (443 if url.scheme == "https" else 80)
+        self.https = url.scheme == "https"
+        self.prefix = url.path.rstrip("/")
+        self.departments = departments
+        self.doctor_ids = doctor_ids
+        self.admin_token = admin_token
+        self.seed = seed
+        self.run_id = int(time.time())
+        self.recorder = Recorder()
+        self.slots = count()
+        self.slot_origin = slot_origin
+        self.slot_lock = threading.Lock()
+
+    def connection(self):
+        connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        return connection_class(self.host, self.port, timeout=30)
+
+    def next_slot(self):
+        with self.slot_lock:
+            n = next(self.slots)
+        return (self.slot_origin + timedelta(minutes=n)).isoformat()
+
+    def run(self, concurrency, duration):
+        stop = threading.Event()
+        users = [VirtualUser(self, number) for number in range(concurrency)]
+        threads = [threading.Thread(target=user.run, args=(stop,), daemon=True) for user in users]
+        began = time.monotonic()
+        for thread in threads:
+            thread.start()
+        time.sleep(duration)
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=35)
+        return summarize(self.recorder, time.monotonic() - began)
+
+
+# -------------------- RESULTS --------------------
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(0, int(p / 100 * len(ordered) + 0.5) - 1))]
+
+
+def summarize(recorder, elapsed):
+    """Per-endpoint counts, error counts, throughput and latency percentiles (ms)."""
+    endpoints = {}
+    for name in ENDPOINTS:
+        ordered = sorted(recorder.latencies[name])
+        statuses = recorder.statuses[name]
+        ms = lambda seconds: None if seconds is None else round(seconds * 1000, 2)
+        endpoints[name] = {
+            "requests": len(ordered),
+            "errors": sum(n for status, n in statuses.items() if not (isinstance(status, int) and status < 400)),
+            "throughput": round(len(ordered) / elapsed, 2),
+            "p50": ms(percentile(ordered, 50)),
+            "p95": ms(percentile(ordered, 95)),
+            "p99": ms(percentile(ordered, 99)),
+            "max": ms(ordered[-1] if ordered else None),
+            "statuses": {str(status): n for status, n in sorted(statuses.items(), key=lambda item: str(item[0]))},
+        }
+    total = sum(endpoint["requests"] for endpoint in endpoints.values())
+    return {"elapsed": round(elapsed, 2), "requests": total, "throughput": round(total / elapsed, 2), "endpoints": endpoints}
+
+
+def compare(current, previous):
+    """(endpoint, metric, previous, current, change %) rows for the headline metrics."""
+    rows = []
+    for name, stats in current["endpoints"].items():
+        before = previous.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        for metric in ("throughput", "p50", "p95", "p99"):
+            old, new = before.get(metric), stats.get(metric)
+            if old and new is not None:
+                rows.append((name, metric, old, new, (new - old) / old * 100))
+    return rows
@@ -0,0 +1,128 @@
+#accounts/management/commands/bench_booking.py
+import queue
+import random
+import statistics
+import threading
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Q
+from django.urls import reverse
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+
+from accounts.models import User, Department, Doctor, Appointment
+
+
+class Command(BaseCommand):
+    help = "Fire parallel bookings at a few hot slots and report throughput, conflict rate and double bookings"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Total booking attempts")
+        parser.add_argument("--concurrency", type=int, default=16, help="Parallel worker threads")
+        parser.add_argument("--slots", type=int, default=5, help="Number of hot slots contended for")
+        parser.add_argument("--endpoint", choices=["create", "verify_payment"], default="create")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        department = Department.objects.create(name="Benchmark")
+        doctor = Doctor.objects.create(
+            name="Benchmark Doctor",
+            department=department,
+            specialization="Benchmark",
+            education="-",
+            experience="-",
+            availability="-",
+        )
+        patients = [
+            User.objects.create_user(email=f"bench-{doctor.pk}-{i}@bench.invalid", password=None)
+            for i in range(options["concurrency"])
+        ]
+        start = now().replace(microsecond=0) + timedelta(days=365)
+        slots = [(start + timedelta(minutes=30 * i)).isoformat() for i in range(options["slots"])]
+
+        if options["endpoint"] == "create":
+            url = reverse("appointment-list")
+            payload = lambda slot: {"doctor_id": doctor.pk, "date_time": slot}
+        else:
+            url = reverse("appointment-verify-payment")
+            payload = lambda slot: {"doctor_id": doctor.pk, "date_time": slot, "payment_id": "BENCH"}
+
+        jobs = queue.Queue()
+        for _ in range(options["requests"]):
+            jobs.put(rng.choice(slots))
+
+        statuses = Counter()
+        latencies = []
+        lock = threading.Lock()
+
+        def worker(patient):
+            client = APIClient(SERVER_NAME="localhost")
+            client.force_authenticate(patient)
+            try:
+                while True:
+                    try:
+                        slot = jobs.get_nowait()
+                    except queue.Empty:
+                        return
+                    began = time.perf_counter()
+                    try:
+                        code = client.post(url, payload(slot), format="json").status_code
+                    except Exception:
+                        code = "error"
+                    elapsed = time.perf_counter() - began
+                    with lock:
+                        statuses[code] += 1
+                        latencies.append(elapsed)
+            finally:
+                connection.close()
+
+        try:
+            threads = [threading.Thread(target=worker, args=(patient,)) for patient in patients]
+            began = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            wall = time.perf_counter() - began
+
+            double_booked = (
+                Appointment.objects.filter(doctor=doctor)
+                .exclude(status="cancelled")
+                .values("date_time")
+                .annotate(n=Count("id"))
+                .filter(n__gt=1)
+                .count()
+            )
+            booked = Appointment.objects.filter(Q(doctor=doctor) & ~Q(status="cancelled")).count()
+        finally:
+            doctor.delete()
+            User.objects.filter(pk__in=[p.pk for p in patients]).delete()
+            department.delete()
+
+        total = sum(statuses.values())
+        latencies.sort()
+        pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+        self.stdout.write("\n--- BOOKING CONTENTION ---")
+        self.stdout.write(f"Endpoint:       {options['endpoint']}")
+        self.stdout.write(f"Attempts:       {total} over {options['slots']} slots, {options['concurrency']} threads")
+        self.stdout.write(f"Wall time:      {wall:.2f}s")
+        self.stdout.write(f"Throughput:     {total / wall:.1f} req/s")
+        self.stdout.write(f"Latency:        p50 {pct(0.50):.1f}ms  p95 {pct(0.95):.1f}ms  "
+                          f"mean {statistics.mean(latencies) * 1000:.1f}ms")
+        self.stdout.write(f"Booked (201):   {statuses[201]}")
+        self.stdout.write(f"Conflicts (409):{statuses[409]} ({statuses[409] / total:.1%})")
+        other = {code: n for code, n in statuses.items() if code not in (201, 409)}
+        if other:
+            self.stdout.write(self.style.WARNING(f"Other outcomes: {other}"))
+        self.stdout.write(f"Live bookings:  {booked}")
+
+        if double_booked:
+            self.stdout.write(self.style.ERROR(f"Double-booked slots: {double_booked}"))
+        else:
+            self.stdout.write(self.style.SUCCESS("No slot was double-booked."))
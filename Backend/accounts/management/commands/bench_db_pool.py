@@ -0,0 +1,125 @@
+#accounts/management/commands/bench_db_pool.py
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.db.utils import ConnectionHandler
+
+from backend.database import connection_mode
+
+MODES = {
+    # label -> (DB_POOL_MODE, CONN_MAX_AGE)
+    "per-request": ("persistent", 0),
+    "persistent": ("persistent", 600),
+    "pool": ("pool", 0),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate request-handling threads against the default PostgreSQL database with per-request "
+        "connections, persistent connections and the pool, and report server connections and latency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=32, help="Concurrent worker threads")
+        parser.add_argument("--requests", type=int, default=200, help="Requests per thread")
+        parser.add_argument("--queries", type=int, default=3, help="Queries per request")
+        parser.add_argument("--pool-max", type=int, default=8, help="DB_POOL_MAX_SIZE for the pool run")
+        parser.add_argument("--mode", choices=list(MODES), action="append", help="Only run these modes (repeatable)")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("bench_db_pool needs PostgreSQL (it counts server connections in pg_stat_activity).")
+
+        base = connections.settings["default"]
+        for label in options["mode"] or list(MODES):
+            mode, conn_max_age = MODES[label]
+            # A separate alias, so the pool is not shared with the app's own.
+            alias = f"bench_{label.replace('-', '_')}"
+            database = connection_mode(base, mode, conn_max_age, min_size=2, max_size=options["pool_max"], timeout=30)
+            if mode != "pool":
+                database["OPTIONS"].pop("pool", None)
+            handler = ConnectionHandler({alias: database})
+            try:
+                result = self.run(handler, alias, options)
+            finally:
+                handler.close_all()
+                if mode == "pool":
+                    handler[alias].close_pool()
+            self.report(label, options, result)
+
+    def server_connections(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()"
+            )
+            return cursor.fetchone()[0]
+
+    def run(self, handler, alias, options):
+        baseline = self.server_connections()
+        latencies = []
+        connects = [0]
+        lock = threading.Lock()
+        stop = threading.Event()
+        peak = [0]
+
+        def count_connect(sender, connection, **kwargs):
+            if connection.alias == alias:
+                with lock:
+                    connects[0] += 1
+
+        def monitor():
+            while not stop.wait(0.05):
+                peak[0] = max(peak[0], self.server_connections() - baseline)
+            connection.close()
+
+        def worker():
+            db = handler[alias]
+            samples = []
+            for _ in range(options["requests"]):
+                began = time.perf_counter()
+                with db.cursor() as cursor:
+                    for _ in range(options["queries"]):
+                        cursor.execute("SELECT 1")
+                        cursor.fetchone()
+                # What Django's request_finished handler does after each response.
+                db.close_if_unusable_or_obsolete()
+                samples.append(time.perf_counter() - began)
+            db.close()
+            with lock:
+                latencies.extend(samples)
+
+        connection_created.connect(count_connect)
+        watcher = threading.Thread(target=monitor, daemon=True)
+        watcher.start()
+        threads = [threading.Thread(target=worker) for _ in range(options["threads"])]
+        began = time.perf_counter()
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            elapsed = time.perf_counter() - began
+            stop.set()
+            watcher.join()
+            connection_created.disconnect(count_connect)
+
+        pool = handler[alias].pool if handler.settings[alias]["OPTIONS"].get("pool") else None
+        opened = pool.get_stats().get("connections_num", 0) if pool is not None else connects[0]
+        return {"latencies": latencies, "elapsed": elapsed, "peak": peak[0], "opened": opened}
+
+    def report(self, label, options, result):
+        ordered = sorted(result["latencies"])
+        pct = lambda p: ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000
+        self.stdout.write(f"\n--- {label.upper()} ({options['threads']} threads x {options['requests']} requests) ---")
+        self.stdout.write(f"Server connections: peak {result['peak']}, opened {result['opened']}")
+        self.stdout.write(f"Throughput: {len(ordered) / result['elapsed']:.0f} req/s")
+        self.stdout.write(
+            f"Latency ms: p50 {statistics.median(ordered) * 1000:.2f}  p95 {pct(95):.2f}  "
+            f"p99 {pct(99):.2f}  max {ordered[-1] * 1000:.2f}"
+        )
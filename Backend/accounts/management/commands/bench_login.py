@@ -0,0 +1,56 @@
+#accounts/management/commands/bench_login.py
+import statistics
+import time
+
+from django.contrib.auth import authenticate
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from accounts.models import User
+
+LEGACY_BACKENDS = [
+    "accounts.backends.EmailBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
+
+class Command(BaseCommand):
+    help = "Measure CPU time per login attempt (success, wrong password, unknown email) with the current hasher"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Attempts per scenario")
+        parser.add_argument("--compare-legacy", action="store_true",
+                            help="Also time the old EmailBackend + ModelBackend chain")
+
+    def handle(self, *args, **options):
+        email = "bench-login@bench.invalid"
+        password = "bench-login-pass"
+        User.objects.filter(email=email).delete()
+        User.objects.create_user(email=email, password=password)
+
+        scenarios = [
+            ("success", email.upper(), password),
+            ("wrong password", email, "not-the-password"),
+            ("unknown email", "nobody@bench.invalid", password),
+        ]
+        try:
+            self.report("current", scenarios, options["iterations"])
+            if options["compare_legacy"]:
+                with override_settings(AUTHENTICATION_BACKENDS=LEGACY_BACKENDS):
+                    legacy = [(name, login, secret) for name, login, secret in scenarios if name != "success"]
+                    self.report("legacy chain", legacy, options["iterations"])
+        finally:
+            User.objects.filter(email=email).delete()
+
+    def report(self, label, scenarios, iterations):
+        self.stdout.write(f"\n--- LOGIN CPU COST ({label}) ---")
+        for name, login, secret in scenarios:
+            samples = []
+            for _ in range(iterations):
+                began = time.process_time()
+                authenticate(None, email=login, password=secret)
+                samples.append((time.process_time() - began) * 1000)
+            self.stdout.write(
+                f"{name:<16} median {statistics.median(samples):7.1f} ms CPU   "
+                f"max {max(samples):7.1f} ms   ({iterations} attempts)"
+            )
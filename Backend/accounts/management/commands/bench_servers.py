@@ -0,0 +1,112 @@
+#accounts/management/commands/bench_servers.py
+import http.client
+import os
+import socket
+import statistics
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.loadtest import ServerError, running_server
+
+
+class Command(BaseCommand):
+    help = (
+        "Start gunicorn (sync workers) and uvicorn with the same worker count, load each with fast "
+        "clients while slow clients hold connections open, and report throughput and latency"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=2, help="Worker processes per server")
+        parser.add_argument("--concurrency", type=int, default=32, help="Fast client threads")
+        parser.add_argument("--slow-clients", type=int, default=8,
+                            help="Connections that trickle their request headers one byte a second")
+        parser.add_argument("--duration", type=float, default=15, help="Seconds of load per server")
+        parser.add_argument("--path", default="/accounts/doctors/?paginate=false",
+                            help="Path requested from both servers; uvicorn answers the hot reads with async views")
+        parser.add_argument("--server", choices=["gunicorn-sync", "uvicorn"], action="append",
+                            help="Only run these servers (repeatable)")
+        parser.add_argument("--port", type=int, default=8765)
+
+    def handle(self, *args, **options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE)}
+        path = options["path"]
+        for name in options["server"] or ["gunicorn-sync", "uvicorn"]:
+            try:
+                with running_server(name, options["workers"], options["port"], path, env, settings.BASE_DIR):
+                    stats = self.load(options["port"], path, options)
+            except ServerError as exc:
+                raise CommandError(str(exc))
+            self.report(name, path, options, stats)
+
+    def load(self, port, path, options):
+        stop = threading.Event()
+        lock = threading.Lock()
+        latencies = []
+        statuses = Counter()
+
+        def slow_client():
+            # Holds a connection by sending the request headers one byte at a time.
+            request = f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nX-Padding: {'x' * 64}\r\n\r\n".encode()
+            while not stop.is_set():
+                try:
+                    with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+                        for byte in request:
+                            if stop.wait(1):
+                                return
+                            sock.sendall(bytes([byte]))
+                        sock.recv(65536)
+                except OSError:
+                    stop.wait(0.5)
+
+        def fast_client():
+            conn = None
+            while not stop.is_set():
+                began = time.perf_counter()
+                try:
+                    conn = conn or http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+                    conn.request("GET", path)
+                    response = conn.getresponse()
+                    response.read()
+                    status = response.status
+                    if response.getheader("Connection", "").lower() == "close":
+                        conn.close()
+                        conn = None
+                except OSError as exc:
+                    status = type(exc).__name__
+                    conn = None
+                elapsed = time.perf_counter() - began
+                with lock:
+                    statuses[status] += 1
+                    if status == 200:
+                        latencies.append(elapsed)
+
+        threads = [threading.Thread(target=slow_client, daemon=True) for _ in range(options["slow_clients"])]
+        threads += [threading.Thread(target=fast_client, daemon=True) for _ in range(options["concurrency"])]
+        for thread in threads:
+            thread.start()
+        time.sleep(options["duration"])
+        stop.set()
+        for thread in threads:
+            thread.join(timeout=35)
+        return latencies, statuses
+
+    def report(self, name, path, options, stats):
+        latencies, statuses = stats
+        ok = len(latencies)
+        self.stdout.write(f"\n--- {name.upper()} ({options['workers']} workers) GET {path} ---")
+        self.stdout.write(
+            f"Clients: {options['concurrency']} fast, {options['slow_clients']} slow, {options['duration']:.0f}s"
+        )
+        self.stdout.write(f"Throughput: {ok / options['duration']:.1f} req/s")
+        if ok:
+            ordered = sorted(latencies)
+            pct = lambda p: ordered[min(ok - 1, int(p / 100 * ok))] * 1000
+            self.stdout.write(
+                f"Latency ms: p50 {statistics.median(ordered) * 1000:.1f}  p95 {pct(95):.1f}  "
+                f"p99 {pct(99):.1f}  max {ordered[-1] * 1000:.1f}"
+            )
+        self.stdout.write(f"Statuses: {dict(statuses)}")
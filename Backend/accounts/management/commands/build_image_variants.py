@@ -0,0 +1,29 @@
+#accounts/management/commands/build_image_variants.py
+from django.core.management.base import BaseCommand
+from accounts.models import Doctor
+from accounts.images import refresh_doctor_variants
+
+
+class Command(BaseCommand):
+    help = "Build resized WebP/JPEG variants for doctor profile images that do not have them yet"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--force", action="store_true", help="Rebuild variants even when they are up to date")
+
+    def handle(self, *args, **options):
+        doctors = Doctor.objects.exclude(profile_image="").exclude(profile_image__isnull=True)
+        doctors = doctors.only("id", "profile_image", "image_variants")
+
+        updated = 0
+        skipped = 0
+        for doctor in doctors.iterator(chunk_size=200):
+            if refresh_doctor_variants(doctor, force=options["force"]):
+                updated += 1
+                self.stdout.write(self.style.SUCCESS(f"Built variants for doctor {doctor.pk}"))
+            else:
+                skipped += 1
+
+        self.stdout.write("\n--- SUMMARY ---")
+        self.stdout.write(f"Updated: {updated}")
+        self.stdout.write(f"Unchanged or failed: {skipped}")
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,26 @@
+#accounts/management/commands/check_query_plans.py
+from django.core.management.base import BaseCommand, CommandError
+from accounts.query_plans import check_hot_query_plans
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the hot queries from accounts/views.py and fail if any falls back to a sequential scan"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--verbose-plans", action="store_true", help="Print every plan, not only failures")
+
+    def handle(self, *args, **options):
+        failures = []
+        for name, plan, scans in check_hot_query_plans():
+            if scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"SEQ SCAN  {name}: {', '.join(scans)}"))
+                self.stdout.write(plan)
+            else:
+                self.stdout.write(self.style.SUCCESS(f"ok        {name}"))
+                if options["verbose_plans"]:
+                    self.stdout.write(plan)
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot queries fall back to a sequential scan.")
+        self.stdout.write(self.style.SUCCESS("All hot queries use an index."))
@@ -0,0 +1,125 @@
+#accounts/management/commands/load_test.py
+import json
+import os
+import subprocess
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.loadtest import EMAIL_DOMAIN, ENDPOINTS, SERVERS, LoadTest, ServerError, compare, running_server
+from accounts.models import Appointment, Department, Doctor, User
+
+ADMIN_EMAIL = f"admin@{EMAIL_DOMAIN}"
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the real API (register, login, token refresh, doctor list, booking, verify_payment, "
+        "admin stats) against a local server and the database it reads, report per-endpoint throughput "
+        "and p50/p95/p99 latency, and save the results as JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000",
+                            help="Server to load; ignored with --launch")
+        parser.add_argument("--launch", choices=list(SERVERS),
+                            help="Start this server (auth throttles off) for the run")
+        parser.add_argument("--workers", type=int, default=2, help="Worker processes for --launch")
+        parser.add_argument("--port", type=int, default=8766, help="Port for --launch")
+        parser.add_argument("--concurrency", type=int, default=16, help="Virtual users")
+        parser.add_argument("--duration", type=float, default=30, help="Seconds of load")
+        parser.add_argument("--seed", type=int, default=0, help="Seeds each virtual user's request mix")
+        parser.add_argument("--output", help="JSON results file (default loadtest-results/<time>-<commit>.json)")
+        parser.add_argument("--compare", help="Earlier JSON results to diff against")
+        parser.add_argument("--keep-data", action="store_true", help="Keep the users and bookings the run created")
+
+    def handle(self, *args, **options):
+        if not Doctor.objects.exists():
+            raise CommandError("No doctors to book; seed the database first (manage.py seed_scale).")
+
+        admin, _ = User.objects.get_or_create(email=ADMIN_EMAIL, defaults={"is_staff": True, "is_superuser": True})
+        latest = Appointment.objects.aggregate(latest=Max("date_time"))["latest"]
+        harness = LoadTest(
+            options["base_url"] if not options["launch"] else f"http://127.0.0.1:{options['port']}",
+            departments=list(Department.objects.values_list("name", flat=True)),
+            doctor_ids=list(Doctor.objects.values_list("id", flat=True)[:1000]),
+            admin_token=str(RefreshToken.for_user(admin).access_token),
+            slot_origin=max(latest or datetime.now(timezone.utc), datetime.now(timezone.utc)) + timedelta(days=1),
+            seed=options["seed"],
+        )
+
+        try:
+            if options["launch"]:
+                # The auth throttles would otherwise turn most register/login calls into 429s.
+                env = {
+                    **os.environ,
+                    "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", settings.SETTINGS_MODULE),
+                    **{f"THROTTLE_{scope.upper()}": "" for scope in settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]},
+                }
+                with running_server(options["launch"], options["workers"], options["port"], "/", env, settings.BASE_DIR):
+                    results = harness.run(options["concurrency"], options["duration"])
+            else:
+                results = harness.run(options["concurrency"], options["duration"])
+        except ServerError as exc:
+            raise CommandError(str(exc))
+        finally:
+            if not options["keep_data"]:
+                User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}").delete()
+
+        results = {
+            "commit": git_commit(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "server": options["launch"] or options["base_url"],
+            "concurrency": options["concurrency"],
+            "duration": options["duration"],
+            "seed": options["seed"],
+            "database": {"doctors": len(harness.doctor_ids), "appointments": Appointment.objects.count()},
+            **results,
+        }
+        self.report(results)
+        self.save(results, options["output"])
+        if options["compare"]:
+            self.report_comparison(results, options["compare"])
+
+    def report(self, results):
+        self.stdout.write(
+            f"\n--- LOAD TEST ({results['server']}, {results['concurrency']} users, {results['elapsed']:.0f}s) ---"
+        )
+        self.stdout.write(f"{'endpoint':<20}{'requests':>9}{'errors':>8}{'req/s':>9}{'p50':>9}{'p95':>9}{'p99':>9}  ms")
+        for name in ENDPOINTS:
+            stats = results["endpoints"][name]
+            cell = lambda value: f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+            self.stdout.write(
+                f"{name:<20}{stats['requests']:>9}{stats['errors']:>8}{stats['throughput']:>9.1f}"
+                f"{cell(stats['p50'])}{cell(stats['p95'])}{cell(stats['p99'])}"
+            )
+        self.stdout.write(f"Total: {results['requests']} requests, {results['throughput']:.1f} req/s")
+
+    def save(self, results, output):
+        if output:
+            path = Path(output)
+        else:
+            stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+            path = Path(settings.BASE_DIR) / "loadtest-results" / f"{stamp}-{results['commit'] or 'nogit'}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2))
+        self.stdout.write(f"Saved results to {path}")
+
+    def report_comparison(self, results, previous_path):
+        previous = json.loads(Path(previous_path).read_text())
+        self.stdout.write(f"\n--- COMPARED WITH {previous.get('commit') or previous_path} ---")
+        for name, metric, old, new, change in compare(results, previous):
+            self.stdout.write(f"{name:<20}{metric:<12}{old:>10.1f} -> {new:>10.1f}  ({change:+.1f}%)")
@@ -0,0 +1,11 @@
+#accounts/management/commands/rebuild_appointment_rollups.py
+from django.core.management.base import BaseCommand
+from accounts.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily appointment rollups used by the admin dashboard from the Appointment table"
+
+    def handle(self, *args, **kwargs):
+        written = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} rollup rows."))
@@ -0,0 +1,11 @@
+#accounts/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+from accounts.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Recreate the doctor and department catalog search entries from their tables"
+
+    def handle(self, *args, **kwargs):
+        written = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {written} search entries."))
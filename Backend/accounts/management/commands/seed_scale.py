@@ -0,0 +1,277 @@
+#accounts/management/commands/seed_scale.py
+import csv
+import io
+import math
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from accounts.caching import bump_catalog_version
+from accounts.models import Appointment, Department, Doctor, User
+from accounts.rollups import rebuild_rollups
+from accounts.search import rebuild_search_index
+
+SEED_MARKER = "Seeded by seed_scale"
+EMAIL_DOMAIN = "seed.invalid"
+
+DEPARTMENTS = [
+    ("Cardiology", "Cardiologist"), ("Neurology", "Neurologist"), ("Orthopedics", "Orthopedic Surgeon"),
+    ("Pediatrics", "Pediatrician"), ("Radiology", "Radiologist"), ("Dermatology", "Dermatologist"),
+    ("Oncology", "Oncologist"), ("Psychiatry", "Psychiatrist"), ("Gastroenterology", "Gastroenterologist"),
+    ("Ophthalmology", "Ophthalmologist"), ("Urology", "Urologist"), ("Emergency", "Emergency Physician"),
+]
+FIRST_NAMES = [
+    "Aarav", "Ada", "Amelia", "Arjun", "Chen", "Diya", "Elena", "Farah", "Grace", "Hana", "Ibrahim", "Isha",
+    "James", "Kenji", "Lara", "Leo", "Maya", "Mohammed", "Nora", "Omar", "Priya", "Rahul", "Sara", "Tariq",
+    "Uma", "Vikram", "Wei", "Yusuf", "Zara", "Zoe",
+]
+LAST_NAMES = [
+    "Ahmed", "Brown", "Chopra", "Das", "Evans", "Fernandez", "Garcia", "Gupta", "Hassan", "Iyer", "Jones",
+    "Khan", "Kim", "Lee", "Mehta", "Nair", "Okafor", "Patel", "Rao", "Reddy", "Sato", "Shah", "Singh",
+    "Smith", "Tanaka", "Verma", "Wang", "Williams", "Yadav", "Zhang",
+]
+EDUCATION = ["MBBS", "MBBS, MD", "MBBS, MS", "MBBS, DNB", "MBBS, DM", "MD, PhD"]
+
+# Clinic hours: 30-minute slots from 09:00 to 17:00 UTC.
+SLOT_MINUTES = 30
+SLOTS_PER_DAY = 16
+FIRST_SLOT_HOUR = 9
+
+# Past bookings settle; upcoming ones are mostly still pending.
+PAST_STATUSES = (["paid", "pending", "cancelled"], [0.72, 0.16, 0.12])
+FUTURE_STATUSES = (["paid", "pending", "cancelled"], [0.45, 0.50, 0.05])
+
+
+@contextmanager
+def explicit_timestamps(*fields):
+    """Let bulk_create keep the created_at / date_joined values the seeder chose."""
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def copy_value(value):
+    """Format a field value as a COPY csv cell (empty is NULL)."""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large, realistic, reproducible dataset: departments, doctors with skewed popularity, "
+        "patients, and seasonal appointments with mixed statuses and amounts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--departments", type=int, default=12)
+        parser.add_argument("--doctors", type=int, default=300)
+        parser.add_argument("--users", type=int, default=50_000)
+        parser.add_argument("--appointments", type=int, default=1_000_000)
+        parser.add_argument("--days", type=int, default=730, help="Days of booking history before today")
+        parser.add_argument("--future-days", type=int, default=60, help="Days of upcoming bookings after today")
+        parser.add_argument("--seed", type=int, default=0, help="Same seed and options give the same data")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--password", default="seed-pass", help="Password shared by every seeded user")
+        parser.add_argument("--no-copy", action="store_true", help="Use bulk_create instead of COPY on PostgreSQL")
+        parser.add_argument("--clear", action="store_true", help="Delete earlier seed_scale rows first")
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        self.use_copy = connection.vendor == "postgresql" and not options["no_copy"]
+        self.today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        started = time.monotonic()
+
+        if options["clear"]:
+            self.clear()
+
+        with explicit_timestamps(User._meta.get_field("date_joined"), Appointment._meta.get_field("created_at")):
+            departments = self.seed_departments(options["departments"])
+            doctors = self.seed_doctors(options["doctors"], departments)
+            patient_ids = self.seed_users(options["users"], options["password"], options["days"])
+            written = self.seed_appointments(options, doctors, patient_ids)
+
+        # Bulk writes skip the signal handlers, so derived data is rebuilt once at the end.
+        self.stdout.write("Rebuilding rollups and search index...")
+        rebuild_rollups()
+        rebuild_search_index()
+        bump_catalog_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(departments)} departments, {len(doctors)} doctors, {len(patient_ids)} users and "
+            f"{written} appointments in {time.monotonic() - started:.1f}s."
+        ))
+
+    # -------------------- ROWS --------------------
+
+    def clear(self):
+        # Raw deletes: the ORM collector would fire rollup and search signals row by row.
+        seeded_doctors = Doctor.objects.filter(department__description=SEED_MARKER)
+        with transaction.atomic():
+            Appointment.objects.filter(patient__email__endswith=f"@{EMAIL_DOMAIN}")._raw_delete(connection.alias)
+            Appointment.objects.filter(doctor__in=seeded_doctors)._raw_delete(connection.alias)
+            seeded_doctors._raw_delete(connection.alias)
+            Department.objects.filter(description=SEED_MARKER)._raw_delete(connection.alias)
+            User.objects.filter(email__endswith=f"@{EMAIL_DOMAIN}")._raw_delete(connection.alias)
+        self.stdout.write("Cleared earlier seed_scale rows.")
+
+    def person(self):
+        return self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+
+    def seed_departments(self, count):
+        departments = []
+        for i in range(count):
+            name, specialist = DEPARTMENTS[i % len(DEPARTMENTS)]
+            if i >= len(DEPARTMENTS):
+                name = f"{name} {i // len(DEPARTMENTS) + 1}"
+            departments.append((Department(name=name, description=SEED_MARKER), specialist))
+        Department.objects.bulk_create([department for department, _ in departments])
+        return departments
+
+    def seed_doctors(self, count, departments):
+        """Return [(doctor, fee)]; the list order is the popularity rank."""
+        doctors = []
+        for i in range(count):
+            department, specialist = departments[i % len(departments)]
+            first, last = self.person()
+            years = self.rng.randint(2, 35)
+            doctors.append(Doctor(
+                name=f"Dr. {first} {last}",
+                department=department,
+                specialization=specialist,
+                education=self.rng.choice(EDUCATION),
+                experience=f"{years} years",
+                availability=self.rng.choice(["Mon-Fri", "Mon-Sat", "Tue-Sat", "Weekends"]),
+                rating=round(min(5.0, max(2.5, self.rng.gauss(4.2, 0.4))), 1),
+            ))
+        Doctor.objects.bulk_create(doctors, batch_size=self.batch_size)
+        self.rng.shuffle(doctors)
+        # Fees are log-normal around 450, rounded to 50.
+        return [
+            (doctor, Decimal(max(100, round(self.rng.lognormvariate(math.log(450), 0.35) / 50) * 50)))
+            for doctor in doctors
+        ]
+
+    def seed_users(self, count, password, days):
+        password_hash = make_password(password)  # hashed once, shared by every row
+        ids = []
+        for start in range(0, count, self.batch_size):
+            batch = []
+            for i in range(start, min(count, start + self.batch_size)):
+                first, last = self.person()
+                batch.append(User(
+                    email=f"{first}.{last}.{i}@{EMAIL_DOMAIN}".lower(),
+                    first_name=first,
+                    last_name=last,
+                    password=password_hash,
+                    date_joined=self.today - timedelta(days=self.rng.randint(0, days), seconds=self.rng.randint(0, 86399)),
+                ))
+            User.objects.bulk_create(batch)
+            ids.extend(user.pk for user in batch)
+            self.stdout.write(f"Users: {len(ids)}/{count}")
+        return ids
+
+    def day_weights(self, days, future_days):
+        """Weight per day offset: winter peak, quiet weekends, slow growth over the period."""
+        offsets = list(range(-days, future_days + 1))
+        weights = []
+        for offset in offsets:
+            day = self.today + timedelta(days=offset)
+            season = 1 + 0.35 * math.cos(2 * math.pi * (day.timetuple().tm_yday - 15) / 365)
+            weekday = 0.35 if day.weekday() >= 5 else 1.0
+            growth = 1 + 0.5 * (offset + days) / max(1, days + future_days)
+            weights.append(season * weekday * growth)
+        return offsets, list(accumulate(weights))
+
+    def seed_appointments(self, options, doctors, patient_ids):
+        count = options["appointments"]
+        offsets, day_cumulative = self.day_weights(options["days"], options["future_days"])
+        # Zipf-like popularity: the busiest doctors take a large share of bookings.
+        popularity = list(accumulate(1 / (rank + 1) ** 1.1 for rank in range(len(doctors))))
+        # Patients skew too: a minority books again and again.
+        patient_weights = list(accumulate(1 / (rank + 1) ** 0.6 for rank in range(len(patient_ids))))
+        booked = {}  # (doctor index, day offset) -> slots already taken that day
+
+        written = 0
+        while written < count:
+            size = min(self.batch_size, count - written)
+            picked_doctors = self.rng.choices(range(len(doctors)), cum_weights=popularity, k=size)
+            picked_days = self.rng.choices(offsets, cum_weights=day_cumulative, k=size)
+            picked_patients = self.rng.choices(patient_ids, cum_weights=patient_weights, k=size)
+
+            rows = []
+            for doctor_index, offset, patient_id in zip(picked_doctors, picked_days, picked_patients):
+                doctor, fee = doctors[doctor_index]
+                statuses, weights = FUTURE_STATUSES if offset >= 0 else PAST_STATUSES
+                status = self.rng.choices(statuses, weights)[0]
+
+                taken = booked.get((doctor_index, offset), 0)
+                if taken >= SLOTS_PER_DAY:
+                    # A full day only takes cancellations, which never hold a slot.
+                    status = "cancelled"
+                    slot = self.rng.randrange(SLOTS_PER_DAY)
+                elif status == "cancelled":
+                    slot = self.rng.randrange(SLOTS_PER_DAY)
+                else:
+                    slot = taken
+                    booked[(doctor_index, offset)] = taken + 1
+
+                date_time = self.today + timedelta(
+                    days=offset, hours=FIRST_SLOT_HOUR, minutes=SLOT_MINUTES * slot
+                )
+                created_at = min(
+                    self.today + timedelta(hours=self.rng.randint(0, 23)),
+                    date_time - timedelta(days=self.rng.randint(0, 21), minutes=self.rng.randint(30, 600)),
+                )
+                paid = status == "paid"
+                rows.append(Appointment(
+                    doctor_id=doctor.pk,
+                    patient_id=patient_id,
+                    date_time=date_time,
+                    status=status,
+                    amount=fee if status != "cancelled" or self.rng.random() < 0.5 else None,
+                    payment_id=f"SEED-{options['seed']}-{written + len(rows)}" if paid else None,
+                    payment_status="COMPLETED" if paid else None,
+                    created_at=created_at,
+                ))
+
+            if self.use_copy:
+                self.copy_appointments(rows)
+            else:
+                Appointment.objects.bulk_create(rows)
+            written += len(rows)
+            self.stdout.write(f"Appointments: {written}/{count}")
+        return written
+
+    def copy_appointments(self, rows):
+        columns = ["doctor_id", "patient_id", "date_time", "status", "amount", "payment_id", "payment_status", "created_at"]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([copy_value(getattr(row, column)) for column in columns])
+        sql = (
+            f"COPY {Appointment._meta.db_table} ({', '.join(columns)}) "
+            f"FROM STDIN WITH (FORMAT csv)"
+        )
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, "copy_expert"):  # psycopg2
+                buffer.seek(0)
+                raw.copy_expert(sql, buffer)
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
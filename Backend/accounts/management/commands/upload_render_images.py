@@ -1,32 +1,71 @@
 #accounts/management/commands/upload_render_images.py
+import hashlib
+import json
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
 from django.core.management.base import BaseCommand
-from django.core.files.base import ContentFile
 from django.conf import settings
 from accounts.models import Doctor
+from accounts.caching import bump_catalog_version
 from supabase import create_client, Client
 
+
+def file_md5(path):
+    digest = hashlib.md5()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
 class Command(BaseCommand):
     help = "Upload doctor images from local media/doctors/ to Supabase and update Render DB"
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="Parallel upload threads (1 = sequential)")
+        parser.add_argument("--manifest", help="Progress manifest path (default: media/doctors/.upload_manifest.json)")
+        parser.add_argument("--force", action="store_true", help="Upload every image even if the bucket already has it")
+
+    def handle(self, *args, **options):
         supabase_url = settings.SUPABASE_URL
         supabase_key = settings.SUPABASE_SERVICE_ROLE_KEY
         supabase_bucket = settings.SUPABASE_BUCKET
 
-        supabase: Client = create_client(supabase_url, supabase_key)
-
         media_path = os.path.join(settings.BASE_DIR, "media", "doctors")
         if not os.path.isdir(media_path):
             self.stdout.write(self.style.ERROR(f"Directory not found: {media_path}"))
             return
 
-        doctors = Doctor.objects.all()
-        self.stdout.write(self.style.WARNING(f"Found {doctors.count()} doctors in Render DB."))
+        manifest_path = options["manifest"] or os.path.join(media_path, ".upload_manifest.json")
+        manifest = {}
+        if os.path.exists(manifest_path) and not options["force"]:
+            with open(manifest_path) as file:
+                manifest = json.load(file)
+        manifest_lock = threading.Lock()
 
-        uploaded = 0
-        missing = 0
+        def save_manifest():
+            tmp_path = f"{manifest_path}.tmp"
+            with open(tmp_path, "w") as file:
+                json.dump(manifest, file, indent=2, sort_keys=True)
+            os.replace(tmp_path, manifest_path)
+
+        clients = threading.local()
+
+        def bucket():
+            if not hasattr(clients, "supabase"):
+                clients.supabase: Client = create_client(supabase_url, supabase_key)
+            return clients.supabase.storage.from_(supabase_bucket)
 
+        remote_etags = {} if options["force"] else self.remote_etags(bucket())
+
+        doctors = list(Doctor.objects.only("id", "name", "profile_image"))
+        self.stdout.write(self.style.WARNING(f"Found {len(doctors)} doctors in Render DB."))
+
+        pending = []
+        in_bucket = []
+        missing = 0
         for doctor in doctors:
             img_name = f"{doctor.name.replace(' ', '_').lower()}.jpg"
             local_path = os.path.join(media_path, img_name)
@@ -36,28 +75,81 @@ class Command(BaseCommand):
                 missing += 1
                 continue
 
-            try:
-                with open(local_path, "rb") as file:
-                    supabase.storage.from_(supabase_bucket).upload(
-                        path=f"doctors/{img_name}",
-                        file=file,
-                        file_options={"content-type": "image/jpeg"},
-                        upsert=True
-                    )
-
-                public_url = f"{supabase_url}/storage/v1/object/public/{supabase_bucket}/doctors/{img_name}"
+            object_path = f"doctors/{img_name}"
+            checksum = file_md5(local_path)
+            if checksum in (manifest.get(object_path), remote_etags.get(object_path)):
+                in_bucket.append((doctor, object_path))
+                manifest[object_path] = checksum
+            else:
+                pending.append((doctor, object_path, local_path, checksum))
+        if in_bucket:
+            # Images found only through the bucket listing are recorded too, so
+            # the next run skips them without listing.
+            save_manifest()
 
-                doctor.profile_image.name = f"doctors/{img_name}"
-                doctor.save()
+        self.stdout.write(f"{len(in_bucket)} already in bucket, {len(pending)} to upload.")
 
+        def upload(object_path, local_path, checksum):
+            with open(local_path, "rb") as file:
+                bucket().upload(
+                    path=object_path,
+                    file=file,
+                    file_options={"content-type": "image/jpeg", "upsert": "true"},
+                )
+            with manifest_lock:
+                manifest[object_path] = checksum
+                save_manifest()
 
+        uploaded = []
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, options["workers"])) as pool:
+            futures = {
+                pool.submit(upload, object_path, local_path, checksum): (doctor, object_path)
+                for doctor, object_path, local_path, checksum in pending
+            }
+            for future in as_completed(futures):
+                doctor, object_path = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    self.stdout.write(self.style.ERROR(f"Error uploading {doctor.name}: {e}"))
+                    failed += 1
+                    continue
                 self.stdout.write(self.style.SUCCESS(f"Uploaded -> {doctor.name}"))
-                uploaded += 1
+                uploaded.append((doctor, object_path))
 
-            except Exception as e:
-                self.stdout.write(self.style.ERROR(f"Error uploading {doctor.name}: {e}"))
+        changed = []
+        for doctor, object_path in in_bucket + uploaded:
+            if doctor.profile_image.name != object_path:
+                doctor.profile_image.name = object_path
+                changed.append(doctor)
+        if changed:
+            Doctor.objects.bulk_update(changed, ["profile_image"], batch_size=500)
+            # bulk_update skips the save signals that normally invalidate the catalog cache.
+            bump_catalog_version()
 
         self.stdout.write("\n--- SUMMARY ---")
-        self.stdout.write(f"Uploaded: {uploaded}")
+        self.stdout.write(f"Uploaded: {len(uploaded)}")
+        self.stdout.write(f"Skipped (unchanged): {len(in_bucket)}")
+        self.stdout.write(f"Failed: {failed}")
         self.stdout.write(f"Missing: {missing}")
+        self.stdout.write(f"Doctor rows updated: {len(changed)}")
         self.stdout.write(self.style.SUCCESS("Done."))
+
+    def remote_etags(self, bucket, folder="doctors", page_size=1000):
+        """Map object path -> MD5 eTag for everything already under `folder` in the bucket."""
+        etags = {}
+        offset = 0
+        while True:
+            try:
+                page = bucket.list(folder, {"limit": page_size, "offset": offset})
+            except Exception as e:
+                self.stdout.write(self.style.WARNING(f"Could not list bucket, relying on manifest only: {e}"))
+                return etags
+            for item in page:
+                etag = (item.get("metadata") or {}).get("eTag")
+                if etag:
+                    etags[f"{folder}/{item['name']}"] = etag.strip('"')
+            if len(page) < page_size:
+                return etags
+            offset += page_size
@@ -0,0 +1,276 @@
+# accounts/metrics.py
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden, HttpResponseNotFound
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from backend.database import pool_stats
+
+# Per-request timings, Server-Timing headers and a Prometheus /metrics page.
+#
+# Counters live in this process. Under several gunicorn/uvicorn workers each
+# worker reports its own; Prometheus sums them when it scrapes every worker
+# (or the numbers are read per worker). The hot path is a few perf_counter()
+# calls and one locked dict update per request.
+
+# Prometheus' default latency buckets, in seconds.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+UNMATCHED_VIEW = "unmatched"
+
+current = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    __slots__ = ("queries", "db", "serializer", "serializing")
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.serializer = 0.0
+        self.serializing = False
+
+
+class ViewMetrics:
+    __slots__ = ("requests", "buckets", "duration", "queries", "db", "serializer")
+
+    def __init__(self):
+        self.requests = {}  # (method, status) -> count
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # the last one is +Inf
+        self.duration = 0.0
+        self.queries = 0
+        self.db = 0.0
+        self.serializer = 0.0
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+
+    def observe(self, view, method, status, duration, timings):
+        with self.lock:
+            metrics = self.views.get(view)
+            if metrics is None:
+                metrics = self.views[view] = ViewMetrics()
+            metrics.requests[method, status] = metrics.requests.get((method, status), 0) + 1
+            metrics.buckets[bisect.bisect_left(LATENCY_BUCKETS, duration)] += 1
+            metrics.duration += duration
+            metrics.queries += timings.queries
+            metrics.db += timings.db
+            metrics.serializer += timings.serializer
+
+    def reset(self):
+        with self.lock:
+            self.views.clear()
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format."""
+        with self.lock:
+            views = sorted(self.views.items())
+            requests, histogram, totals = [], [], []
+            for view, metrics in views:
+                name = escape(view)
+                for (method, status), count in sorted(metrics.requests.items()):
+                    requests.append(
+                        f'django_http_requests_total{{view="{name}",method="{method}",status="{status}"}} {count}'
+                    )
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), metrics.buckets):
+                    cumulative += count
+                    histogram.append(f'django_http_request_duration_seconds_bucket{{view="{name}",le="{bound}"}} {cumulative}')
+                histogram.append(f'django_http_request_duration_seconds_sum{{view="{name}"}} {metrics.duration:.6f}')
+                histogram.append(f'django_http_request_duration_seconds_count{{view="{name}"}} {cumulative}')
+                totals.append((name, metrics))
+
+        lines = [
+            "# HELP django_http_requests_total Requests by resolved view, method and status.",
+            "# TYPE django_http_requests_total counter",
+            *requests,
+            "# HELP django_http_request_duration_seconds Time spent in the Django middleware stack and view.",
+            "# TYPE django_http_request_duration_seconds histogram",
+            *histogram,
+        ]
+        for metric, help_text, value in (
+            ("django_http_db_queries_total", "Database queries run while handling requests.", lambda m: m.queries),
+            ("django_http_db_duration_seconds_total", "Time spent in database queries.", lambda m: f"{m.db:.6f}"),
+            ("django_http_serializer_duration_seconds_total", "Time spent building and rendering response data.",
+             lambda m: f"{m.serializer:.6f}"),
+        ):
+            lines.append(f"# HELP {metric} {help_text}")
+            lines.append(f"# TYPE {metric} counter")
+            lines.extend(f'{metric}{{view="{name}"}} {value(metrics)}' for name, metrics in totals)
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+# psycopg_pool stat -> (metric, type, help). Counters the pool has not
+# incremented yet are missing from its stats and reported as 0.
+POOL_METRICS = {
+    "pool_max": ("django_db_pool_max_connections", "gauge", "Most connections the pool may open."),
+    "pool_size": ("django_db_pool_connections", "gauge", "Connections the pool holds, busy or idle."),
+    "pool_available": ("django_db_pool_idle_connections", "gauge", "Idle connections ready to lend."),
+    "requests_waiting": ("django_db_pool_waiting_requests", "gauge", "Requests queued for a connection now."),
+    "requests_num": ("django_db_pool_requests_total", "counter", "Connections requested from the pool."),
+    "requests_queued": ("django_db_pool_queued_requests_total", "counter",
+                        "Requests that had to wait for a connection."),
+    "requests_errors": ("django_db_pool_request_errors_total", "counter",
+                        "Requests that timed out waiting for a connection."),
+    "connections_num": ("django_db_pool_connects_total", "counter", "Server connections the pool opened."),
+    "connections_lost": ("django_db_pool_lost_connections_total", "counter",
+                         "Connections that failed the checkout health check."),
+}
+
+
+def render_pool_stats(stats):
+    """Connection-pool saturation, one series per pooled database alias."""
+    lines = []
+    for key, (metric, kind, help_text) in POOL_METRICS.items():
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.extend(f'{metric}{{alias="{escape(alias)}"}} {values.get(key, 0)}' for alias, values in sorted(stats.items()))
+    lines.append("# HELP django_db_pool_wait_seconds_total Time requests spent waiting for a connection.")
+    lines.append("# TYPE django_db_pool_wait_seconds_total counter")
+    lines.extend(
+        f'django_db_pool_wait_seconds_total{{alias="{escape(alias)}"}} {values.get("requests_wait_ms", 0) / 1000:.3f}'
+        for alias, values in sorted(stats.items())
+    )
+    return "\n".join(lines) + "\n"
+
+
+def escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# -------------------- HOOKS --------------------
+
+def time_queries(execute, sql, params, many, context):
+    """Execute wrapper on every connection; counts only while a request is being measured."""
+    timings = current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    began = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.db += time.perf_counter() - began
+        timings.queries += 1
+
+
+def install_query_timer(sender, connection, **kwargs):
+    if time_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_queries)
+
+
+@contextmanager
+def serializing():
+    """
+    Count the block as the current request's serializer time: building response
+    data (ProjectionMixin, the async views) and rendering it (FastJSONRenderer).
+    Nested blocks count once, at the outermost; outside a request it does nothing.
+    """
+    timings = current.get()
+    if timings is None or timings.serializing:
+        yield
+        return
+    timings.serializing = True
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.serializer += time.perf_counter() - began
+        timings.serializing = False
+
+
+def install():
+    """Hook database timing; called once from AccountsConfig.ready()."""
+    connection_created.connect(install_query_timer, dispatch_uid="accounts.metrics")
+    for connection in connections.all(initialized_only=True):
+        install_query_timer(None, connection)
+
+
+# -------------------- MIDDLEWARE --------------------
+
+class MetricsMiddleware:
+    """
+    Time each request, count its queries and serializer work, record them
+    under the resolved view name and describe them in a Server-Timing header.
+
+    Serializer work is what runs inside serializing(): the projection read
+    paths and FastJSONRenderer. Views that build and render their data with
+    plain DRF serializers and renderers report none.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, "SERVER_TIMING_HEADER", False)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = current.set(timings)
+        began = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - began)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = current.set(timings)
+        began = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - began)
+
+    def finish(self, request, response, timings, duration):
+        match = getattr(request, "resolver_match", None)
+        view = match.view_name if match else UNMATCHED_VIEW
+        registry.observe(view, request.method, response.status_code, duration, timings)
+        if self.server_timing:
+            response["Server-Timing"] = (
+                f'app;dur={duration * 1000:.1f}, '
+                f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries", '
+                f'ser;dur={timings.serializer * 1000:.1f}'
+            )
+        return response
+
+
+# -------------------- ENDPOINT --------------------
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus scrape target. Requires `Authorization: Bearer <METRICS_TOKEN>`;
+    without a token it is only served with DEBUG on.
+    """
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseNotFound()
+    elif not constant_time_compare(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return HttpResponseForbidden()
+    body = registry.render()
+    stats = pool_stats(connections)
+    if stats:
+        body += render_pool_stats(stats)
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
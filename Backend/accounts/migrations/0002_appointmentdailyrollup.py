@@ -0,0 +1,55 @@
+# Generated by Django 5.2.6 on 2026-10-17 11:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    Appointment = apps.get_model('accounts', 'Appointment')
+    AppointmentDailyRollup = apps.get_model('accounts', 'AppointmentDailyRollup')
+    rows = (
+        Appointment.objects.annotate(day=TruncDate('created_at'))
+        .values('day', 'doctor__department_id', 'status')
+        .annotate(n=Count('id'), total=Sum('amount'))
+        .order_by()
+    )
+    AppointmentDailyRollup.objects.bulk_create(
+        [
+            AppointmentDailyRollup(
+                day=row['day'],
+                department_id=row['doctor__department_id'],
+                status=row['status'],
+                count=row['n'],
+                revenue=row['total'] or 0,
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppointmentDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('paid', 'Paid'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('department', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='appointment_rollups', to='accounts.department')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'department', 'status'), name='uniq_rollup_day_department_status')],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
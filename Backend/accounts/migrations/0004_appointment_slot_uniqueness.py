@@ -0,0 +1,81 @@
+# Generated by Django 5.2.6 on 2026-10-17 11:18
+
+from django.db import migrations, models
+from django.db.models import Case, Count, Q, Sum, Value, When
+from django.db.models.functions import TruncDate
+
+# As accounts.views.REFUND_PENDING: a cancelled booking whose payment is owed back.
+REFUND_PENDING = 'REFUND_PENDING'
+PAID = Q(status='paid') | Q(payment_status='COMPLETED')
+
+
+def cancel_double_bookings(apps, schema_editor):
+    """
+    Existing double bookings would block the new constraint. Keep one booking
+    for each slot, a paid one if there is one and otherwise the earliest, and
+    mark the rest cancelled with an audit note (and, when paid, for refund).
+    Then rebuild the appointment rollups, which signals do not maintain here.
+    """
+    Appointment = apps.get_model('accounts', 'Appointment')
+    AppointmentDailyRollup = apps.get_model('accounts', 'AppointmentDailyRollup')
+
+    clashes = (
+        Appointment.objects.exclude(status='cancelled')
+        .values('doctor_id', 'date_time')
+        .annotate(n=Count('id'))
+        .filter(n__gt=1)
+    )
+    changed = False
+    for clash in clashes:
+        bookings = list(
+            Appointment.objects.exclude(status='cancelled')
+            .filter(doctor_id=clash['doctor_id'], date_time=clash['date_time'])
+            .annotate(paid=Case(When(PAID, then=Value(True)), default=Value(False)))
+            .order_by('-paid', 'created_at', 'id')
+        )
+        kept = bookings[0]
+        for booking in bookings[1:]:
+            booking.status = 'cancelled'
+            booking.notes = f"{booking.notes or ''}\n[Auto-cancelled: slot already held by appointment #{kept.pk}]".strip()
+            if booking.paid:
+                booking.payment_status = REFUND_PENDING
+            booking.save(update_fields=['status', 'notes', 'payment_status'])
+            changed = True
+
+    if not changed:
+        return
+    rows = (
+        Appointment.objects.annotate(day=TruncDate('created_at'))
+        .values('day', 'doctor__department_id', 'status')
+        .annotate(n=Count('id'), total=Sum('amount'))
+        .order_by()
+    )
+    AppointmentDailyRollup.objects.all().delete()
+    AppointmentDailyRollup.objects.bulk_create(
+        [
+            AppointmentDailyRollup(
+                day=row['day'],
+                department_id=row['doctor__department_id'],
+                status=row['status'],
+                count=row['n'],
+                revenue=row['total'] or 0,
+            )
+            for row in rows
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_doctor_availability'),
+    ]
+
+    operations = [
+        migrations.RunPython(cancel_double_bookings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'cancelled'), _negated=True), fields=('doctor', 'date_time'), name='uniq_active_appointment_per_slot'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-17 11:20
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_appointment_slot_uniqueness'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='userpasswordresettoken',
+            name='created',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['-created_at', '-id'], name='appointment_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['patient', '-created_at', '-id'], name='appointment_patient_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['doctor', 'date_time'], name='appointment_doctor_time_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='appointment',
+            index=models.Index(fields=['status', 'created_at'], name='appointment_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='department',
+            index=models.Index(django.db.models.functions.text.Upper('name'), name='department_name_upper_idx'),
+        ),
+    ]
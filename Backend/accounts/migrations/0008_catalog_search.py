@@ -0,0 +1,103 @@
+# Generated by Django 5.2.6 on 2026-10-17 11:32
+
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+FTS_TABLE = 'accounts_searchentry_fts'
+
+
+def postgres_indexes():
+    return [
+        GinIndex(SearchVector('document', config='simple'), name='search_entry_document_fts'),
+        GinIndex(fields=['document'], name='search_entry_document_trgm', opclasses=['gin_trgm_ops']),
+    ]
+
+
+def create_search_indexes(apps, schema_editor):
+    SearchEntry = apps.get_model('accounts', 'SearchEntry')
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for index in postgres_indexes():
+            schema_editor.add_index(SearchEntry, index)
+    elif vendor == 'sqlite':
+        # External-content FTS5 table kept in step with accounts_searchentry by triggers.
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            f"document, content='accounts_searchentry', content_rowid='id', tokenize='trigram')"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON accounts_searchentry BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.id, new.document); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON accounts_searchentry BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.id, old.document); END"
+        )
+        schema_editor.execute(
+            f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE ON accounts_searchentry BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, document) VALUES ('delete', old.id, old.document); "
+            f"INSERT INTO {FTS_TABLE}(rowid, document) VALUES (new.id, new.document); END"
+        )
+
+
+def drop_search_indexes(apps, schema_editor):
+    SearchEntry = apps.get_model('accounts', 'SearchEntry')
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        for index in postgres_indexes():
+            schema_editor.remove_index(SearchEntry, index)
+    elif vendor == 'sqlite':
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{suffix}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+def backfill_search_entries(apps, schema_editor):
+    Department = apps.get_model('accounts', 'Department')
+    Doctor = apps.get_model('accounts', 'Doctor')
+    SearchEntry = apps.get_model('accounts', 'SearchEntry')
+
+    def document(*parts):
+        return ' '.join(part for part in parts if part)
+
+    entries = [
+        SearchEntry(kind='department', object_id=department.pk, document=document(department.name, department.description))
+        for department in Department.objects.all()
+    ] + [
+        SearchEntry(
+            kind='doctor',
+            object_id=doctor.pk,
+            document=document(
+                doctor.name, doctor.specialization, doctor.education,
+                doctor.department.name if doctor.department_id else None,
+            ),
+        )
+        for doctor in Doctor.objects.select_related('department')
+    ]
+    SearchEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_user_email_upper_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('doctor', 'Doctor'), ('department', 'Department')], max_length=20)),
+                ('object_id', models.PositiveIntegerField()),
+                ('document', models.TextField()),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id'), name='uniq_search_entry_object')],
+            },
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+        migrations.RunPython(backfill_search_entries, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-17 12:38
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def detach_duplicate_payments(apps, schema_editor):
+    """
+    Before verify_payment was idempotent a retried verification could book a
+    payment twice. Leave each payment on one booking, a live one if there is
+    one and otherwise the earliest, and move it off the others into an audit
+    note.
+    """
+    Appointment = apps.get_model('accounts', 'Appointment')
+
+    duplicates = (
+        Appointment.objects.exclude(payment_id=None)
+        .values('patient_id', 'payment_id')
+        .annotate(n=Count('id'))
+        .filter(n__gt=1)
+    )
+    for duplicate in duplicates:
+        bookings = sorted(
+            Appointment.objects.filter(patient_id=duplicate['patient_id'], payment_id=duplicate['payment_id'])
+            .order_by('created_at', 'id'),
+            key=lambda booking: booking.status == 'cancelled',
+        )
+        kept = bookings[0]
+        for booking in bookings[1:]:
+            booking.notes = (
+                f"{booking.notes or ''}\n[Payment {booking.payment_id} is recorded on appointment #{kept.pk}]"
+            ).strip()
+            booking.payment_id = None
+            booking.save(update_fields=['payment_id', 'notes'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_catalog_search'),
+    ]
+
+    operations = [
+        migrations.RunPython(detach_duplicate_payments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('payment_id__isnull', False)), fields=('patient', 'payment_id'), name='uniq_appointment_per_payment'),
+        ),
+    ]
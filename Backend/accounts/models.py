@@ -1,6 +1,7 @@
 # accounts/models.py
 import os
 from django.db import models
+from django.db.models.functions import Upper
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.conf import settings
 from django.utils.timezone import now
@@ -28,6 +29,19 @@ class CustomUserManager(BaseUserManager):
 
         return self.create_user(email, password, **extra_fields)
 
+    def get_by_email(self, email):
+        """
+        The user with `email`, ignoring case (served by the UPPER(email) index).
+        An exact-case match wins if legacy rows differ only by case.
+        """
+        candidates = list(self.filter(email__iexact=email)[:2])
+        if not candidates:
+            raise self.model.DoesNotExist(f"No user with email {email!r}.")
+        return next((user for user in candidates if user.email == email), candidates[0])
+
+    def get_by_natural_key(self, email):
+        return self.get_by_email(email)
+
 # -------------------- USER MODEL --------------------
 class User(AbstractBaseUser, PermissionsMixin):
     email = models.EmailField(unique=True)
@@ -47,6 +61,12 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     objects = CustomUserManager()
 
+    class Meta:
+        indexes = [
+            # Login looks users up with email__iexact, which Postgres runs as UPPER(email).
+            models.Index(Upper("email"), name="user_email_upper_idx"),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -60,6 +80,12 @@ class Department(models.Model):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            # DoctorViewSet filters on department__name__iexact, which Postgres runs as UPPER(name).
+            models.Index(Upper("name"), name="department_name_upper_idx"),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -80,13 +106,59 @@ class Doctor(models.Model):
     rating = models.FloatField(default=0)
     patients_count = models.IntegerField(default=0)
     profile_image = models.ImageField(upload_to=doctor_upload_path, blank=True, null=True)
+    # Resized copies of profile_image, maintained by accounts/images.py.
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
 
-    
 
     def __str__(self):
         return self.name
 
 
+# -------------------- DOCTOR AVAILABILITY --------------------
+class DoctorAvailability(models.Model):
+    """A recurring weekly window in which a doctor takes bookings, split into fixed-length slots."""
+    WEEKDAY_CHOICES = [
+        (0, "Monday"),
+        (1, "Tuesday"),
+        (2, "Wednesday"),
+        (3, "Thursday"),
+        (4, "Friday"),
+        (5, "Saturday"),
+        (6, "Sunday"),
+    ]
+
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name="availability_windows")
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAY_CHOICES)
+    start_time = models.TimeField()
+    end_time = models.TimeField()
+    slot_minutes = models.PositiveSmallIntegerField(default=30)
+
+    class Meta:
+        ordering = ["doctor", "weekday", "start_time"]
+        constraints = [
+            models.CheckConstraint(condition=models.Q(end_time__gt=models.F("start_time")), name="availability_end_after_start"),
+            models.CheckConstraint(condition=models.Q(slot_minutes__gt=0), name="availability_positive_slot"),
+        ]
+
+    def __str__(self):
+        return f"{self.doctor.name} {self.get_weekday_display()} {self.start_time}-{self.end_time}"
+
+
+class AvailabilityException(models.Model):
+    """A date on which a doctor is unavailable, either all day or between start_time and end_time."""
+    doctor = models.ForeignKey(Doctor, on_delete=models.CASCADE, related_name="availability_exceptions")
+    date = models.DateField()
+    start_time = models.TimeField(blank=True, null=True)
+    end_time = models.TimeField(blank=True, null=True)
+    reason = models.CharField(max_length=200, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["doctor", "date"])]
+
+    def __str__(self):
+        return f"{self.doctor.name} off {self.date}"
+
+
 # -------------------- APPOINTMENT --------------------
 class Appointment(models.Model):
     STATUS_CHOICES = [
@@ -110,13 +182,91 @@ class Appointment(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="appointment_created_idx"),
+            models.Index(fields=["patient", "-created_at", "-id"], name="appointment_patient_idx"),
+            models.Index(fields=["doctor", "date_time"], name="appointment_doctor_time_idx"),
+            models.Index(fields=["status", "created_at"], name="appointment_status_created_idx"),
+        ]
+        constraints = [
+            # One live booking per doctor and start time; cancelled rows free the slot.
+            models.UniqueConstraint(
+                fields=["doctor", "date_time"],
+                condition=~models.Q(status="cancelled"),
+                name="uniq_active_appointment_per_slot",
+            ),
+            # One booking per captured payment; verify_payment retries find it.
+            models.UniqueConstraint(
+                fields=["patient", "payment_id"],
+                condition=models.Q(payment_id__isnull=False),
+                name="uniq_appointment_per_payment",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.doctor.name} with {self.patient.email} at {self.date_time}"
 
+# -------------------- APPOINTMENT DAILY ROLLUP --------------------
+class AppointmentDailyRollup(models.Model):
+    """
+    Per-day, per-department, per-status appointment count and revenue.
+
+    Kept current by the Appointment signal handlers in accounts/signals.py;
+    bulk writes bypass them, so run `manage.py rebuild_appointment_rollups`
+    after any bulk import or manual data fix.
+    """
+    day = models.DateField()
+    department = models.ForeignKey(
+        Department, on_delete=models.SET_NULL, null=True, related_name="appointment_rollups"
+    )
+    status = models.CharField(max_length=20, choices=Appointment.STATUS_CHOICES)
+    count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "department", "status"], name="uniq_rollup_day_department_status"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.department_id} {self.status}: {self.count}"
+
+
+# -------------------- CATALOG SEARCH ENTRY --------------------
+class SearchEntry(models.Model):
+    """
+    One searchable document per doctor and per department.
+
+    Kept current by the signal handlers in accounts/signals.py; run
+    `manage.py rebuild_search_index` after bulk writes. The full-text and
+    trigram indexes are database specific and live in migration 0008 rather
+    than in Meta (see accounts/search.py).
+    """
+    KIND_CHOICES = [
+        ("doctor", "Doctor"),
+        ("department", "Department"),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    document = models.TextField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id"], name="uniq_search_entry_object"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
+
+
 class UserPasswordResetToken(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     token = models.CharField(max_length=100, unique=True)
-    created = models.DateTimeField(auto_now_add=True)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
 
     def __str__(self):
         return f"{self.user.email} - {self.token}"
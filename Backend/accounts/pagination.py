@@ -0,0 +1,34 @@
+# accounts/pagination.py
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination for the accounts list endpoints.
+
+    Views choose their sort keys with a `cursor_ordering` attribute, which
+    should be backed by an index. Older clients that expect the whole list as
+    a bare array can pass `?paginate=false`.
+
+    apaginate_queryset() is the same for the async views (accounts/async_views.py).
+    """
+    page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE") or 50
+    page_size_query_param = "page_size"
+    max_page_size = getattr(settings, "API_MAX_PAGE_SIZE", 200)
+    ordering = ("-id",)
+    unpaginated_query_param = "paginate"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.unpaginated_query_param, "").lower() in ("false", "0", "no"):
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        # The async ORM runs its queries in the sync thread as well; this makes
+        # the same one hop, around DRF's page walk and its one query.
+        return await sync_to_async(self.paginate_queryset)(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        return tuple(getattr(view, "cursor_ordering", self.ordering))
@@ -0,0 +1,235 @@
+# accounts/projections.py
+from operator import itemgetter
+
+from rest_framework import serializers
+from rest_framework.generics import get_object_or_404
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+
+from .metrics import serializing
+from .renderers import FastJSONRenderer
+from .serializers import profile_image_url, profile_image_variant_urls
+
+# Read-side twins of DepartmentSerializer, DoctorSerializer, AppointmentSerializer
+# and UserSerializer. They fetch only the columns those serializers print, as
+# .values() dicts, and build the same dicts (same keys, order and value
+# formats) without model instances or per-row field machinery.
+# accounts/tests.py compares their output with the serializers' byte for byte.
+#
+# Clients can ask for less, and for related objects in full:
+#
+#   ?fields=id,date_time,doctor.name   only these keys; dotted names pick keys
+#                                      inside a related object
+#   ?expand=doctor.department          print these relations as objects rather
+#                                      than ids
+#
+# and the query then selects (and joins) only what those keys are built from.
+
+# DRF's own formatting for the two types whose text depends on settings
+# (DATETIME_FORMAT, TIME_ZONE, COERCE_DECIMAL_TO_STRING).
+datetime_field = serializers.DateTimeField()
+amount_field = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+
+def datetime_text(value):
+    return None if value is None else datetime_field.to_representation(value)
+
+
+def amount_text(value):
+    return None if value is None else amount_field.to_representation(value)
+
+
+def full_name(first_name, last_name):
+    return f"{first_name} {last_name}".strip()
+
+
+def field(*columns, build=None):
+    """An output key read from `columns`: the first column as is, or `build(*values)`."""
+    return columns, build
+
+
+def parse_fieldset(value):
+    """"id,doctor.name,doctor.id" -> {"id": {}, "doctor": {"name": {}, "id": {}}}; None when absent or empty."""
+    tree = {}
+    for path in (value or "").split(","):
+        node = tree
+        for part in path.strip().split("."):
+            if part:
+                node = node.setdefault(part, {})
+    return tree or None
+
+
+class Projection:
+    """
+    Builds serializer-shaped dicts from .values() rows.
+
+    `fields` maps each output key, in output order, to the field() it is built
+    from. `relations` maps the keys that can also be printed as a nested
+    object to (projection class, nested by default); their `fields` entry is
+    the foreign key column.
+
+    `only` and `expand` are parse_fieldset() trees from ?fields= and ?expand=.
+    """
+
+    fields = {}
+    relations = {}
+
+    def __init__(self, prefix="", only=None, expand=None):
+        self.prefix = prefix
+        path = prefix.replace("__", ".")
+        self.check(only, self.fields, f"Unknown field '{path}{{}}'.", "fields")
+        self.check(expand, self.relations, f"'{path}{{}}' cannot be expanded.", "expand")
+        expand = expand or {}
+
+        self.plan = []
+        columns = []
+        for key, (sources, build) in self.fields.items():
+            if only is not None and key not in only:
+                continue
+            sources = [prefix + source for source in sources]
+            columns.extend(sources)
+            selected = only.get(key) or None if only else None  # None: the whole object
+            if key in self.relations:
+                projection_class, nested = self.relations[key]
+                if nested or selected or key in expand:
+                    child = projection_class(f"{prefix}{key}__", selected, expand.get(key))
+                    columns.extend(child.columns)
+                    self.plan.append((key, self.nested_getter(sources[0], child)))
+                    continue
+            elif selected:
+                raise serializers.ValidationError({"fields": [f"'{path}{key}' has no fields to select."]})
+            self.plan.append((key, self.getter(sources, build)))
+        self.columns = tuple(dict.fromkeys(columns))
+
+    @staticmethod
+    def check(tree, known, message, parameter):
+        unknown = [name for name in tree or () if name not in known]
+        if unknown:
+            raise serializers.ValidationError({parameter: [message.format(name) for name in unknown]})
+
+    @staticmethod
+    def getter(sources, build):
+        if build is None:
+            return itemgetter(sources[0])
+        return lambda row: build(*[row[source] for source in sources])
+
+    @staticmethod
+    def nested_getter(foreign_key, child):
+        return lambda row: None if row[foreign_key] is None else child.represent(row)
+
+    def select(self, fields=None, expand=None):
+        """This projection narrowed to the raw ?fields= and ?expand= values."""
+        if not fields and not expand:
+            return self
+        return type(self)(self.prefix, parse_fieldset(fields), parse_fieldset(expand))
+
+    def values(self, queryset, ordering=()):
+        """`queryset` as .values() rows with this projection's columns, plus any `ordering` keys it lacks."""
+        columns = self.columns + tuple(
+            key for key in (order.lstrip("-") for order in ordering) if key not in self.columns
+        )
+        return queryset.values(*columns)
+
+    def represent(self, row):
+        return {key: get(row) for key, get in self.plan}
+
+    def many(self, rows):
+        represent = self.represent
+        return [represent(row) for row in rows]
+
+
+class DepartmentProjection(Projection):
+    fields = {
+        "id": field("id"),
+        "name": field("name"),
+        "description": field("description"),
+    }
+
+
+class DoctorProjection(Projection):
+    fields = {
+        "id": field("id"),
+        "profile_image": field("profile_image", build=profile_image_url),
+        "profile_image_variants": field("profile_image", "image_variants", build=profile_image_variant_urls),
+        "name": field("name"),
+        "specialization": field("specialization"),
+        "education": field("education"),
+        "experience": field("experience"),
+        "availability": field("availability"),
+        "rating": field("rating"),
+        "patients_count": field("patients_count"),
+        "department": field("department"),
+    }
+    relations = {"department": (DepartmentProjection, False)}
+
+
+class UserProjection(Projection):
+    fields = {
+        "id": field("id"),
+        "email": field("email"),
+        "first_name": field("first_name"),
+        "last_name": field("last_name"),
+        "full_name": field("first_name", "last_name", build=full_name),
+        "is_active": field("is_active"),
+        "date_joined": field("date_joined", build=datetime_text),
+        "last_login": field("last_login", build=datetime_text),
+    }
+
+
+class AppointmentProjection(Projection):
+    fields = {
+        "id": field("id"),
+        "doctor": field("doctor"),
+        "patient": field("patient"),
+        "patient_email": field("patient__email"),
+        "date_time": field("date_time", build=datetime_text),
+        "notes": field("notes"),
+        "status": field("status"),
+        "payment_id": field("payment_id"),
+        "payment_status": field("payment_status"),
+        "payer_email": field("payer_email"),
+        "amount": field("amount", build=amount_text),
+        "created_at": field("created_at", build=datetime_text),
+    }
+    relations = {"doctor": (DoctorProjection, True), "patient": (UserProjection, False)}
+
+
+class ProjectionMixin:
+    """
+    Serve list and retrieve from `projection` over .values() rows instead of
+    model instances and `serializer_class`, rendered with orjson, honouring
+    ?fields= and ?expand=. Writes and other actions still use
+    `serializer_class`.
+    """
+
+    projection = None
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get_projection(self):
+        params = self.request.query_params
+        return self.projection.select(params.get("fields"), params.get("expand"))
+
+    def projected_queryset(self, projection):
+        queryset = self.filter_queryset(self.get_queryset())
+        return projection.values(queryset, getattr(self, "cursor_ordering", ()))
+
+    def list(self, request, *args, **kwargs):
+        projection = self.get_projection()
+        queryset = self.projected_queryset(projection)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            with serializing():
+                return self.get_paginated_response(projection.many(page))
+        rows = list(queryset)
+        with serializing():
+            return Response(projection.many(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        projection = self.get_projection()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(
+            self.projected_queryset(projection), **{self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        )
+        self.check_object_permissions(request, row)
+        with serializing():
+            return Response(projection.represent(row))
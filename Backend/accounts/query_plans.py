@@ -0,0 +1,78 @@
+# accounts/query_plans.py
+import re
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils.timezone import now
+
+from .models import Appointment, Doctor, User, UserPasswordResetToken
+from .search import postgresql_queryset
+
+
+# -------------------- HOT QUERIES --------------------
+# The filters and orderings accounts/views.py runs on every request. Each entry
+# builds a queryset without touching the database; ids are placeholders since
+# the plan does not depend on them.
+
+def hot_queries():
+    recent = now() - timedelta(days=30)
+    return [
+        ("appointments: staff list", lambda: Appointment.objects.select_related("doctor", "patient")
+            .order_by("-created_at", "-id")[:50]),
+        ("appointments: patient list", lambda: Appointment.objects.select_related("doctor", "patient")
+            .filter(patient_id=1).order_by("-created_at", "-id")[:50]),
+        ("appointments: doctor schedule", lambda: Appointment.objects
+            .filter(doctor_id=1, date_time__gte=recent, date_time__lt=now())
+            .exclude(status="cancelled").values_list("doctor_id", "date_time")),
+        ("appointments: paid revenue", lambda: Appointment.objects
+            .filter(status="paid", created_at__gte=recent).values("status").annotate(total=Sum("amount"))),
+        ("appointments: recent for admin stats", lambda: Appointment.objects.order_by("-created_at")[:5]),
+        ("doctors: by department name", lambda: Doctor.objects.filter(department__name__iexact="cardiology"),
+            ["postgresql"]),
+        ("users: by email", lambda: User.objects.filter(email="patient@hope.com")),
+        ("users: login by email", lambda: User.objects.filter(email__iexact="Patient@Hope.com"),
+            ["postgresql"]),
+        ("search: catalog", lambda: postgresql_queryset(["cardio"])[:10], ["postgresql"]),
+        ("reset tokens: recent", lambda: UserPasswordResetToken.objects.filter(created__gte=recent)),
+    ]
+
+
+# -------------------- PLAN INSPECTION --------------------
+
+def explain(queryset):
+    """
+    EXPLAIN `queryset` on the default connection.
+
+    On PostgreSQL sequential scans are disabled for the duration, so the
+    planner only falls back to one when no usable index exists, whatever the
+    table size.
+    """
+    if connection.vendor == "postgresql":
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain()
+    return queryset.explain()
+
+
+def sequential_scans(plan):
+    """Return the tables a textual plan reads with a full sequential scan."""
+    if connection.vendor == "postgresql":
+        return re.findall(r"Seq Scan on (\w+)", plan)
+    if connection.vendor == "sqlite":
+        return [
+            match.group(1)
+            for match in re.finditer(r"\bSCAN (\w+)(.*)", plan)
+            if "USING" not in match.group(2)
+        ]
+    return []
+
+
+def check_hot_query_plans():
+    """Yield (name, plan, scanned_tables) for every hot query that applies to this database."""
+    for name, build, *vendors in hot_queries():
+        if vendors and connection.vendor not in vendors[0]:
+            continue
+        plan = explain(build())
+        yield name, plan, sequential_scans(plan)
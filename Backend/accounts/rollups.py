@@ -0,0 +1,77 @@
+# accounts/rollups.py
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Appointment, AppointmentDailyRollup
+
+
+def appointment_bucket(created_at, department_id, status, amount):
+    """Return the ((day, department_id, status), revenue) bucket an appointment counts towards."""
+    day = timezone.localdate(created_at) if timezone.is_aware(created_at) else created_at.date()
+    return (day, department_id, status), Decimal(amount or 0)
+
+
+def apply_delta(bucket, count, revenue):
+    """Add `count` and `revenue` to a rollup row, creating it on first use."""
+    if not count and not revenue:
+        return
+    day, department_id, status = bucket
+    lookup = {"day": day, "department_id": department_id, "status": status}
+
+    for _ in range(2):
+        row_id = AppointmentDailyRollup.objects.filter(**lookup).values_list("id", flat=True).first()
+        if row_id is not None:
+            AppointmentDailyRollup.objects.filter(id=row_id).update(
+                count=F("count") + count, revenue=F("revenue") + revenue
+            )
+            return
+        try:
+            with transaction.atomic():
+                AppointmentDailyRollup.objects.create(count=count, revenue=revenue, **lookup)
+            return
+        except IntegrityError:
+            # Another writer created the row first; loop round and increment it.
+            continue
+
+
+def move_doctor_buckets(doctor_id, from_department_id, to_department_id):
+    """Move the counts and revenue of a doctor's appointments from one department's rollup rows to another's."""
+    rows = (
+        Appointment.objects.filter(doctor_id=doctor_id)
+        .annotate(day=TruncDate("created_at"))
+        .values("day", "status")
+        .annotate(n=Count("id"), total=Sum("amount"))
+        .order_by()
+    )
+    for row in rows:
+        revenue = row["total"] or Decimal(0)
+        apply_delta((row["day"], from_department_id, row["status"]), -row["n"], -revenue)
+        apply_delta((row["day"], to_department_id, row["status"]), row["n"], revenue)
+
+
+def rebuild_rollups():
+    """Recompute every rollup row from the Appointment table. Returns the number of rows written."""
+    rows = (
+        Appointment.objects.annotate(day=TruncDate("created_at"))
+        .values("day", "doctor__department_id", "status")
+        .annotate(n=Count("id"), total=Sum("amount"))
+        .order_by()
+    )
+    rollups = [
+        AppointmentDailyRollup(
+            day=row["day"],
+            department_id=row["doctor__department_id"],
+            status=row["status"],
+            count=row["n"],
+            revenue=row["total"] or 0,
+        )
+        for row in rows
+    ]
+    with transaction.atomic():
+        AppointmentDailyRollup.objects.all().delete()
+        AppointmentDailyRollup.objects.bulk_create(rollups, batch_size=1000)
+    return len(rollups)
@@ -0,0 +1,175 @@
+# accounts/search.py
+import re
+
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connections, router, transaction
+from django.db.models import F, Q
+
+from .models import Department, Doctor, SearchEntry
+
+# Created by migration 0008: on PostgreSQL a GIN index on SEARCH_VECTOR and a
+# gin_trgm_ops index on document; on SQLite an FTS5 trigram table over document.
+SEARCH_CONFIG = "simple"
+SEARCH_VECTOR = SearchVector("document", config=SEARCH_CONFIG)
+FTS_TABLE = "accounts_searchentry_fts"
+# Minimum trigram similarity for a misspelt word to count as a match
+# (pg_trgm's word_similarity_threshold defaults to a stricter 0.6).
+SIMILARITY_THRESHOLD = 0.3
+# FTS candidates re-scored per SQLite query.
+SQLITE_CANDIDATES = 200
+
+
+# -------------------- DOCUMENTS --------------------
+
+def doctor_document(doctor, department_name=None):
+    parts = [doctor.name, doctor.specialization, doctor.education, department_name]
+    return " ".join(part for part in parts if part)
+
+
+def department_document(department):
+    return " ".join(part for part in (department.name, department.description) if part)
+
+
+def index_doctor(doctor):
+    department_name = doctor.department.name if doctor.department_id else None
+    SearchEntry.objects.update_or_create(
+        kind="doctor", object_id=doctor.pk, defaults={"document": doctor_document(doctor, department_name)}
+    )
+
+
+def index_department(department, doctor_ids=None):
+    """Index `department` and re-index its doctors, whose documents carry its name."""
+    SearchEntry.objects.update_or_create(
+        kind="department", object_id=department.pk, defaults={"document": department_document(department)}
+    )
+    doctors = Doctor.objects.filter(pk__in=doctor_ids) if doctor_ids is not None else department.doctor_set.all()
+    for doctor in doctors.select_related("department"):
+        index_doctor(doctor)
+
+
+def remove_entry(kind, object_id):
+    SearchEntry.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def rebuild_search_index():
+    """Recreate every entry from the Doctor and Department tables. Returns the number of entries."""
+    entries = [
+        SearchEntry(kind="department", object_id=department.pk, document=department_document(department))
+        for department in Department.objects.all()
+    ] + [
+        SearchEntry(
+            kind="doctor",
+            object_id=doctor.pk,
+            document=doctor_document(doctor, doctor.department.name if doctor.department_id else None),
+        )
+        for doctor in Doctor.objects.select_related("department")
+    ]
+    SearchEntry.objects.all().delete()
+    SearchEntry.objects.bulk_create(entries, batch_size=1000)
+    return len(entries)
+
+
+# -------------------- QUERY --------------------
+
+def search_terms(text):
+    return re.findall(r"\w+", text.lower())
+
+
+def search(text, kind=None, limit=10):
+    """
+    Return up to `limit` (kind, object_id) pairs matching `text`, best first.
+
+    Each word also matches as a prefix, so partial input works for
+    autocomplete, and misspelt words still match through trigram similarity.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    using = router.db_for_read(SearchEntry)
+    vendor = connections[using].vendor
+    if vendor == "postgresql":
+        return _search_postgresql(terms, kind, limit, using)
+    if vendor == "sqlite":
+        return _search_sqlite(terms, kind, limit, using)
+    raise NotImplementedError(f"Catalog search does not support {vendor}.")
+
+
+def postgresql_queryset(terms, kind=None):
+    text = " ".join(terms)
+    query = SearchQuery(" & ".join(f"{term}:*" for term in terms), search_type="raw", config=SEARCH_CONFIG)
+    entries = (
+        SearchEntry.objects.annotate(vector=SEARCH_VECTOR)
+        .filter(Q(vector=query) | TrigramWordSimilar(F("document"), text))
+        .annotate(rank=SearchRank(F("vector"), query) + TrigramWordSimilarity(text, "document"))
+        .order_by("-rank", "kind", "object_id")
+    )
+    if kind:
+        entries = entries.filter(kind=kind)
+    return entries
+
+
+def _search_postgresql(terms, kind, limit, using):
+    with transaction.atomic(using), connections[using].cursor() as cursor:
+        cursor.execute("SET LOCAL pg_trgm.word_similarity_threshold = %s", [SIMILARITY_THRESHOLD])
+        return list(postgresql_queryset(terms, kind).using(using).values_list("kind", "object_id")[:limit])
+
+
+def trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def similarity(terms, document):
+    """
+    Mean over `terms` of the best match among the document's words: 1 for a
+    prefix match, otherwise the trigram similarity pg_trgm would compute.
+    """
+    words = search_terms(document)
+    total = 0
+    for term in terms:
+        term_trigrams = trigrams(term)
+        best = 0
+        for word in words:
+            if word.startswith(term):
+                best = 1
+                break
+            word_trigrams = trigrams(word)
+            best = max(best, len(term_trigrams & word_trigrams) / len(term_trigrams | word_trigrams))
+        total += best
+    return total / len(terms)
+
+
+def _search_sqlite(terms, kind, limit, using):
+    # The trigram tokenizer cannot match fewer than three characters; those
+    # words fall back to a prefix scan of the (small) entry table.
+    query_trigrams = sorted({term[i:i + 3] for term in terms for i in range(len(term) - 2)})
+    kind_filter = "AND e.kind = %s" if kind else ""
+    params = [kind] if kind else []
+
+    with connections[using].cursor() as cursor:
+        if not query_trigrams:
+            cursor.execute(
+                f"SELECT e.kind, e.object_id FROM accounts_searchentry e "
+                f"WHERE ' ' || lower(e.document) LIKE %s {kind_filter} "
+                f"ORDER BY e.kind, e.object_id LIMIT %s",
+                [f"% {terms[0]}%", *params, limit],
+            )
+            return [tuple(row) for row in cursor.fetchall()]
+
+        # OR-ing the trigrams lets near-misses through the index; the best bm25
+        # candidates are then scored and cut the way pg_trgm would.
+        match = " OR ".join(f'"{trigram}"' for trigram in query_trigrams)
+        cursor.execute(
+            f"SELECT e.kind, e.object_id, e.document FROM {FTS_TABLE} f "
+            f"JOIN accounts_searchentry e ON e.id = f.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s {kind_filter} "
+            f"ORDER BY bm25({FTS_TABLE}), e.kind, e.object_id LIMIT %s",
+            [match, *params, SQLITE_CANDIDATES],
+        )
+        candidates = cursor.fetchall()
+
+    # sorted() is stable, so equal scores keep their bm25 order.
+    scored = [(similarity(terms, document), kind, object_id) for kind, object_id, document in candidates]
+    ranked = sorted((entry for entry in scored if entry[0] >= SIMILARITY_THRESHOLD), key=lambda entry: -entry[0])
+    return [(kind, object_id) for _, kind, object_id in ranked[:limit]]
@@ -2,7 +2,11 @@ from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 from django.contrib.auth import authenticate
 from .models import User, Department, Doctor, Appointment
+from .availability import MAX_SEARCH_DAYS
+from .analytics import GRANULARITIES, DIMENSIONS, MAX_BUCKETS, buckets
 from django.conf import settings
+from django.utils.timezone import localdate
+from datetime import timedelta
 
 # -------------------- USER SERIALIZER --------------------
 class UserSerializer(serializers.ModelSerializer):
@@ -21,6 +25,9 @@ class UserSerializer(serializers.ModelSerializer):
             "last_login",
         ]
         read_only_fields = ["date_joined", "last_login"]
+        extra_kwargs = {
+            "email": {"validators": [UniqueValidator(queryset=User.objects.all(), lookup="iexact")]},
+        }
 
     def get_full_name(self, obj):
         return f"{obj.first_name} {obj.last_name}".strip()
@@ -29,7 +36,8 @@ class UserSerializer(serializers.ModelSerializer):
 # -------------------- REGISTER SERIALIZER --------------------
 class RegisterSerializer(serializers.ModelSerializer):
     email = serializers.EmailField(
-        validators=[UniqueValidator(queryset=User.objects.all(), message="Email already exists")]
+        # Login matches emails case-insensitively, so registration must too.
+        validators=[UniqueValidator(queryset=User.objects.all(), lookup="iexact", message="Email already exists")]
     )
     password = serializers.CharField(write_only=True)
     confirm_password = serializers.CharField(write_only=True)
@@ -78,12 +86,10 @@ class LoginSerializer(serializers.Serializer):
             password=password
         )
 
+        # authenticate() returns None for inactive users as well.
         if not user:
             raise serializers.ValidationError("Invalid credentials")
 
-        if not user.is_active:
-            raise serializers.ValidationError("User account disabled")
-
         attrs["user"] = user
         return attrs
 
@@ -96,18 +102,39 @@ class DepartmentSerializer(serializers.ModelSerializer):
 
 # -------------------- DOCTOR SERIALIZER --------------------
 
+def profile_image_url(name):
+    return f"{settings.SUPABASE_PUBLIC_URL}/{name}" if name else None
+
+
+def profile_image_variant_urls(name, variants):
+    """{"thumbnail": {"width", "height", "webp", "jpeg"}, "card": ..., "full": ...} as public URLs."""
+    variants = variants or {}
+    if not name or variants.get("source") != name:
+        return None
+
+    return {
+        size: {
+            key: f"{settings.SUPABASE_PUBLIC_URL}/{value}" if key in ("webp", "jpeg") else value
+            for key, value in entry.items()
+        }
+        for size, entry in variants.items()
+        if size != "source"
+    }
+
+
 class DoctorSerializer(serializers.ModelSerializer):
     profile_image = serializers.SerializerMethodField()
+    profile_image_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = Doctor
-        fields = "__all__"
+        exclude = ["image_variants"]
 
     def get_profile_image(self, obj):
-        if not obj.profile_image:
-            return None
+        return profile_image_url(obj.profile_image.name)
 
-        return f"{settings.SUPABASE_PUBLIC_URL}/{obj.profile_image.name}"
+    def get_profile_image_variants(self, obj):
+        return profile_image_variant_urls(obj.profile_image.name, obj.image_variants)
 
 
 
@@ -146,19 +173,104 @@ class AppointmentSerializer(serializers.ModelSerializer):
             "amount",
             "created_at",
         ]
+        # Slot clashes are left to the database constraint so concurrent
+        # bookings get a 409 from the view instead of racing a pre-check.
+        validators = []
 
     def create(self, validated_data):
         validated_data["patient"] = self.context["request"].user
         return super().create(validated_data)
 
 
+# -------------------- SLOT SEARCH SERIALIZER --------------------
+class SlotSearchSerializer(serializers.Serializer):
+    doctor = serializers.IntegerField(required=False)
+    department = serializers.CharField(required=False)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if not attrs.get("doctor") and not attrs.get("department"):
+            raise serializers.ValidationError("Pass a doctor or a department.")
+
+        start = attrs.setdefault("start", localdate())
+        end = attrs.setdefault("end", start + timedelta(days=6))
+        if end < start:
+            raise serializers.ValidationError({"end": "End date must not be before start date."})
+        if (end - start).days >= MAX_SEARCH_DAYS:
+            raise serializers.ValidationError({"end": f"Search at most {MAX_SEARCH_DAYS} days at a time."})
+        return attrs
+
+
+# -------------------- CATALOG SEARCH --------------------
+class CatalogSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(min_length=2, max_length=100)
+    type = serializers.ChoiceField(choices=["doctor", "department"], required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=50, default=10)
+
+
+# -------------------- EXPORT FILTERS --------------------
+class ExportFilterSerializer(serializers.Serializer):
+    """Query parameters for the CSV/NDJSON exports; `statuses` comes from the view's context."""
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    status = serializers.CharField(required=False)
+
+    def validate_status(self, value):
+        statuses = [part.strip() for part in value.split(",") if part.strip()]
+        unknown = sorted(set(statuses) - set(self.context["statuses"]))
+        if unknown:
+            raise serializers.ValidationError(f"Unknown status: {', '.join(unknown)}.")
+        return statuses
+
+    def validate(self, attrs):
+        start, end = attrs.get("start"), attrs.get("end")
+        if start and end and end < start:
+            raise serializers.ValidationError({"end": "End date must not be before start date."})
+        return attrs
+
+
+# -------------------- ANALYTICS QUERY --------------------
+# Default ranges end today and cover 30 days, 12 weeks or 12 months.
+DEFAULT_ANALYTICS_SPAN = {"day": 29, "week": 7 * 11, "month": None}
+
+
+class AnalyticsQuerySerializer(serializers.Serializer):
+    granularity = serializers.ChoiceField(choices=GRANULARITIES, default="month")
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    group_by = serializers.CharField(required=False, default="")
+
+    def validate_group_by(self, value):
+        dimensions = [part.strip() for part in value.split(",") if part.strip()]
+        unknown = sorted(set(dimensions) - set(DIMENSIONS))
+        if unknown:
+            raise serializers.ValidationError(f"Unknown dimension: {', '.join(unknown)}.")
+        return list(dict.fromkeys(dimensions))
+
+    def validate(self, attrs):
+        granularity = attrs["granularity"]
+        end = attrs.setdefault("end", localdate())
+        if "start" not in attrs:
+            span = DEFAULT_ANALYTICS_SPAN[granularity]
+            if span is None:
+                attrs["start"] = (end.replace(day=1) - timedelta(days=330)).replace(day=1)
+            else:
+                attrs["start"] = end - timedelta(days=span)
+        if end < attrs["start"]:
+            raise serializers.ValidationError({"end": "End date must not be before start date."})
+        if len(buckets(attrs["start"], end, granularity)) > MAX_BUCKETS:
+            raise serializers.ValidationError({"start": f"Ask for at most {MAX_BUCKETS} {granularity}s at a time."})
+        return attrs
+
+
 # -------------------- RESET PASSWORD SERIALIZER --------------------
 class ResetPasswordSerializer(serializers.Serializer):
     email = serializers.EmailField()
 
     def validate(self, attrs):
         email = attrs.get("email")
-        if not User.objects.filter(email=email).exists():
+        if not User.objects.filter(email__iexact=email).exists():
             raise serializers.ValidationError("No account found with this email.")
         return attrs
 
@@ -174,12 +286,12 @@ class ChangePasswordSerializer(serializers.Serializer):
             raise serializers.ValidationError("Passwords do not match")
         if len(attrs["new_password"]) < 6:
             raise serializers.ValidationError("Password must be at least 6 characters")
-        if not User.objects.filter(email=attrs["email"]).exists():
+        if not User.objects.filter(email__iexact=attrs["email"]).exists():
             raise serializers.ValidationError("No user found with this email")
         return attrs
 
     def save(self):
-        user = User.objects.get(email=self.validated_data["email"])
+        user = User.objects.get_by_email(self.validated_data["email"])
         user.set_password(self.validated_data["new_password"])
         user.save()
         return user
@@ -195,6 +307,20 @@ class AdminStatsSerializer(serializers.Serializer):
     appointments_by_department = serializers.ListField()
     last_12_months_revenue = serializers.ListField()
     recent_appointments = serializers.ListField()
+    throttled_requests = serializers.DictField(child=serializers.IntegerField())
+
+# -------------------- BATCH SERIALIZER --------------------
+class BatchItemSerializer(serializers.Serializer):
+    method = serializers.ChoiceField(choices=["GET", "POST", "PUT", "PATCH", "DELETE"], default="GET")
+    path = serializers.CharField()
+    body = serializers.JSONField(required=False, allow_null=True)
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = BatchItemSerializer(
+        many=True, allow_empty=False, max_length=getattr(settings, "BATCH_MAX_REQUESTS", 20)
+    )
+
 
 class AdminLoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
@@ -0,0 +1,138 @@
+# accounts/signals.py
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .models import Appointment, Department, Doctor, User
+from .rollups import appointment_bucket, apply_delta, move_doctor_buckets
+from .caching import bump_catalog_version, invalidate_cached_user
+from .images import schedule_variant_refresh
+from .search import index_doctor, index_department, remove_entry
+
+
+# -------------------- APPOINTMENT ROLLUPS --------------------
+
+def _department_id(appointment):
+    if Appointment.doctor.is_cached(appointment):
+        return appointment.doctor.department_id
+    return Doctor.objects.filter(pk=appointment.doctor_id).values_list("department_id", flat=True).first()
+
+
+@receiver(pre_save, sender=Appointment)
+def remember_previous_bucket(sender, instance, raw=False, **kwargs):
+    instance._previous_rollup_bucket = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    previous = (
+        Appointment.objects.filter(pk=instance.pk)
+        .values("created_at", "doctor__department_id", "status", "amount")
+        .first()
+    )
+    if previous:
+        instance._previous_rollup_bucket = appointment_bucket(
+            previous["created_at"], previous["doctor__department_id"], previous["status"], previous["amount"]
+        )
+
+
+@receiver(post_save, sender=Appointment)
+def update_rollup_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    bucket, revenue = appointment_bucket(
+        instance.created_at, _department_id(instance), instance.status, instance.amount
+    )
+    previous = getattr(instance, "_previous_rollup_bucket", None)
+    if previous == (bucket, revenue):
+        return
+    if previous:
+        apply_delta(previous[0], -1, -previous[1])
+    apply_delta(bucket, 1, revenue)
+
+
+@receiver(post_delete, sender=Appointment)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    bucket, revenue = appointment_bucket(
+        instance.created_at, _department_id(instance), instance.status, instance.amount
+    )
+    apply_delta(bucket, -1, -revenue)
+
+
+@receiver(pre_save, sender=Doctor)
+def remember_previous_department(sender, instance, raw=False, update_fields=None, **kwargs):
+    instance._previous_department = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and "department" not in update_fields:
+        return
+    instance._previous_department = Doctor.objects.filter(pk=instance.pk).values("department_id").first()
+
+
+@receiver(post_save, sender=Doctor)
+def move_rollups_with_doctor(sender, instance, raw=False, **kwargs):
+    # Rollups are keyed by department, so a doctor's past appointments follow
+    # them to the new one, as rebuild_rollups() would count them.
+    previous = getattr(instance, "_previous_department", None)
+    if raw or previous is None or previous["department_id"] == instance.department_id:
+        return
+    move_doctor_buckets(instance.pk, previous["department_id"], instance.department_id)
+
+
+# -------------------- DOCTOR CATALOG CACHE --------------------
+
+@receiver(post_save, sender=Doctor)
+@receiver(post_delete, sender=Doctor)
+@receiver(post_save, sender=Department)
+@receiver(post_delete, sender=Department)
+def invalidate_doctor_catalog(sender, **kwargs):
+    bump_catalog_version()
+
+
+# -------------------- CATALOG SEARCH INDEX --------------------
+
+@receiver(post_save, sender=Doctor)
+def index_doctor_on_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    index_doctor(instance)
+
+
+@receiver(post_delete, sender=Doctor)
+def remove_doctor_entry(sender, instance, **kwargs):
+    remove_entry("doctor", instance.pk)
+
+
+@receiver(post_save, sender=Department)
+def index_department_on_save(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return
+    index_department(instance, doctor_ids=[] if created else None)
+
+
+@receiver(pre_delete, sender=Department)
+def remember_department_doctors(sender, instance, **kwargs):
+    # SET_NULL clears the doctors' department with a bulk UPDATE, which sends no signals.
+    instance._search_doctor_ids = list(instance.doctor_set.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Department)
+def remove_department_entry(sender, instance, **kwargs):
+    remove_entry("department", instance.pk)
+    for doctor in Doctor.objects.filter(pk__in=getattr(instance, "_search_doctor_ids", [])):
+        index_doctor(doctor)
+
+
+# -------------------- AUTH USER CACHE --------------------
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_auth_user(sender, instance, **kwargs):
+    # Covers password changes, resets and deactivation, which all save the user.
+    invalidate_cached_user(instance.pk)
+
+
+# -------------------- DOCTOR IMAGE VARIANTS --------------------
+
+@receiver(post_save, sender=Doctor)
+def build_doctor_image_variants(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_variant_refresh(instance)
@@ -0,0 +1,102 @@
+# accounts/stats.py
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce
+from django.utils.timezone import localdate
+
+from .models import Appointment, AppointmentDailyRollup, Department, Doctor
+from .throttling import ashed_counts, shed_counts
+
+User = get_user_model()
+
+# The admin dashboard payload, built from five queries by admin_stats_payload()
+# for the DRF view and by aadmin_stats_payload() for the async one.
+
+
+def _user_counts():
+    return {"total_users": Count("id"), "total_patients": Count("id", filter=Q(is_patient=True))}
+
+
+def _month_windows(today):
+    months = []
+    current = (today.replace(day=1) - timedelta(days=330)).replace(day=1)
+    for _ in range(12):
+        next_month = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        months.append((current, next_month))
+        current = next_month
+    return months
+
+
+def _rollup_totals(today, months):
+    # Appointment figures come from the daily rollups (see accounts/rollups.py),
+    # so the dashboard never scans the Appointment table.
+    paid = Q(status="paid")
+    aggregates = {
+        "total_appointments": Sum("count"),
+        "revenue_30d": Sum("revenue", filter=paid & Q(day__gte=today - timedelta(days=30))),
+    }
+    for i, (month_start, month_end) in enumerate(months):
+        aggregates[f"month_{i}"] = Sum("revenue", filter=paid & Q(day__gte=month_start, day__lt=month_end))
+    return aggregates
+
+
+def _by_department():
+    return (
+        Department.objects.annotate(appts=Coalesce(Sum("appointment_rollups__count"), 0))
+        .order_by("-appts")[:6]
+        .values("name", "appts")
+    )
+
+
+def _recent_appointments():
+    return (
+        Appointment.objects.select_related("doctor", "patient").order_by("-created_at")[:5]
+        .values("doctor__name", "patient__email", "date_time", "status", "amount")
+    )
+
+
+def _payload(user_counts, total_doctors, totals, months, by_department, recent, throttled):
+    return {
+        "total_users": user_counts["total_users"],
+        "total_doctors": total_doctors,
+        "total_patients": user_counts["total_patients"],
+        "total_appointments": totals["total_appointments"] or 0,
+        "revenue_30d": totals["revenue_30d"] or 0,
+        "appointments_by_department": by_department,
+        "last_12_months_revenue": [
+            {"month": month_start.strftime("%b %Y"), "revenue": float(totals[f"month_{i}"] or 0)}
+            for i, (month_start, _) in enumerate(months)
+        ],
+        "recent_appointments": recent,
+        "throttled_requests": throttled,
+    }
+
+
+def admin_stats_payload():
+    today = localdate()
+    months = _month_windows(today)
+    return _payload(
+        User.objects.aggregate(**_user_counts()),
+        Doctor.objects.count(),
+        AppointmentDailyRollup.objects.aggregate(**_rollup_totals(today, months)),
+        months,
+        list(_by_department()),
+        list(_recent_appointments()),
+        shed_counts(),
+    )
+
+
+async def aadmin_stats_payload():
+    today = localdate()
+    months = _month_windows(today)
+    return _payload(
+        await User.objects.aaggregate(**_user_counts()),
+        await Doctor.objects.acount(),
+        await AppointmentDailyRollup.objects.aaggregate(**_rollup_totals(today, months)),
+        months,
+        [row async for row in _by_department()],
+        [row async for row in _recent_appointments()],
+        await ashed_counts(),
+    )
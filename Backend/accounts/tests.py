@@ -1,3 +1,2164 @@
-from django.test import TestCase
+import csv
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO, StringIO
+from types import SimpleNamespace
+from itertools import count
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import global_settings, settings
+from django.core import checks
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models import F, QuerySet, Sum
+from django.http import HttpResponse
+from django.test import AsyncRequestFactory, LiveServerTestCase, RequestFactory, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+from django.utils.module_loading import import_string
+from django.utils.functional import SimpleLazyObject
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth.hashers import get_hasher, make_password
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from PIL import Image
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from backend.database import connection_mode
+from backend import settings as project_settings, urls as backend_urls
+from backend.db_routers import STICKY_KEY, ReplicaRouter, ReplicaRoutingMiddleware
+from backend.static_files import AsyncWhiteNoiseMiddleware
+from backend.storage_backends import SupabaseStorage, SupabaseStorageError
+from . import images, metrics
+from . import urls as accounts_urls
+from .caching import AUTH_USER_KEY, CachedCatalogMixin, cached_user
+from .compression import brotli, negotiate_encoding
+from .loadtest import compare, percentile
+from .pagination import KeysetPagination
+from .renderers import FastJSONRenderer
+from .rollups import rebuild_rollups
+from .serializers import AppointmentSerializer, DepartmentSerializer, DoctorSerializer, UserSerializer
+from .query_plans import sequential_scans
+from .stats import admin_stats_payload
+from .views import ForgotPasswordAPIView
+
+from .models import (
+    User, Department, Doctor, Appointment, AppointmentDailyRollup, DoctorAvailability, AvailabilityException, SearchEntry,
+)
+
+
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+# -------------------- QUERY BUDGETS --------------------
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class QueryBudgetTests(APITestCase):
+    """
+    Every endpoint in accounts/urls.py must run a fixed number of queries,
+    however many rows the tables hold. Each budget is checked against a small
+    dataset and again after the tables have grown.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.sequence = count()
+        cls.department = Department.objects.create(name="Cardiology")
+        cls.admin = User.objects.create_superuser(email="admin@hope.com", password="admin-pass")
+        cls.patient = User.objects.create_user(email="patient@hope.com", password="patient-pass")
+        cls.doctor = cls.make_doctor()
+        cls.appointment = Appointment.objects.create(
+            doctor=cls.doctor, patient=cls.patient, date_time="2030-01-01T09:00Z", status="paid", amount=500
+        )
+        # Make sure today's pending rollup row exists, so bookings only increment it.
+        Appointment.objects.create(doctor=cls.doctor, patient=cls.patient, date_time="2030-01-01T10:00Z")
+
+    @classmethod
+    def make_doctor(cls, department=None):
+        n = next(cls.sequence)
+        return Doctor.objects.create(
+            name=f"Doctor {n}",
+            department=department or cls.department,
+            specialization="Cardiologist",
+            education="MBBS",
+            experience="10 years",
+            availability="Mon-Fri",
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def grow(self, rows=5):
+        for _ in range(rows):
+            n = next(self.sequence)
+            department = Department.objects.create(name=f"Department {n}")
+            doctor = self.make_doctor(department)
+            user = User.objects.create_user(email=f"user{n}@hope.com", password="pass1234")
+            for patient in (user, self.patient):
+                Appointment.objects.create(
+                    doctor=doctor, patient=patient, date_time=self.unique_slot(), status="paid", amount=300
+                )
+
+    def assertQueryBudget(self, budget, call, status_code=200):
+        for _ in range(2):
+            with self.assertNumQueries(budget):
+                response = call()
+            self.assertEqual(response.status_code, status_code, getattr(response, "data", None))
+            self.grow()
+
+    def unique_email(self):
+        return f"new{next(self.sequence)}@hope.com"
+
+    def unique_slot(self):
+        return datetime(2030, 2, 1, 9, tzinfo=timezone.utc) + timedelta(minutes=30 * next(self.sequence))
+
+    # ---- auth ----
+
+    def test_register(self):
+        self.assertQueryBudget(2, lambda: self.client.post(reverse("register"), {
+            "email": self.unique_email(),
+            "password": "secret123",
+            "confirm_password": "secret123",
+            "full_name": "New Patient",
+        }), status_code=201)
+
+    def test_login(self):
+        self.assertQueryBudget(1, lambda: self.client.post(
+            reverse("login"), {"email": "patient@hope.com", "password": "patient-pass"}
+        ))
+
+    def test_admin_login(self):
+        self.assertQueryBudget(1, lambda: self.client.post(
+            reverse("admin-login"), {"email": "admin@hope.com", "password": "admin-pass"}
+        ))
+
+    def test_change_password(self):
+        self.client.force_authenticate(self.patient)
+        # Reloads the user rather than saving request.user, a cached snapshot.
+        self.assertQueryBudget(3, lambda: self.client.put(reverse("change-password"), {
+            "email": "patient@hope.com", "new_password": "patient-pass", "confirm_password": "patient-pass",
+        }))
+
+    def test_reset_password(self):
+        self.assertQueryBudget(2, lambda: self.client.post(reverse("reset-password"), {
+            "email": "patient@hope.com", "new_password": "patient-pass", "confirm_password": "patient-pass",
+        }))
+
+    # ---- admin ----
+
+    def test_admin_stats(self):
+        self.client.force_authenticate(self.admin)
+        self.assertQueryBudget(5, lambda: self.client.get(reverse("admin-stats")))
+
+    def test_user_list(self):
+        self.client.force_authenticate(self.admin)
+        self.assertQueryBudget(1, lambda: self.client.get(reverse("user-list")))
+
+    def test_user_detail(self):
+        self.client.force_authenticate(self.admin)
+        self.assertQueryBudget(1, lambda: self.client.get(reverse("user-detail", args=[self.patient.pk])))
+
+    # ---- catalog ----
+
+    def test_department_list(self):
+        self.client.force_authenticate(self.admin)
+        self.assertQueryBudget(1, lambda: self.client.get(reverse("department-list")))
+
+    def test_department_detail(self):
+        self.client.force_authenticate(self.admin)
+        self.assertQueryBudget(1, lambda: self.client.get(reverse("department-detail", args=[self.department.pk])))
+
+    def test_doctor_list(self):
+        self.assertQueryBudget(1, lambda: self.client.get(reverse("doctor-list")))
+
+    def test_doctor_list_by_department(self):
+        self.assertQueryBudget(1, lambda: self.client.get(reverse("doctor-list"), {"department": "cardiology"}))
+
+    def test_doctor_detail(self):
+        self.assertQueryBudget(1, lambda: self.client.get(reverse("doctor-detail", args=[self.doctor.pk])))
+
+    def test_doctor_slots(self):
+        DoctorAvailability.objects.create(doctor=self.doctor, weekday=0, start_time="09:00", end_time="17:00")
+        self.assertQueryBudget(4, lambda: self.client.get(
+            reverse("doctor-slots"), {"department": "cardiology", "start": "2030-01-01", "end": "2030-01-14"}
+        ))
+
+    # ---- appointments ----
+
+    def test_appointment_list_staff(self):
+        self.client.force_authenticate(self.admin)
+        self.assertQueryBudget(1, lambda: self.client.get(reverse("appointment-list")))
+
+    def test_appointment_list_patient(self):
+        self.client.force_authenticate(self.patient)
+        self.assertQueryBudget(1, lambda: self.client.get(reverse("appointment-list")))
+
+    def test_appointment_list_unpaginated(self):
+        self.client.force_authenticate(self.admin)
+        self.assertQueryBudget(1, lambda: self.client.get(reverse("appointment-list"), {"paginate": "false"}))
+
+    def test_appointment_detail(self):
+        self.client.force_authenticate(self.patient)
+        self.assertQueryBudget(1, lambda: self.client.get(reverse("appointment-detail", args=[self.appointment.pk])))
+
+    def test_appointment_create(self):
+        self.client.force_authenticate(self.patient)
+        self.assertQueryBudget(6, lambda: self.client.post(reverse("appointment-list"), {
+            "doctor_id": self.doctor.pk, "date_time": self.unique_slot().isoformat(),
+        }), status_code=201)
+
+    def test_verify_payment(self):
+        self.client.force_authenticate(self.patient)
+        self.assertQueryBudget(7, lambda: self.client.post(reverse("appointment-verify-payment"), {
+            "payment_id": f"PAY-{next(self.sequence)}", "doctor_id": self.doctor.pk,
+            "date_time": self.unique_slot().isoformat(),
+        }), status_code=201)
+
+    # ---- batch ----
+
+    def test_batch(self):
+        self.client.force_authenticate(self.admin)
+        self.assertQueryBudget(3, lambda: self.client.post(reverse("batch"), {"requests": [
+            {"path": "/doctors/?paginate=false"}, {"path": "/departments/"}, {"path": "/appointments/"},
+        ]}, format="json"))
+
+
+# -------------------- PAGINATION --------------------
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class KeysetPaginationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email="admin@hope.com", password="admin-pass")
+        department = Department.objects.create(name="Cardiology")
+        Department.objects.create(name="Neurology")
+        cls.doctors = [
+            Doctor.objects.create(name=f"Doctor {n}", department=department, specialization="Cardiologist",
+                                  education="MBBS", experience="1 year", availability="Mon-Fri")
+            for n in range(3)
+        ]
+        patients = User.objects.bulk_create(User(email=f"page{n}@hope.com") for n in range(7))
+        start = datetime(2030, 1, 1, 9, tzinfo=timezone.utc)
+        Appointment.objects.bulk_create(
+            Appointment(doctor=cls.doctors[n % 3], patient=patients[n], date_time=start + timedelta(hours=n))
+            for n in range(7)
+        )
+        # Ties on the leading sort key: only the id tiebreaker orders these rows.
+        same_moment = datetime(2029, 6, 1, tzinfo=timezone.utc)
+        Appointment.objects.update(created_at=same_moment)
+        User.objects.update(date_joined=same_moment)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def walk(self, url_name, page_size):
+        ids, url, params = [], reverse(url_name), {"page_size": page_size}
+        while url:
+            page = self.client.get(url, params).json()
+            self.assertLessEqual(len(page["results"]), page_size)
+            ids.extend(row["id"] for row in page["results"])
+            url, params = page["next"], None
+        return ids
+
+    def test_cursor_walks_ties_without_gaps_or_repeats(self):
+        expected = list(Appointment.objects.order_by("-id").values_list("id", flat=True))
+        self.assertEqual(self.walk("appointment-list", 2), expected)
+        expected = list(User.objects.order_by("-id").values_list("id", flat=True))
+        self.assertEqual(self.walk("user-list", 3), expected)
+
+    def test_page_size_is_capped(self):
+        self.assertEqual(KeysetPagination.max_page_size, settings.API_MAX_PAGE_SIZE)
+        with patch.object(KeysetPagination, "max_page_size", 3):
+            page = self.client.get(reverse("appointment-list"), {"page_size": 1000}).json()
+        self.assertEqual(len(page["results"]), 3)
+        self.assertIsNotNone(page["next"])
+
+    def test_paginate_false_returns_a_bare_list(self):
+        models = {"user-list": User, "department-list": Department, "doctor-list": Doctor,
+                  "appointment-list": Appointment}
+        for url_name, model in models.items():
+            for value in ("false", "0", "no", "False"):
+                with self.subTest(url_name, paginate=value):
+                    body = self.client.get(reverse(url_name), {"paginate": value}).json()
+                    self.assertIsInstance(body, list)
+                    self.assertEqual(len(body), model.objects.count())
+            with self.subTest(url_name, paginate="true"):
+                body = self.client.get(reverse(url_name), {"paginate": "true"}).json()
+                self.assertEqual(set(body), {"next", "previous", "results"})
+
+
+# -------------------- DOCTOR CATALOG CACHE --------------------
+
+class DoctorCatalogCacheTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.department = Department.objects.create(name="Neurology")
+        cls.doctor = Doctor.objects.create(
+            name="Dr. Rao",
+            department=cls.department,
+            specialization="Neurologist",
+            education="MD",
+            experience="8 years",
+            availability="Mon-Wed",
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_warm_list_runs_no_queries(self):
+        url = reverse("doctor-list")
+        first = self.client.get(url, {"department": "neurology"})
+        with self.assertNumQueries(0):
+            second = self.client.get(url, {"department": "neurology"})
+        self.assertEqual(first.data, second.data)
+        self.assertEqual(first["ETag"], second["ETag"])
+
+    def test_if_none_match_returns_304(self):
+        url = reverse("doctor-detail", args=[self.doctor.pk])
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_json_etag_does_not_validate_the_browsable_api(self):
+        url = reverse("doctor-detail", args=[self.doctor.pk])
+        etag = self.client.get(url)["ETag"]
+        response = self.client.get(url, HTTP_ACCEPT="text/html", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("Accept", response["Vary"])
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_doctor_and_department_writes_invalidate(self):
+        url = reverse("doctor-detail", args=[self.doctor.pk])
+        etag = self.client.get(url)["ETag"]
+
+        self.doctor.experience = "9 years"
+        self.doctor.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["experience"], "9 years")
+
+        list_url = reverse("doctor-list")
+        self.assertEqual(len(self.client.get(list_url, {"department": "neurology"}).data["results"]), 1)
+        self.department.name = "Neuroscience"
+        self.department.save()
+        self.assertEqual(len(self.client.get(list_url, {"department": "neurology"}).data["results"]), 0)
+
+
+# -------------------- FREE SLOT SEARCH --------------------
+
+class SlotSearchTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name="Pediatrics")
+        cls.doctor = Doctor.objects.create(
+            name="Dr. Mehta",
+            department=department,
+            specialization="Pediatrician",
+            education="MD",
+            experience="5 years",
+            availability="Mondays",
+        )
+        patient = User.objects.create_user(email="parent@hope.com", password="parent-pass")
+        # 2030-01-07 is a Monday.
+        DoctorAvailability.objects.create(doctor=cls.doctor, weekday=0, start_time="09:00", end_time="11:00")
+        AvailabilityException.objects.create(doctor=cls.doctor, date="2030-01-07", start_time="10:00", end_time="10:30")
+        AvailabilityException.objects.create(doctor=cls.doctor, date="2030-01-14")
+        Appointment.objects.create(doctor=cls.doctor, patient=patient, date_time="2030-01-07T09:40:00-06:00")
+        Appointment.objects.create(
+            doctor=cls.doctor, patient=patient, date_time="2030-01-07T10:30:00-06:00", status="cancelled"
+        )
+
+    def slot_starts(self, **params):
+        response = self.client.get(reverse("doctor-slots"), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [slot["start"].strftime("%Y-%m-%d %H:%M") for slot in response.data["doctors"][0]["slots"]]
+
+    @override_settings(TIME_ZONE="America/Chicago")
+    def test_booked_and_blocked_slots_are_excluded(self):
+        starts = self.slot_starts(doctor=self.doctor.pk, start="2030-01-07", end="2030-01-14")
+        self.assertEqual(starts, ["2030-01-07 09:00", "2030-01-07 10:30"])
+
+    def test_requires_doctor_or_department(self):
+        self.assertEqual(self.client.get(reverse("doctor-slots")).status_code, 400)
+
+    def test_rejects_long_ranges(self):
+        response = self.client.get(reverse("doctor-slots"), {"doctor": self.doctor.pk, "start": "2030-01-01", "end": "2030-03-01"})
+        self.assertEqual(response.status_code, 400)
+
+
+# -------------------- BOOKING CONFLICTS --------------------
+
+class BookingConflictTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name="Orthopedics")
+        cls.doctor = Doctor.objects.create(
+            name="Dr. Iyer",
+            department=department,
+            specialization="Orthopedic Surgeon",
+            education="MS",
+            experience="12 years",
+            availability="Tue-Sat",
+        )
+        cls.first = User.objects.create_user(email="first@hope.com", password="first-pass")
+        cls.second = User.objects.create_user(email="second@hope.com", password="second-pass")
+
+    def book(self, patient, url_name="appointment-list", **extra):
+        self.client.force_authenticate(patient)
+        payload = {"doctor_id": self.doctor.pk, "date_time": "2030-03-05T10:00Z", **extra}
+        return self.client.post(reverse(url_name), payload)
+
+    def test_second_booking_for_same_slot_conflicts(self):
+        self.assertEqual(self.book(self.first).status_code, 201)
+        response = self.book(self.second)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Appointment.objects.filter(doctor=self.doctor).count(), 1)
+
+    def test_verify_payment_conflicts(self):
+        self.assertEqual(self.book(self.first).status_code, 201)
+        response = self.book(self.second, "appointment-verify-payment", payment_id="PAY-2")
+        self.assertEqual(response.status_code, 409)
+        # The payment was already captured: it is kept on a cancelled booking to refund.
+        refund = Appointment.objects.get(pk=response.data["appointment_id"])
+        self.assertEqual(
+            (refund.patient, refund.status, refund.payment_id, refund.payment_status),
+            (self.second, "cancelled", "PAY-2", "REFUND_PENDING"),
+        )
+
+    def test_verify_payment_retries_are_idempotent(self):
+        first = self.book(self.first, "appointment-verify-payment", payment_id="PAY-1")
+        self.assertEqual(first.status_code, 201)
+        retry = self.book(self.first, "appointment-verify-payment", payment_id="PAY-1")
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(retry.data["id"], first.data["id"])
+        self.assertEqual(Appointment.objects.filter(payment_id="PAY-1").count(), 1)
+
+    def test_verify_payment_retries_after_a_conflict_still_conflict(self):
+        self.assertEqual(self.book(self.first).status_code, 201)
+        response = self.book(self.second, "appointment-verify-payment", payment_id="PAY-2")
+        retry = self.book(self.second, "appointment-verify-payment", payment_id="PAY-2")
+        self.assertEqual(retry.status_code, 409)
+        self.assertEqual(retry.data["appointment_id"], response.data["appointment_id"])
+        self.assertEqual(Appointment.objects.filter(payment_id="PAY-2").count(), 1)
+
+    def concurrent_retry(self, patient, payment_id):
+        """Verify a payment as if a concurrent retry recorded it after this one looked for it."""
+        first = QuerySet.first
+        lookups = count()
+        with patch.object(QuerySet, "first", lambda queryset: None if next(lookups) == 0 else first(queryset)):
+            return self.book(patient, "appointment-verify-payment", payment_id=payment_id)
+
+    def test_concurrent_verify_payment_retries_book_once(self):
+        booked = self.book(self.first, "appointment-verify-payment", payment_id="PAY-1")
+        retry = self.concurrent_retry(self.first, "PAY-1")
+        self.assertEqual((retry.status_code, retry.data["id"]), (200, booked.data["id"]))
+        self.assertEqual(Appointment.objects.filter(payment_id="PAY-1").count(), 1)
+
+    def test_concurrent_verify_payment_retries_record_one_refund(self):
+        self.assertEqual(self.book(self.first).status_code, 201)
+        refund = self.book(self.second, "appointment-verify-payment", payment_id="PAY-2")
+        retry = self.concurrent_retry(self.second, "PAY-2")
+        self.assertEqual((retry.status_code, retry.data["appointment_id"]), (409, refund.data["appointment_id"]))
+        self.assertEqual(Appointment.objects.filter(payment_id="PAY-2").count(), 1)
+
+    def test_moving_onto_a_booked_slot_conflicts(self):
+        self.assertEqual(self.book(self.first).status_code, 201)
+        other = self.book(self.second, date_time="2030-03-05T11:00Z")
+        self.assertEqual(other.status_code, 201)
+        url = reverse("appointment-detail", args=[other.data["id"]])
+        response = self.client.patch(url, {"date_time": "2030-03-05T10:00Z"})
+        self.assertEqual(response.status_code, 409)
+        response = self.client.put(url, {"doctor_id": self.doctor.pk, "date_time": "2030-03-05T10:00Z"})
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.client.patch(url, {"date_time": "2030-03-05T12:00Z"}).status_code, 200)
+
+    def test_cancelled_booking_frees_the_slot(self):
+        self.assertEqual(self.book(self.first).status_code, 201)
+        Appointment.objects.filter(doctor=self.doctor).update(status="cancelled")
+        self.assertEqual(self.book(self.second).status_code, 201)
+
+
+# -------------------- QUERY PLANS --------------------
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class QueryPlanTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        departments = Department.objects.bulk_create(Department(name=f"Department {i}") for i in range(5))
+        doctors = Doctor.objects.bulk_create(
+            Doctor(
+                name=f"Doctor {i}",
+                department=departments[i % 5],
+                specialization="General",
+                education="MBBS",
+                experience="1 year",
+                availability="Mon",
+            )
+            for i in range(20)
+        )
+        patients = User.objects.bulk_create(User(email=f"plan{i}@hope.com") for i in range(50))
+        start = datetime(2030, 1, 1, tzinfo=timezone.utc)
+        Appointment.objects.bulk_create(
+            Appointment(
+                doctor=doctors[i % 20],
+                patient=patients[i % 50],
+                date_time=start + timedelta(minutes=30 * i),
+                status=("pending", "paid", "cancelled")[i % 3],
+                amount=500,
+            )
+            for i in range(500)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def test_hot_queries_use_indexes(self):
+        call_command("check_query_plans", stdout=StringIO())
+
+    def test_detects_sequential_scans(self):
+        if connection.vendor == "postgresql":
+            self.assertEqual(sequential_scans("Seq Scan on accounts_doctor  (cost=...)"), ["accounts_doctor"])
+        else:
+            self.assertEqual(sequential_scans("2 0 0 SCAN accounts_doctor"), ["accounts_doctor"])
+            self.assertEqual(sequential_scans("2 0 0 SCAN accounts_doctor USING INDEX x"), [])
+
+
+# -------------------- SUPABASE STORAGE --------------------
+
+class FakeSupabaseHandler(BaseHTTPRequestHandler):
+    """Just enough of the Supabase storage object API, backed by a dict."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, body=b"", length=None):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body) if length is None else length))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        server.requests.append(("POST", self.path, self.headers.get("Connection"), self.client_address[1]))
+        if server.fail_next:
+            server.fail_next -= 1
+            return self.reply(503, b"busy")
+        server.objects[self.path] = body
+        self.reply(200, b'{"Key": "ok"}')
+
+    def do_HEAD(self):
+        if self.path in self.server.objects:
+            return self.reply(200, length=len(self.server.objects[self.path]))
+        self.reply(400)
+
+    def do_DELETE(self):
+        self.server.objects.pop(self.path, None)
+        self.reply(200, b"{}")
+
+
+class SupabaseStorageTests(APITestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeSupabaseHandler)
+        cls.server.objects = {}
+        cls.server.requests = []
+        cls.server.fail_next = 0
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.settings_override = override_settings(
+            SUPABASE_URL=f"http://127.0.0.1:{cls.server.server_port}",
+            SUPABASE_BUCKET="media",
+            SUPABASE_RETRY_BACKOFF=0,
+            SUPABASE_MAX_RETRIES=2,
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.server.objects.clear()
+        self.server.requests.clear()
+        self.server.fail_next = 0
+        self.storage = SupabaseStorage()
+
+    def test_save_streams_content_and_reports_existence(self):
+        payload = b"x" * 300_000
+        name = self.storage.save("doctors/photo.jpg", ContentFile(payload))
+        self.assertEqual(self.server.objects["/storage/v1/object/media/doctors/photo.jpg"], payload)
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(self.storage.size(name), len(payload))
+        self.assertFalse(self.storage.exists("doctors/missing.jpg"))
+
+    def test_existing_names_get_a_fresh_name(self):
+        first = self.storage.save("doctors/photo.jpg", ContentFile(b"one"))
+        second = self.storage.save("doctors/photo.jpg", ContentFile(b"two"))
+        self.assertNotEqual(first, second)
+
+    def test_retries_transient_failures(self):
+        self.server.fail_next = 2
+        self.storage.save("doctors/retry.jpg", ContentFile(b"payload"))
+        self.assertEqual(self.server.objects["/storage/v1/object/media/doctors/retry.jpg"], b"payload")
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_gives_up_after_bounded_retries(self):
+        self.server.fail_next = 10
+        with self.assertRaises(SupabaseStorageError):
+            self.storage.save("doctors/down.jpg", ContentFile(b"payload"))
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_uploads_reuse_a_pooled_connection(self):
+        for i in range(3):
+            self.storage.save(f"doctors/{i}.jpg", ContentFile(b"payload"))
+        client_ports = {port for _, _, _, port in self.server.requests}
+        self.assertEqual(len(client_ports), 1)
+
+    def test_delete(self):
+        name = self.storage.save("doctors/gone.jpg", ContentFile(b"payload"))
+        self.storage.delete(name)
+        self.assertFalse(self.storage.exists(name))
+
+
+# -------------------- IMAGE VARIANTS --------------------
+
+class DoctorImageVariantTests(APITransactionTestCase):
+    """Variants are built on a background thread after commit, so these tests commit and then wait for it."""
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        storage_override = override_settings(
+            STORAGES={
+                "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+                "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+            },
+            MEDIA_ROOT=media_root.name,
+        )
+        storage_override.enable()
+        self.addCleanup(storage_override.disable)
+        cache.clear()
+
+    def upload(self, size=(1600, 1200)):
+        buffer = BytesIO()
+        Image.new("RGB", size, "teal").save(buffer, "JPEG")
+        return SimpleUploadedFile("portrait.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+    def wait_for_variants(self):
+        # The executor has one thread, so a no-op queued now finishes after every earlier refresh.
+        images.get_executor().submit(lambda: None).result(timeout=30)
+
+    def test_saving_an_image_builds_variants(self):
+        doctor = Doctor.objects.create(
+            name="Dr. Sen",
+            specialization="Radiologist",
+            education="MD",
+            experience="7 years",
+            availability="Fri",
+            profile_image=self.upload(),
+        )
+        self.wait_for_variants()
+        doctor.refresh_from_db()
+        self.assertEqual(doctor.image_variants["source"], doctor.profile_image.name)
+        self.assertEqual(doctor.image_variants["thumbnail"]["width"], 96)
+        self.assertEqual(doctor.image_variants["card"]["width"], 320)
+        self.assertEqual(doctor.image_variants["full"]["width"], 1024)
+
+        data = self.client.get(reverse("doctor-detail", args=[doctor.pk])).data
+        thumbnail = data["profile_image_variants"]["thumbnail"]
+        self.assertTrue(thumbnail["webp"].endswith(".webp"))
+        self.assertTrue(thumbnail["jpeg"].endswith(".jpg") or thumbnail["jpeg"].endswith(".jpeg"))
+        self.assertNotIn("image_variants", data)
+
+    def test_small_images_are_not_upscaled(self):
+        doctor = Doctor.objects.create(
+            name="Dr. Das",
+            specialization="Surgeon",
+            education="MS",
+            experience="3 years",
+            availability="Sat",
+            profile_image=self.upload(size=(200, 150)),
+        )
+        self.wait_for_variants()
+        doctor.refresh_from_db()
+        self.assertEqual(doctor.image_variants["full"]["width"], 200)
+        self.assertEqual(doctor.image_variants["thumbnail"]["width"], 96)
+
+    def test_backfill_command(self):
+        doctor = Doctor.objects.create(
+            name="Dr. Roy", specialization="GP", education="MBBS", experience="2 years", availability="Sun",
+            profile_image=self.upload(),
+        )
+        self.wait_for_variants()
+        Doctor.objects.filter(pk=doctor.pk).update(image_variants={})
+        call_command("build_image_variants", stdout=StringIO())
+        doctor.refresh_from_db()
+        self.assertIn("card", doctor.image_variants)
+
+    def test_variants_are_built_after_commit_off_the_saving_thread(self):
+        threads = []
+
+        def build_variants(name, source, storage):
+            threads.append(threading.current_thread())
+            return {"source": name}
+
+        with patch.object(images, "build_variants", side_effect=build_variants):
+            with transaction.atomic():
+                doctor = Doctor.objects.create(
+                    name="Dr. Iyer", specialization="GP", education="MBBS", experience="4 years", availability="Mon",
+                    profile_image=self.upload(),
+                )
+                self.wait_for_variants()
+                self.assertEqual(threads, [])  # nothing runs before the commit
+            self.wait_for_variants()
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+        with patch.object(images, "build_variants") as build, self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                doctor.profile_image = self.upload()
+                doctor.save()
+                raise RuntimeError("rolled back")
+        self.wait_for_variants()
+        build.assert_not_called()
+
+    def test_replacing_the_image_deletes_the_old_variants(self):
+        doctor = Doctor.objects.create(
+            name="Dr. Pal", specialization="GP", education="MBBS", experience="6 years", availability="Tue",
+            profile_image=self.upload(),
+        )
+        self.wait_for_variants()
+        doctor.refresh_from_db()
+        old_names = images.stored_names(doctor.image_variants)
+        self.assertEqual(len(old_names), 6)
+
+        doctor.profile_image = self.upload(size=(800, 600))
+        doctor.save()
+        self.wait_for_variants()
+        doctor.refresh_from_db()
+        storage = doctor.profile_image.storage
+        self.assertFalse(any(storage.exists(name) for name in old_names))
+        self.assertTrue(all(storage.exists(name) for name in images.stored_names(doctor.image_variants)))
+
+        doctor.profile_image = None
+        doctor.save()
+        self.wait_for_variants()
+        doctor.refresh_from_db()
+        self.assertEqual(doctor.image_variants, {})
+        self.assertEqual(os.listdir(f"{settings.MEDIA_ROOT}/doctors/variants"), [])
+
+
+# -------------------- RENDER IMAGE UPLOADS --------------------
+
+class FakeBucket:
+    """The part of a supabase storage bucket that upload_render_images uses, in memory."""
+
+    def __init__(self, objects=None, refuse=()):
+        self.objects = dict(objects or {})
+        self.refuse = set(refuse)
+        self.uploads = []
+        self.lock = threading.Lock()
+
+    def list(self, folder, options):
+        items = [
+            {"name": path.split("/", 1)[1], "metadata": {"eTag": f'"{hashlib.md5(body).hexdigest()}"'}}
+            for path, body in self.objects.items() if path.startswith(f"{folder}/")
+        ]
+        return items[options["offset"]:options["offset"] + options["limit"]]
+
+    def upload(self, path, file, file_options):
+        with self.lock:
+            self.uploads.append(path)
+        if path in self.refuse:
+            raise RuntimeError("upload refused")
+        self.objects[path] = file.read()
+
+
+class UploadRenderImagesTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.doctors = [
+            Doctor.objects.create(
+                name=name, specialization="GP", education="MBBS", experience="5 years", availability="Mon-Fri"
+            )
+            for name in ("Asha Rao", "Ben Ode", "Cy Lee")
+        ]
+
+    def setUp(self):
+        base_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(base_dir.cleanup)
+        self.media = os.path.join(base_dir.name, "media", "doctors")
+        os.makedirs(self.media)
+        for name in ("asha_rao", "ben_ode", "cy_lee"):
+            self.write(name, f"{name} v1")
+        base_dir_override = override_settings(BASE_DIR=base_dir.name)
+        base_dir_override.enable()
+        self.addCleanup(base_dir_override.disable)
+
+    def write(self, name, body):
+        with open(os.path.join(self.media, f"{name}.jpg"), "w") as file:
+            file.write(body)
+
+    def manifest(self):
+        with open(os.path.join(self.media, ".upload_manifest.json")) as file:
+            return json.load(file)
+
+    def run_command(self, bucket):
+        client = SimpleNamespace(storage=SimpleNamespace(from_=lambda name: bucket))
+        out = StringIO()
+        with patch("accounts.management.commands.upload_render_images.create_client", return_value=client):
+            call_command("upload_render_images", "--workers", "3", stdout=out)
+        return out.getvalue()
+
+    def test_uploads_new_images_and_writes_the_manifest(self):
+        bucket = FakeBucket()
+        self.run_command(bucket)
+        self.assertCountEqual(bucket.uploads, ["doctors/asha_rao.jpg", "doctors/ben_ode.jpg", "doctors/cy_lee.jpg"])
+        self.assertEqual(self.manifest()["doctors/ben_ode.jpg"], hashlib.md5(b"ben_ode v1").hexdigest())
+        self.assertEqual(
+            sorted(Doctor.objects.values_list("profile_image", flat=True)),
+            ["doctors/asha_rao.jpg", "doctors/ben_ode.jpg", "doctors/cy_lee.jpg"],
+        )
+
+    def test_unchanged_images_are_skipped(self):
+        self.run_command(FakeBucket())
+        # Known from the manifest, or (for a lost manifest) from the bucket's eTags.
+        os.remove(os.path.join(self.media, ".upload_manifest.json"))
+        bucket = FakeBucket({"doctors/asha_rao.jpg": b"asha_rao v1", "doctors/ben_ode.jpg": b"ben_ode v1"})
+        self.run_command(bucket)
+        self.assertEqual(bucket.uploads, ["doctors/cy_lee.jpg"])
+
+        again = FakeBucket()
+        output = self.run_command(again)
+        self.assertEqual(again.uploads, [])
+        self.assertIn("Skipped (unchanged): 3", output)
+
+    def test_changed_images_are_uploaded_again(self):
+        self.run_command(FakeBucket())
+        self.write("ben_ode", "ben_ode v2")
+        bucket = FakeBucket()
+        self.run_command(bucket)
+        self.assertEqual(bucket.uploads, ["doctors/ben_ode.jpg"])
+        self.assertEqual(bucket.objects["doctors/ben_ode.jpg"], b"ben_ode v2")
+        self.assertEqual(self.manifest()["doctors/ben_ode.jpg"], hashlib.md5(b"ben_ode v2").hexdigest())
+
+    def test_one_failure_does_not_stop_the_others(self):
+        bucket = FakeBucket(refuse={"doctors/ben_ode.jpg"})
+        output = self.run_command(bucket)
+        self.assertEqual(set(bucket.objects), {"doctors/asha_rao.jpg", "doctors/cy_lee.jpg"})
+        self.assertEqual(set(self.manifest()), {"doctors/asha_rao.jpg", "doctors/cy_lee.jpg"})
+        self.assertIn("Failed: 1", output)
+        self.assertEqual(Doctor.objects.get(name="Ben Ode").profile_image.name, "")
+
+        retry = FakeBucket()
+        self.run_command(retry)
+        self.assertEqual(retry.uploads, ["doctors/ben_ode.jpg"])
+
+
+# -------------------- LOGIN --------------------
+
+class EmailLoginTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="Nurse@Hope.com", password="nurse-pass")
+
+    def login(self, email, password):
+        return self.client.post(reverse("login"), {"email": email, "password": password})
+
+    def count_hashes(self):
+        hasher = get_hasher()
+        calls = []
+        original = type(hasher).encode
+
+        def counting_encode(this, *args, **kwargs):
+            calls.append(1)
+            return original(this, *args, **kwargs)
+
+        patcher = patch.object(type(hasher), "encode", counting_encode)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return calls
+
+    @override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+    def test_email_is_case_insensitive(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password("nurse-pass"))
+        self.assertEqual(self.login("nurse@hope.com", "nurse-pass").status_code, 200)
+
+    @override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+    def test_each_attempt_hashes_once(self):
+        User.objects.filter(pk=self.user.pk).update(password=make_password("nurse-pass"))
+        calls = self.count_hashes()
+        self.assertEqual(self.login("nurse@hope.com", "wrong-pass").status_code, 400)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(self.login("nobody@hope.com", "wrong-pass").status_code, 400)
+        self.assertEqual(len(calls), 2)
+
+    @override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+    def test_registration_rejects_another_case_of_a_taken_email(self):
+        response = self.client.post(reverse("register"), {
+            "email": "nurse@hope.com", "password": "other-pass", "confirm_password": "other-pass", "full_name": "N",
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("email", response.json())
+        self.assertEqual(User.objects.filter(email__iexact="nurse@hope.com").count(), 1)
+
+    @override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+    def test_password_recovery_ignores_case(self):
+        request = APIRequestFactory().post("/", {"email": "NURSE@hope.com"})  # not routed in accounts/urls.py
+        self.assertEqual(ForgotPasswordAPIView.as_view()(request).status_code, 200)
+        response = self.client.post(reverse("reset-password"), {
+            "email": "nurse@HOPE.com", "new_password": "fresh-pass", "confirm_password": "fresh-pass",
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.login("nurse@hope.com", "fresh-pass").status_code, 200)
+
+    def test_exact_case_wins_among_legacy_duplicates(self):
+        twin = User.objects.create_user(email="nurse@hope.com", password="twin-pass")
+        self.assertEqual(User.objects.get_by_email("nurse@hope.com"), twin)
+        self.assertEqual(User.objects.get_by_email("Nurse@Hope.com"), self.user)
+        with self.assertRaises(User.DoesNotExist):
+            User.objects.get_by_email("nobody@hope.com")
+
+    @override_settings(
+        PASSWORD_HASHERS=["accounts.hashers.TunedPBKDF2PasswordHasher"], PASSWORD_PBKDF2_ITERATIONS=1000
+    )
+    def test_login_rehashes_to_configured_cost(self):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1200):
+            User.objects.filter(pk=self.user.pk).update(password=make_password("nurse-pass"))
+        self.assertEqual(self.login("nurse@hope.com", "nurse-pass").status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$1000$"))
+
+    def test_django_default_hashes_still_verify(self):
+        algorithms = {import_string(hasher).algorithm for hasher in project_settings.PASSWORD_HASHERS}
+        defaults = {import_string(hasher).algorithm for hasher in global_settings.PASSWORD_HASHERS}
+        self.assertLessEqual(defaults, algorithms)
+        self.assertEqual(project_settings.PASSWORD_HASHERS[0], "accounts.hashers.TunedPBKDF2PasswordHasher")
+
+
+# -------------------- JWT USER CACHE --------------------
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class CachedJWTAuthenticationTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="patient@hope.com", password="patient-pass")
+
+    def setUp(self):
+        cache.clear()
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def appointments(self):
+        return self.client.get(reverse("appointment-list"))
+
+    def test_warm_requests_skip_the_user_lookup(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(self.appointments().status_code, 200)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.appointments().status_code, 200)
+
+    def test_password_change_invalidates(self):
+        self.appointments()
+        response = self.client.put(reverse("change-password"), {
+            "email": "patient@hope.com", "new_password": "fresh-pass", "confirm_password": "fresh-pass",
+        })
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(2):
+            self.appointments()
+
+    def test_deactivation_rejects_the_next_request(self):
+        self.appointments()
+        user = User.objects.get(pk=self.user.pk)
+        user.is_active = False
+        user.save()
+        self.assertEqual(self.appointments().status_code, 401)
+
+    def test_deleted_user_is_rejected(self):
+        self.appointments()
+        User.objects.filter(pk=self.user.pk).delete()
+        self.assertEqual(self.appointments().status_code, 401)
+
+    def test_cache_holds_only_the_auth_fields(self):
+        self.appointments()
+        entry = cache.get(AUTH_USER_KEY.format(self.user.pk))
+        self.assertEqual(
+            set(entry["user"]), {"id", "email", "is_active", "is_staff", "is_superuser", "password_digest"}
+        )
+        self.assertNotIn(self.user.password, entry["user"].values())
+
+    def test_password_change_keeps_changes_made_elsewhere(self):
+        self.appointments()  # caches the user while still a plain patient
+        User.objects.filter(pk=self.user.pk).update(is_staff=True, first_name="Asha")
+        response = self.client.put(reverse("change-password"), {
+            "email": "patient@hope.com", "new_password": "fresh-pass", "confirm_password": "fresh-pass",
+        })
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertTrue(user.is_staff)
+        self.assertEqual(user.first_name, "Asha")
+        self.assertTrue(user.check_password("fresh-pass"))
+
+    # simplejwt's setting_changed hook rebinds its api_settings rather than
+    # updating the instance every module imported, so patch that instead.
+    @patch.object(jwt_settings, "CHECK_REVOKE_TOKEN", True)
+    def test_revoked_tokens_are_rejected_from_the_cache(self):
+        access = RefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+        self.assertEqual(self.appointments().status_code, 200)
+        with self.assertNumQueries(1):
+            self.assertEqual(self.appointments().status_code, 200)
+
+        user = User.objects.get(pk=self.user.pk)
+        user.set_password("fresh-pass")
+        user.save()
+        self.assertEqual(self.appointments().status_code, 401)
+
+
+# -------------------- AUTH THROTTLING --------------------
+
+def throttle_rates(**rates):
+    return override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": rates})
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class AuthThrottleTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(email="patient@hope.com", password="patient-pass")
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, email="patient@hope.com", password="wrong-pass", **extra):
+        return self.client.post(reverse("login"), {"email": email, "password": password}, **extra)
+
+    @throttle_rates(login_ip="100/min", login_email="2/min")
+    def test_rejects_before_hashing_or_queries(self):
+        self.assertEqual(self.login().status_code, 400)
+        self.assertEqual(self.login("PATIENT@hope.com").status_code, 400)
+        with patch("accounts.backends.EmailBackend.authenticate") as backend, self.assertNumQueries(0):
+            response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(response.has_header("Retry-After"))
+        backend.assert_not_called()
+        # Other accounts behind the same address are unaffected.
+        self.assertEqual(self.login("other@hope.com").status_code, 400)
+
+    @throttle_rates(reset_password_ip="2/hour")
+    def test_per_ip_bucket(self):
+        for email in ("a@hope.com", "b@hope.com"):
+            self.assertNotEqual(self.client.post(reverse("reset-password"), {"email": email}).status_code, 429)
+        self.assertEqual(self.client.post(reverse("reset-password"), {"email": "c@hope.com"}).status_code, 429)
+        self.assertEqual(
+            self.client.post(reverse("reset-password"), {"email": "c@hope.com"}, REMOTE_ADDR="10.0.0.9").status_code,
+            404,
+        )
+
+    @throttle_rates(login_ip="2/min")
+    def test_spoofed_forwarded_for_shares_the_bucket(self):
+        statuses = [
+            self.login(f"user{n}@hope.com", HTTP_X_FORWARDED_FOR=f"203.0.113.{n}").status_code for n in range(3)
+        ]
+        self.assertEqual(statuses, [400, 400, 429])
+
+    def test_forwarded_for_is_trusted_only_for_our_proxies(self):
+        with override_settings(REST_FRAMEWORK={
+            **settings.REST_FRAMEWORK, "NUM_PROXIES": 1, "DEFAULT_THROTTLE_RATES": {"login_ip": "2/min"},
+        }):
+            # The client prepends whatever it likes; the proxy appends its real address.
+            statuses = [
+                self.login(f"user{n}@hope.com", HTTP_X_FORWARDED_FOR=f"203.0.113.{n}, 198.51.100.7").status_code
+                for n in range(3)
+            ]
+            self.assertEqual(statuses, [400, 400, 429])
+            other = self.login("user9@hope.com", HTTP_X_FORWARDED_FOR="198.51.100.8")
+            self.assertEqual(other.status_code, 400)
+
+    @throttle_rates(login_ip="1/min", login_email="5/min")
+    def test_shed_requests_are_counted(self):
+        self.login()
+        self.login()
+        self.login()
+        admin = User.objects.create_superuser(email="admin@hope.com", password="admin-pass")
+        self.client.force_authenticate(admin)
+        response = self.client.get(reverse("admin-stats"))
+        self.assertEqual(response.data["throttled_requests"], {"login_ip": 2, "login_email": 0})
+
+
+# -------------------- EXPORTS --------------------
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ExportTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email="admin@hope.com", password="admin-pass")
+        cls.patient = User.objects.create_user(email="patient@hope.com", password="patient-pass", first_name="Ada")
+        cls.inactive = User.objects.create_user(email="gone@hope.com", password="gone-pass", is_active=False)
+        department = Department.objects.create(name="Cardiology")
+        cls.doctor = Doctor.objects.create(
+            name="Dr. Heart", department=department, specialization="Cardiologist",
+            education="MBBS", experience="10 years", availability="Mon-Fri",
+        )
+        for day, status in [(1, "paid"), (2, "pending"), (3, "paid"), (10, "cancelled")]:
+            Appointment.objects.create(
+                doctor=cls.doctor, patient=cls.patient, date_time=f"2030-01-{day:02d}T09:00Z",
+                status=status, amount=500,
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def export(self, url_name, **params):
+        response = self.client.get(reverse(url_name), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_appointments_csv_with_filters(self):
+        body = self.export(
+            "appointment-export", format="csv", start="2030-01-01", end="2030-01-05", status="paid,pending"
+        )
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual([row["status"] for row in rows], ["paid", "pending", "paid"])
+        self.assertEqual(rows[0]["doctor_name"], "Dr. Heart")
+        self.assertEqual(rows[0]["department"], "Cardiology")
+        self.assertEqual(rows[0]["patient_email"], "patient@hope.com")
+
+    def test_appointments_ndjson(self):
+        body = self.export("appointment-export", format="ndjson", status="cancelled")
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["status"], "cancelled")
+        self.assertEqual(rows[0]["amount"], "500.00")
+
+    def test_streams_in_chunks_from_one_query(self):
+        with patch("accounts.exports.ROWS_PER_WRITE", 1):
+            response = self.client.get(reverse("appointment-export"), {"format": "csv"})
+            with self.assertNumQueries(1):
+                chunks = list(response.streaming_content)
+        # Header chunk plus one chunk per row, then the empty tail.
+        self.assertEqual(len([chunk for chunk in chunks if chunk]), 4)
+
+    def test_users_by_status(self):
+        body = self.export("user-export", format="csv", status="inactive")
+        rows = list(csv.DictReader(StringIO(body)))
+        self.assertEqual([row["email"] for row in rows], ["gone@hope.com"])
+        self.assertNotIn("password", rows[0])
+
+    def test_csv_cells_never_start_a_formula(self):
+        User.objects.filter(pk=self.patient.pk).update(first_name="=HYPERLINK(\"http://evil\")", last_name="-2+3")
+        body = self.export("user-export", format="csv", status="active")
+        [row] = [row for row in csv.DictReader(StringIO(body)) if row["email"] == "patient@hope.com"]
+        self.assertEqual(row["first_name"], "'=HYPERLINK(\"http://evil\")")
+        self.assertEqual(row["last_name"], "'-2+3")
+
+        body = self.export("user-export", format="ndjson", status="active")
+        names = {row["email"]: row["first_name"] for row in map(json.loads, body.splitlines())}
+        self.assertEqual(names["patient@hope.com"], "=HYPERLINK(\"http://evil\")")  # data formats keep it as is
+
+    def test_rejects_unknown_status(self):
+        response = self.client.get(reverse("appointment-export"), {"format": "ndjson", "status": "lost"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_staff_only(self):
+        self.client.force_authenticate(self.patient)
+        self.assertEqual(self.client.get(reverse("appointment-export")).status_code, 403)
+        self.assertEqual(self.client.get(reverse("user-export")).status_code, 403)
+
+
+# -------------------- ANALYTICS --------------------
+
+class AnalyticsTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email="admin@hope.com", password="admin-pass")
+        patient = User.objects.create_user(email="patient@hope.com", password="patient-pass")
+        cardiology = Department.objects.create(name="Cardiology")
+        neurology = Department.objects.create(name="Neurology")
+        cls.heart = Doctor.objects.create(
+            name="Dr. Heart", department=cardiology, specialization="Cardiologist",
+            education="MBBS", experience="10 years", availability="Mon-Fri",
+        )
+        cls.brain = Doctor.objects.create(
+            name="Dr. Brain", department=neurology, specialization="Neurologist",
+            education="MBBS", experience="8 years", availability="Mon-Fri",
+        )
+        bookings = [
+            (cls.heart, "2030-01-06T10:00Z", "paid", 500),
+            (cls.heart, "2030-01-07T10:00Z", "pending", 500),
+            (cls.brain, "2030-01-20T10:00Z", "paid", 300),
+            (cls.brain, "2030-03-02T10:00Z", "paid", 300),
+        ]
+        for i, (doctor, created_at, status, amount) in enumerate(bookings):
+            appointment = Appointment.objects.create(
+                doctor=doctor, patient=patient, date_time=f"2030-06-01T{9 + i:02d}:00Z", status=status, amount=amount
+            )
+            Appointment.objects.filter(pk=appointment.pk).update(created_at=created_at)
+        call_command("rebuild_appointment_rollups", stdout=StringIO())
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def series(self, queries=1, **params):
+        with self.assertNumQueries(queries):
+            response = self.client.get(reverse("admin-analytics"), params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data["series"]
+
+    def test_monthly_totals_are_zero_filled(self):
+        [series] = self.series(granularity="month", start="2029-12-01", end="2030-03-31")
+        self.assertEqual(
+            [(str(point["period"]), point["count"], point["revenue"]) for point in series["points"]],
+            [("2029-12-01", 0, 0), ("2030-01-01", 3, 800), ("2030-02-01", 0, 0), ("2030-03-01", 1, 300)],
+        )
+
+    def test_weekly_by_department_and_status(self):
+        series = self.series(
+            granularity="week", start="2030-01-01", end="2030-01-31", group_by="department,status"
+        )
+        groups = {(entry["department"], entry["status"]): entry["points"] for entry in series}
+        self.assertEqual(set(groups), {("Cardiology", "paid"), ("Cardiology", "pending"), ("Neurology", "paid")})
+        self.assertEqual([str(point["period"]) for point in groups[("Cardiology", "paid")]][:3],
+                         ["2029-12-31", "2030-01-07", "2030-01-14"])
+        self.assertEqual([point["count"] for point in groups[("Cardiology", "paid")]], [1, 0, 0, 0, 0])
+        self.assertEqual([point["count"] for point in groups[("Cardiology", "pending")]], [0, 1, 0, 0, 0])
+
+    def test_by_doctor_reads_appointments_in_one_query(self):
+        series = self.series(granularity="day", start="2030-01-06", end="2030-01-07", group_by="doctor")
+        self.assertEqual(series, [{
+            "doctor_id": self.heart.pk,
+            "doctor": "Dr. Heart",
+            "points": [
+                {"period": date(2030, 1, 6), "count": 1, "revenue": 500.0},
+                {"period": date(2030, 1, 7), "count": 1, "revenue": 0.0},
+            ],
+        }])
+
+    def test_rejects_bad_queries(self):
+        url = reverse("admin-analytics")
+        self.assertEqual(self.client.get(url, {"group_by": "planet"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"granularity": "day", "start": "2000-01-01"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"start": "2030-02-01", "end": "2030-01-01"}).status_code, 400)
+
+
+class RollupConsistencyTests(APITestCase):
+    """The signal-maintained rollups must always equal a fresh rebuild_rollups()."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.patient = User.objects.create_user(email="patient@hope.com", password="patient-pass")
+        cls.cardiology = Department.objects.create(name="Cardiology")
+        cls.neurology = Department.objects.create(name="Neurology")
+        cls.doctor = Doctor.objects.create(
+            name="Dr. Heart", department=cls.cardiology, specialization="Cardiologist",
+            education="MBBS", experience="10 years", availability="Mon-Fri",
+        )
+
+    def rollups(self):
+        return sorted(
+            AppointmentDailyRollup.objects.exclude(count=0, revenue=0)
+            .values_list("day", "department_id", "status", "count", "revenue"),
+            key=str,
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = self.rollups()
+        rebuild_rollups()
+        self.assertEqual(incremental, self.rollups())
+
+    def book(self, hour, status, amount):
+        return Appointment.objects.create(
+            doctor=self.doctor, patient=self.patient, date_time=f"2030-06-01T{hour:02d}:00Z", status=status, amount=amount
+        )
+
+    def test_every_change_keeps_the_rollups_exact(self):
+        appointment = self.book(9, "pending", 500)
+        self.assertMatchesRebuild()
+
+        appointment.status = "paid"
+        appointment.save()
+        self.assertMatchesRebuild()
+
+        appointment.amount = Decimal("750.00")
+        appointment.save()
+        self.assertMatchesRebuild()
+
+        self.book(10, "paid", 300)
+        self.doctor.department = self.neurology
+        self.doctor.save()
+        self.assertMatchesRebuild()
+        self.assertFalse(AppointmentDailyRollup.objects.filter(department=self.cardiology, count__gt=0).exists())
+
+        self.doctor.department = None
+        self.doctor.save()
+        self.assertMatchesRebuild()
+
+        appointment.delete()
+        self.assertMatchesRebuild()
+
+    def test_saves_that_leave_the_department_alone_move_nothing(self):
+        self.book(9, "paid", 500)
+        self.doctor.department = self.neurology
+        self.doctor.save(update_fields=["name"])  # the department change is not written
+        self.assertMatchesRebuild()
+
+
+# -------------------- CATALOG SEARCH --------------------
+
+class CatalogSearchTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.cardiology = Department.objects.create(name="Cardiology", description="Heart and blood vessels")
+        cls.neurology = Department.objects.create(name="Neurology", description="Brain and nerves")
+        cls.heart = Doctor.objects.create(
+            name="Dr. Amelia Hart", department=cls.cardiology, specialization="Interventional Cardiologist",
+            education="MBBS, MD", experience="12 years", availability="Mon-Fri",
+        )
+        cls.brain = Doctor.objects.create(
+            name="Dr. Omar Said", department=cls.neurology, specialization="Neurologist",
+            education="MBBS, DM", experience="9 years", availability="Mon-Fri",
+        )
+
+    def search(self, q, queries=None, **params):
+        url = reverse("catalog-search")
+        if queries is None:
+            response = self.client.get(url, {"q": q, **params})
+        else:
+            with self.assertNumQueries(queries):
+                response = self.client.get(url, {"q": q, **params})
+        self.assertEqual(response.status_code, 200, response.data)
+        return [(hit["type"], hit[hit["type"]]["id"]) for hit in response.data["results"]]
+
+    def test_prefix_matches_rank_the_closest_first(self):
+        results = self.search("cardio", queries=3)
+        self.assertEqual(set(results[:2]), {("doctor", self.heart.pk), ("department", self.cardiology.pk)})
+
+    def test_tolerates_typos(self):
+        self.assertEqual(self.search("nuerology", type="department")[0], ("department", self.neurology.pk))
+        self.assertEqual(self.search("amelia hrat")[0], ("doctor", self.heart.pk))
+
+    def test_short_prefix(self):
+        self.assertIn(("doctor", self.brain.pk), self.search("om"))
+
+    def test_index_follows_writes(self):
+        self.neurology.name = "Neuroscience"
+        self.neurology.save()
+        self.assertEqual(self.search("neuroscience", type="doctor"), [("doctor", self.brain.pk)])
+
+        self.heart.delete()
+        self.assertNotIn(("doctor", self.heart.pk), self.search("hart"))
+
+        self.neurology.delete()
+        self.assertEqual(self.search("neuroscience"), [])
+
+    def test_rebuild_command(self):
+        SearchEntry.objects.all().delete()
+        call_command("rebuild_search_index", stdout=StringIO())
+        self.assertEqual(self.search("omar")[0], ("doctor", self.brain.pk))
+
+    def test_requires_a_query(self):
+        self.assertEqual(self.client.get(reverse("catalog-search")).status_code, 400)
+
+
+# -------------------- ASYNC (ASGI) ENDPOINTS --------------------
+
+class AsgiUrlconf:
+    """backend.urls as backend/asgi.py serves it, with ASYNC_READ_VIEWS on."""
+    urlpatterns = [path("accounts/", include(accounts_urls.async_read_urlpatterns)), *backend_urls.urlpatterns]
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, ROOT_URLCONF=AsgiUrlconf)
+class AsyncEndpointTests(APITestCase):
+    """The async views must answer exactly like their DRF counterparts, on the same paths."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email="admin@hope.com", password="admin-pass")
+        cls.patient = User.objects.create_user(email="patient@hope.com", password="patient-pass")
+        other = User.objects.create_user(email="other@hope.com", password="other-pass")
+        department = Department.objects.create(name="Cardiology")
+        cls.doctors = [
+            Doctor.objects.create(
+                name=f"Doctor {i}", department=department, specialization="Cardiologist",
+                education="MBBS", experience="10 years", availability="Mon-Fri",
+            )
+            for i in range(3)
+        ]
+        for i, patient in enumerate([cls.patient, cls.patient, other]):
+            Appointment.objects.create(
+                doctor=cls.doctors[0], patient=patient, date_time=f"2030-01-0{i + 1}T09:00Z", status="paid", amount=500
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def sync_json(self, url, user=None, **params):
+        """The DRF view's answer, as served under WSGI, fetched off the event loop."""
+        def fetch():
+            self.client.force_authenticate(user)
+            with override_settings(ROOT_URLCONF="backend.urls"):
+                return self.client.get(url, params).json()
+        return sync_to_async(fetch)()
+
+    def bearer(self, user):
+        return {"headers": {"Authorization": f"Bearer {RefreshToken.for_user(user).access_token}"}}
+
+    async def test_doctor_list_and_detail(self):
+        expected = await self.sync_json(reverse("doctor-list"), paginate="false")
+        response = await self.async_client.get(reverse("doctor-list"), {"paginate": "false"})
+        self.assertEqual(response.json(), expected)
+
+        cache.clear()
+        response = await self.async_client.get(reverse("doctor-detail", args=[self.doctors[1].pk]))
+        self.assertEqual(response.json(), await self.sync_json(reverse("doctor-detail", args=[self.doctors[1].pk])))
+        revalidated = await self.async_client.get(
+            reverse("doctor-detail", args=[self.doctors[1].pk]), headers={"If-None-Match": response["ETag"]}
+        )
+        self.assertEqual(revalidated.status_code, 304)
+
+        missing = await self.async_client.get(reverse("doctor-detail", args=[0]))
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_appointment_pages_follow_cursors(self):
+        headers = self.bearer(self.patient)
+        first = (await self.async_client.get(reverse("appointment-list"), {"page_size": 1}, **headers)).json()
+        self.assertEqual(len(first["results"]), 1)
+        self.assertIsNotNone(first["next"])
+
+        cursor = first["next"].split("?", 1)[1]
+        second = (await self.async_client.get(f"{reverse('appointment-list')}?{cursor}", **headers)).json()
+        self.assertIsNone(second["next"])
+
+        expected = await self.sync_json(reverse("appointment-list"), self.patient, paginate="false")
+        self.assertEqual(first["results"] + second["results"], expected)
+
+    async def test_appointments_require_a_token(self):
+        response = await self.async_client.get(reverse("appointment-list"))
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(reverse("appointment-list"), headers={"Authorization": "Bearer junk"})
+        self.assertEqual(response.status_code, 401)
+
+    async def test_admin_stats(self):
+        expected = await self.sync_json(reverse("admin-stats"), self.admin)
+        response = await self.async_client.get(reverse("admin-stats"), **self.bearer(self.admin))
+        self.assertEqual(response.json(), expected)
+
+        response = await self.async_client.get(reverse("admin-stats"), **self.bearer(self.patient))
+        self.assertEqual(response.status_code, 403)
+
+    async def test_other_methods_reach_the_drf_views(self):
+        response = await self.async_client.post(reverse("doctor-list"), {"name": "Doctor X"})
+        self.assertEqual(response.status_code, 400)  # DoctorSerializer's validation
+        self.assertIn("specialization", response.json())
+
+        response = await self.async_client.post(
+            reverse("appointment-list"),
+            {"doctor_id": self.doctors[1].pk, "date_time": "2030-02-01T09:00Z"},
+            content_type="application/json",
+            **self.bearer(self.patient),
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["doctor"]["id"], self.doctors[1].pk)
+
+        browsable = await self.async_client.get(reverse("appointment-list"), {"format": "api"}, **self.bearer(self.patient))
+        self.assertIn("text/html", browsable["Content-Type"])
+
+    def test_every_middleware_is_async_capable(self):
+        # One sync-only middleware would put the whole chain, views included,
+        # back on Django's sync thread under ASGI.
+        for dotted_path in settings.MIDDLEWARE:
+            with self.subTest(dotted_path):
+                self.assertTrue(import_string(dotted_path).async_capable)
+
+    async def test_static_files_stream_without_the_sync_chain(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(f"{root}/app.css", "w") as file:
+                file.write("body { color: teal; }")
+            with override_settings(WHITENOISE_ROOT=root):
+                async def get_response(request):
+                    return HttpResponse("from the view")
+                middleware = AsyncWhiteNoiseMiddleware(get_response)
+                response = await middleware(AsyncRequestFactory().get("/app.css"))
+                self.assertTrue(response.is_async)
+                self.assertEqual(b"".join([chunk async for chunk in response]), b"body { color: teal; }")
+                response.close()
+
+                response = await middleware(AsyncRequestFactory().get("/elsewhere/"))
+                self.assertEqual(response.content, b"from the view")
+
+
+# -------------------- SCALE SEEDING --------------------
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class SeedScaleTests(APITestCase):
+    OPTIONS = {"departments": 3, "doctors": 8, "users": 40, "appointments": 600, "days": 60, "batch_size": 128}
+
+    def seed(self, **options):
+        call_command("seed_scale", stdout=StringIO(), **{**self.OPTIONS, **options})
+
+    def fingerprint(self):
+        return list(
+            Appointment.objects.order_by("date_time", "doctor__name", "patient__email", "status", "amount")
+            .values_list("date_time", "doctor__name", "patient__email", "status", "amount", "created_at")
+        )
+
+    def test_seeds_requested_counts_and_derived_data(self):
+        self.seed(seed=3)
+        self.assertEqual(Department.objects.count(), 3)
+        self.assertEqual(Doctor.objects.count(), 8)
+        self.assertEqual(User.objects.count(), 40)
+        self.assertEqual(Appointment.objects.count(), 600)
+        self.assertEqual(set(Appointment.objects.values_list("status", flat=True)), {"paid", "pending", "cancelled"})
+        self.assertFalse(Appointment.objects.filter(created_at__gt=F("date_time")).exists())
+
+        # Bulk writes skip signals; the command rebuilds what they would maintain.
+        self.assertEqual(AppointmentDailyRollup.objects.aggregate(n=Sum("count"))["n"], 600)
+        self.assertEqual(SearchEntry.objects.count(), 11)
+
+        user = User.objects.first()
+        self.assertTrue(user.check_password("seed-pass"))
+
+    def test_same_seed_gives_same_rows(self):
+        self.seed(seed=5)
+        first = self.fingerprint()
+        self.seed(seed=5, clear=True)
+        self.assertEqual(self.fingerprint(), first)
+        self.assertEqual(User.objects.count(), 40)
+
+        self.seed(seed=6, clear=True)
+        self.assertNotEqual(self.fingerprint(), first)
+
+
+# -------------------- LOAD TEST HARNESS --------------------
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class LoadTestHarnessTests(LiveServerTestCase):
+
+    def setUp(self):
+        department = Department.objects.create(name="Cardiology")
+        Doctor.objects.create(name="Dr. Load", department=department, specialization="Heart",
+                              education="MBBS", experience="5 years", availability="Mon-Fri")
+
+    def test_drives_every_endpoint_and_saves_results(self):
+        rates = {scope: None for scope in settings.REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]}
+        with tempfile.TemporaryDirectory() as folder, throttle_rates(**rates):
+            output = f"{folder}/run.json"
+            call_command("load_test", base_url=self.live_server_url, concurrency=2, duration=2,
+                         output=output, stdout=StringIO())
+            with open(output) as handle:
+                results = json.load(handle)
+
+        for name in ("register", "login", "doctor_list"):
+            endpoint = results["endpoints"][name]
+            self.assertGreater(endpoint["requests"], 0, name)
+            self.assertEqual(endpoint["errors"], 0, name)
+            self.assertLessEqual(endpoint["p50"], endpoint["p95"])
+            self.assertLessEqual(endpoint["p95"], endpoint["p99"])
+        self.assertEqual(
+            sum(endpoint["requests"] for endpoint in results["endpoints"].values()), results["requests"]
+        )
+        # The run's users and their bookings are removed afterwards.
+        self.assertFalse(User.objects.filter(email__endswith="@loadtest.invalid").exists())
+        self.assertFalse(Appointment.objects.exists())
+
+    def test_percentiles_and_comparison(self):
+        ordered = list(range(1, 101))
+        self.assertEqual([percentile(ordered, p) for p in (50, 95, 99)], [50, 95, 99])
+        self.assertIsNone(percentile([], 50))
+
+        before = {"endpoints": {"login": {"throughput": 10.0, "p50": 20.0, "p95": 40.0, "p99": 80.0}}}
+        after = {"endpoints": {"login": {"throughput": 12.0, "p50": 10.0, "p95": 40.0, "p99": None}}}
+        self.assertEqual(compare(after, before), [
+            ("login", "throughput", 10.0, 12.0, 20.0),
+            ("login", "p50", 20.0, 10.0, -50.0),
+            ("login", "p95", 40.0, 40.0, 0.0),
+        ])
+
+
+# -------------------- METRICS --------------------
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS, METRICS_TOKEN="scrape-secret", SERVER_TIMING_HEADER=True)
+class MetricsTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name="Cardiology")
+        Doctor.objects.create(name="Dr. Metric", department=department, specialization="Heart",
+                              education="MBBS", experience="5 years", availability="Mon-Fri")
+
+    def setUp(self):
+        cache.clear()
+        metrics.registry.reset()
+
+    def test_server_timing_reports_queries_and_serializer_time(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("doctor-list"))
+        timing = dict(part.strip().split(";", 1) for part in response["Server-Timing"].split(","))
+        self.assertEqual(set(timing), {"app", "db", "ser"})
+        self.assertIn(f'desc="{len(queries)} queries"', timing["db"])
+
+    def test_metrics_endpoint_exposes_per_view_counters(self):
+        self.client.get(reverse("doctor-list"))
+        self.client.get(reverse("doctor-list"))
+        self.client.get("/no-such-page/")
+
+        body = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-secret").content.decode()
+        self.assertIn('django_http_requests_total{view="doctor-list",method="GET",status="200"} 2', body)
+        self.assertIn('django_http_requests_total{view="unmatched",method="GET",status="404"} 1', body)
+        self.assertIn('django_http_request_duration_seconds_bucket{view="doctor-list",le="+Inf"} 2', body)
+        self.assertIn('django_http_request_duration_seconds_count{view="doctor-list"} 2', body)
+        self.assertRegex(body, r'django_http_db_queries_total\{view="doctor-list"\} [1-9]')
+        self.assertRegex(body, r'django_http_serializer_duration_seconds_total\{view="doctor-list"\} 0\.\d+')
+
+    def test_serializer_time_is_only_taken_inside_requests(self):
+        for cls in (serializers.BaseSerializer, serializers.Serializer, serializers.ListSerializer):
+            self.assertFalse(hasattr(cls.__dict__["data"].fget, "__wrapped__"), cls)  # DRF is not patched
+        self.assertIsNone(metrics.current.get())
+        with metrics.serializing():
+            FastJSONRenderer().render({"id": 1})
+
+        timings = metrics.RequestTimings()
+        token = metrics.current.set(timings)
+        try:
+            with metrics.serializing():
+                FastJSONRenderer().render({"id": 1})  # nested: counted once
+        finally:
+            metrics.current.reset(token)
+        self.assertGreater(timings.serializer, 0)
+        self.assertFalse(timings.serializing)
+
+    @override_settings(ROOT_URLCONF=AsgiUrlconf)
+    def test_async_views_are_measured(self):
+        response = async_to_sync(self.async_client.get)(reverse("doctor-list"))
+        self.assertIn("db;dur=", response["Server-Timing"])
+        self.assertIn('view="doctor-list"', metrics.registry.render())
+
+    def test_metrics_token(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 403)
+        response = self.client.get(reverse("metrics"), HTTP_AUTHORIZATION="Bearer scrape-secret")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+
+    @override_settings(METRICS_TOKEN="")
+    def test_metrics_need_a_token_without_debug(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 404)
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get(reverse("metrics")).status_code, 200)
+
+    @override_settings(SERVER_TIMING_HEADER=False)
+    def test_server_timing_can_be_turned_off(self):
+        self.assertFalse(self.client.get(reverse("doctor-list")).has_header("Server-Timing"))
+
+
+# -------------------- READ REPLICAS --------------------
+
+@override_settings(DATABASE_REPLICAS=["replica_1"], REPLICA_STICKY_SECONDS=10)
+class ReplicaRoutingTests(APITestCase):
+    """Routing decisions only; no query reaches the (absent) replica alias."""
+
+    def setUp(self):
+        cache.clear()
+        self.router = ReplicaRouter()
+        self.factory = RequestFactory()
+        self.patient = User(pk=41, email="patient@hope.com")
+        self.other = User(pk=42, email="other@hope.com")
+
+    def handle(self, method, user=None, write=False):
+        """Run a request through the middleware; returns the read aliases before and after authentication."""
+        seen = []
+
+        def view(request):
+            seen.append(self.router.db_for_read(Appointment))
+            if user is not None:
+                request.user = user  # what DRF's authentication does
+            seen.append(self.router.db_for_read(Appointment))
+            if write:
+                self.router.db_for_write(Appointment)
+                seen.append(self.router.db_for_read(Appointment))
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(getattr(self.factory, method)("/accounts/appointments/"))
+        return seen
+
+    def test_safe_requests_read_replicas_and_the_rest_reads_the_primary(self):
+        self.assertEqual(self.handle("get"), ["replica_1", "replica_1"])
+        self.assertEqual(self.handle("post"), ["default", "default"])
+        self.assertEqual(self.router.db_for_read(Appointment), "default")  # outside a request
+        self.assertEqual(self.router.db_for_write(Appointment), "default")
+
+    def test_reads_after_a_write_use_the_primary(self):
+        self.assertEqual(self.handle("get", write=True), ["replica_1", "replica_1", "default"])
+
+    def test_writer_is_sticky_to_the_primary_for_a_while(self):
+        self.handle("post", user=self.patient, write=True)
+
+        self.assertEqual(self.handle("get", user=self.patient), ["replica_1", "default"])
+        self.assertEqual(self.handle("get", user=self.other), ["replica_1", "replica_1"])
+        self.assertEqual(self.handle("get"), ["replica_1", "replica_1"])
+
+        cache.delete(STICKY_KEY.format(self.patient.pk))  # the window expired
+        self.assertEqual(self.handle("get", user=self.patient), ["replica_1", "replica_1"])
+
+    def test_lazy_session_user_is_not_evaluated(self):
+        def load_user():
+            raise AssertionError("request.user was evaluated by the router")
+
+        request = self.factory.get("/admin/")
+        request.user = SimpleLazyObject(load_user)
+        seen = []
+        ReplicaRoutingMiddleware(lambda request: seen.append(self.router.db_for_read(Doctor)) or HttpResponse())(request)
+        self.assertEqual(seen, ["replica_1"])
+
+    def test_sessions_always_read_the_primary(self):
+        from django.contrib.sessions.models import Session
+
+        seen = []
+        ReplicaRoutingMiddleware(lambda request: seen.append(self.router.db_for_read(Session)) or HttpResponse())(
+            self.factory.get("/admin/")
+        )
+        self.assertEqual(seen, ["default"])
+
+    def test_cache_fills_read_the_primary(self):
+        seen = []
+
+        def load():
+            seen.append(self.router.db_for_read(User))
+            return self.patient
+
+        def build():
+            seen.append(self.router.db_for_read(Doctor))
+            return SimpleNamespace(data={"id": 1})
+
+        def view(request):
+            seen.append(self.router.db_for_read(Doctor))
+            cached_user(self.patient.pk, load)
+            request.accepted_renderer = FastJSONRenderer()
+            CachedCatalogMixin().cached_response(request, build)
+            seen.append(self.router.db_for_read(Doctor))
+            return HttpResponse()
+
+        ReplicaRoutingMiddleware(view)(self.factory.get("/accounts/doctors/"))
+        self.assertEqual(seen, ["replica_1", "default", "default", "replica_1"])
+
+    def test_replicas_are_never_migrated(self):
+        self.assertIs(self.router.allow_migrate("replica_1", "accounts"), False)
+        self.assertIsNone(self.router.allow_migrate("default", "accounts"))
+
+    def test_replicas_warn_without_a_shared_cache(self):
+        messages = run_checks(tags=[checks.Tags.caches])
+        self.assertEqual([message.id for message in messages], ["backend.W001"])
+        redis = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://cache"}}
+        with self.settings(CACHES=redis):
+            self.assertEqual(run_checks(tags=[checks.Tags.caches]), [])
+        with self.settings(DATABASE_REPLICAS=[]):
+            self.assertEqual(run_checks(tags=[checks.Tags.caches]), [])
+
+
+# -------------------- CONNECTION POOLING --------------------
+
+class ConnectionModeTests(APITestCase):
+    DATABASE = {"ENGINE": "django.db.backends.postgresql", "NAME": "hope", "OPTIONS": {"sslmode": "require"}}
+
+    def test_persistent_mode_keeps_conn_max_age(self):
+        database = connection_mode(self.DATABASE, "persistent", conn_max_age=600)
+        self.assertEqual(database["CONN_MAX_AGE"], 600)
+        self.assertNotIn("pool", database["OPTIONS"])
+
+    def test_pool_mode(self):
+        database = connection_mode(self.DATABASE, "pool", conn_max_age=600, min_size=1, max_size=4, timeout=5)
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertTrue(database["CONN_HEALTH_CHECKS"])
+        self.assertEqual(database["OPTIONS"]["sslmode"], "require")
+        self.assertEqual(database["OPTIONS"]["pool"]["max_size"], 4)
+        self.assertEqual(database["OPTIONS"]["pool"]["timeout"], 5)
+        self.assertNotIn("pool", self.DATABASE["OPTIONS"])  # the input is not modified
+
+    def test_pgbouncer_mode_avoids_session_state(self):
+        database = connection_mode(self.DATABASE, "pgbouncer", conn_max_age=600)
+        self.assertEqual(database["CONN_MAX_AGE"], 0)
+        self.assertTrue(database["DISABLE_SERVER_SIDE_CURSORS"])
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            connection_mode(self.DATABASE, "bouncy")
+
+    def test_pool_saturation_metrics(self):
+        stats = {"default": {"pool_max": 10, "pool_size": 10, "pool_available": 0, "requests_waiting": 3,
+                             "requests_num": 120, "requests_queued": 7, "requests_wait_ms": 2500}}
+        with patch("accounts.metrics.pool_stats", return_value=stats), override_settings(DEBUG=True):
+            body = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn('django_db_pool_waiting_requests{alias="default"} 3', body)
+        self.assertIn('django_db_pool_idle_connections{alias="default"} 0', body)
+        self.assertIn('django_db_pool_queued_requests_total{alias="default"} 7', body)
+        self.assertIn('django_db_pool_request_errors_total{alias="default"} 0', body)
+        self.assertIn('django_db_pool_wait_seconds_total{alias="default"} 2.500', body)
+
+        with override_settings(DEBUG=True):
+            body = self.client.get(reverse("metrics")).content.decode()
+        self.assertNotIn("django_db_pool_", body)  # no pool configured here
+
+
+# -------------------- PROJECTIONS --------------------
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ProjectionTests(APITestCase):
+    """The projection read path must render exactly what the serializers would."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(email="admin@hope.com", password="admin-pass", is_staff=True)
+        cls.patient = User.objects.create_user(email="zoë@hope.com", password="patient-pass")
+        department = Department.objects.create(name="Cardiología", description="Herz   und \"Kreislauf\"")
+        with_image = Doctor.objects.create(name="Dr. Ünal", department=department, specialization="Heart",
+                                           education="MBBS", experience="5 years", availability="Mon-Fri", rating=4.7)
+        Doctor.objects.filter(pk=with_image.pk).update(profile_image="doctors/unal.jpg", image_variants={
+            "source": "doctors/unal.jpg",
+            "thumbnail": {"width": 96, "height": 96, "webp": "doctors/unal-96.webp", "jpeg": "doctors/unal-96.jpg"},
+        })
+        stale = Doctor.objects.create(name="Dr. Stale", specialization="Skin", education="MD", experience="1 year",
+                                      availability="Sat")
+        Doctor.objects.filter(pk=stale.pk).update(profile_image="doctors/new.jpg",
+                                                  image_variants={"source": "doctors/old.jpg"})
+        base = datetime(2026, 3, 8, 7, 30, 0, 123456, tzinfo=timezone.utc)
+        for number, (doctor, amount, status) in enumerate(
+            [(with_image, Decimal("500.00"), "paid"), (stale, None, "pending"), (with_image, Decimal("0.50"), "cancelled")]
+        ):
+            Appointment.objects.create(doctor=doctor, patient=cls.patient, date_time=base + timedelta(days=number),
+                                       notes="line break ✓" if number else None, status=status, amount=amount,
+                                       payment_id="PAY-1" if status == "paid" else None)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.admin)
+
+    def assertRendersLike(self, response, data):
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, JSONRenderer().render(data))
+
+    def test_lists_match_the_serializers(self):
+        cases = [
+            ("doctor-list", DoctorSerializer, Doctor.objects.order_by("id")),
+            ("department-list", DepartmentSerializer, Department.objects.order_by("id")),
+            ("appointment-list", AppointmentSerializer, Appointment.objects.order_by("-created_at", "-id")),
+            ("user-list", UserSerializer, User.objects.order_by("-date_joined", "-id")),
+        ]
+        for name, serializer_class, queryset in cases:
+            with self.subTest(name):
+                expected = serializer_class(queryset, many=True).data
+                self.assertRendersLike(self.client.get(reverse(name), {"paginate": "false"}), expected)
+
+                response = self.client.get(reverse(name), {"page_size": 2})
+                self.assertRendersLike(response, {**response.json(), "results": expected[:2]})
+
+    def test_retrieve_matches_the_serializers(self):
+        for name, serializer_class, instance in [
+            ("doctor-detail", DoctorSerializer, Doctor.objects.first()),
+            ("department-detail", DepartmentSerializer, Department.objects.first()),
+            ("appointment-detail", AppointmentSerializer, Appointment.objects.first()),
+            ("user-detail", UserSerializer, self.patient),
+        ]:
+            with self.subTest(name):
+                response = self.client.get(reverse(name, args=[instance.pk]))
+                self.assertRendersLike(response, serializer_class(instance).data)
+                self.assertEqual(self.client.get(reverse(name, args=[0])).status_code, 404)
+
+    def test_patients_only_see_their_own_appointments(self):
+        other = User.objects.create_user(email="other@hope.com", password="other-pass")
+        self.client.force_authenticate(other)
+        self.assertEqual(self.client.get(reverse("appointment-list"), {"paginate": "false"}).json(), [])
+        appointment = Appointment.objects.first()
+        self.assertEqual(self.client.get(reverse("appointment-detail", args=[appointment.pk])).status_code, 404)
+
+    def test_fast_renderer_matches_the_stock_renderer(self):
+        data = {
+            "text": "ümlaut     \"quoted\" \\ / \x01 ✓",
+            "when": datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+            "day": date(2026, 1, 2),
+            "amount": Decimal("12.50"),
+            "numbers": [1, -2, 3.25, 4.7, 0.1, None, True, False],
+            "nested": {"empty": {}, "list": []},
+            7: "int key",
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+        self.assertEqual(
+            FastJSONRenderer().render(data, "application/json; indent=2"),
+            JSONRenderer().render(data, "application/json; indent=2"),
+        )
+
+    def test_fields_narrow_the_response_and_the_query(self):
+        url = reverse("appointment-list")
+        with CaptureQueriesContext(connection) as queries:
+            rows = self.client.get(url, {"paginate": "false", "fields": "id,date_time,doctor.name"}).json()
+        self.assertEqual(set(rows[0]), {"id", "date_time", "doctor"})
+        self.assertEqual(set(rows[0]["doctor"]), {"name"})
+        listing = queries[-1]["sql"]
+        self.assertNotIn("education", listing)
+        self.assertNotIn('"accounts_user"', listing)
+
+        with CaptureQueriesContext(connection) as queries:
+            rows = self.client.get(url, {"paginate": "false", "fields": "id,status"}).json()
+        self.assertEqual(sorted(rows[0]), ["id", "status"])
+        self.assertNotIn("JOIN", queries[-1]["sql"])
+
+    def test_fields_keep_cursor_pagination_working(self):
+        first = self.client.get(reverse("appointment-list"), {"fields": "status", "page_size": 2}).json()
+        self.assertEqual(first["results"], [{"status": "cancelled"}, {"status": "pending"}])
+        second = self.client.get(first["next"]).json()
+        self.assertEqual(second["results"], [{"status": "paid"}])
+
+    def test_expand_nests_related_objects(self):
+        doctors = self.client.get(
+            reverse("doctor-list"), {"paginate": "false", "fields": "name,department", "expand": "department"}
+        ).json()
+        self.assertEqual(doctors, [
+            {"name": "Dr. Ünal", "department": DepartmentSerializer(Department.objects.get()).data},
+            {"name": "Dr. Stale", "department": None},
+        ])
+
+        appointment = Appointment.objects.order_by("id").first()
+        response = self.client.get(
+            reverse("appointment-detail", args=[appointment.pk]),
+            {"fields": "id,patient.email,doctor.department.name", "expand": "patient"},
+        )
+        self.assertEqual(response.json(), {
+            "id": appointment.pk,
+            "doctor": {"department": {"name": "Cardiología"}},
+            "patient": {"email": "zoë@hope.com"},
+        })
+
+    def test_unknown_fields_are_rejected(self):
+        url = reverse("appointment-list")
+        for params, key in [
+            ({"fields": "id,secret"}, "fields"),
+            ({"fields": "doctor.password"}, "fields"),
+            ({"fields": "status.value"}, "fields"),
+            ({"expand": "status"}, "expand"),
+        ]:
+            with self.subTest(params):
+                response = self.client.get(url, params)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(key, response.json())
+
+    def test_async_views_honour_fields(self):
+        params = {"paginate": "false", "fields": "id,name,department.name"}
+        expected = self.client.get(reverse("doctor-list"), params).json()
+        with override_settings(ROOT_URLCONF=AsgiUrlconf):
+            response = async_to_sync(self.async_client.get)(reverse("doctor-list"), params)
+            self.assertEqual(response.json(), expected)
+            response = async_to_sync(self.async_client.get)(reverse("doctor-list"), {"fields": "nope"})
+            self.assertEqual(response.status_code, 400)
+
+
+# -------------------- COMPRESSION --------------------
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class CompressionTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        department = Department.objects.create(name="Cardiology")
+        cls.doctors = [
+            Doctor.objects.create(name=f"Doctor {i}", department=department, specialization="Cardiologist",
+                                  education="MBBS", experience="10 years", availability="Mon-Fri")
+            for i in range(20)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_negotiation(self):
+        for header, expected in [
+            ("", None),
+            ("gzip", "gzip"),
+            ("gzip;q=0", None),
+            ("identity", None),
+            ("*", "br" if brotli else "gzip"),
+            ("gzip, deflate, br", "br" if brotli else "gzip"),
+            ("br;q=0.5, gzip;q=0.9", "gzip"),
+            ("br;q=1.0, gzip;q=0.9", "br" if brotli else "gzip"),
+        ]:
+            with self.subTest(header):
+                self.assertEqual(negotiate_encoding(header), expected)
+
+    def test_large_json_is_gzipped(self):
+        url = reverse("doctor-list")
+        plain = self.client.get(url, {"paginate": "false"})
+        self.assertFalse(plain.has_header("Content-Encoding"))
+
+        response = self.client.get(url, {"paginate": "false"}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertLess(len(response.content), len(plain.content))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+        # The weakened ETag still revalidates.
+        self.assertTrue(response["ETag"].startswith("W/"))
+        revalidated = self.client.get(url, {"paginate": "false"}, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.client.get(reverse("doctor-detail", args=[self.doctors[0].pk]), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+    def test_streamed_exports_are_compressed(self):
+        self.client.force_authenticate(User.objects.create_user(email="staff@hope.com", password="x", is_staff=True))
+        plain = b"".join(self.client.get(reverse("user-export"), {"format": "csv"}).streaming_content)
+        for encoding, decompress in [("gzip", gzip.decompress), ("br", brotli and brotli.decompress)]:
+            if decompress:
+                with self.subTest(encoding):
+                    response = self.client.get(reverse("user-export"), {"format": "csv"}, HTTP_ACCEPT_ENCODING=encoding)
+                    self.assertEqual(response["Content-Encoding"], encoding)
+                    self.assertEqual(decompress(b"".join(response.streaming_content)), plain)
+
+    @skipUnless(brotli, "brotli is not installed")
+    def test_brotli_when_preferred(self):
+        url = reverse("doctor-list")
+        plain = self.client.get(url, {"paginate": "false"})
+        response = self.client.get(url, {"paginate": "false"}, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), plain.content)
+
+
+# -------------------- BATCH --------------------
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class BatchTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(email="admin@hope.com", password="admin-pass")
+        cls.patient = User.objects.create_user(email="patient@hope.com", password="patient-pass")
+        cls.department = Department.objects.create(name="Cardiology")
+        cls.doctor = Doctor.objects.create(name="Dr. Batch", department=cls.department, specialization="Heart",
+                                           education="MBBS", experience="3 years", availability="Mon-Fri")
+
+    def setUp(self):
+        cache.clear()
+
+    def batch(self, *requests, user=None):
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {RefreshToken.for_user(user or self.patient).access_token}"}
+        return self.client.post(reverse("batch"), {"requests": list(requests)}, format="json", **headers)
+
+    def test_results_come_back_in_order(self):
+        response = self.batch(
+            {"method": "GET", "path": "/doctors/?paginate=false"},
+            {"method": "POST", "path": "appointments/", "body": {
+                "doctor_id": self.doctor.pk, "date_time": "2030-01-01T09:00:00Z", "notes": "first visit",
+            }},
+            {"path": "/appointments/?paginate=false&fields=notes"},
+            {"path": "/no/such/endpoint/"},
+            {"path": "/admin/stats/"},
+            {"method": "POST", "path": "/batch/", "body": {"requests": []}},
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["responses"]
+        self.assertEqual([result["status"] for result in results], [200, 201, 200, 404, 403, 400])
+        self.assertEqual(results[0]["body"], self.client.get(reverse("doctor-list"), {"paginate": "false"}).json())
+        self.assertEqual(results[1]["body"]["patient"], self.patient.pk)
+        self.assertEqual(results[2]["body"], [{"notes": "first visit"}])
+
+    def test_the_token_is_decoded_once(self):
+        with patch.object(JWTAuthentication, "get_validated_token", wraps=JWTAuthentication().get_validated_token) \
+                as validate:
+            response = self.batch({"path": "/appointments/"}, {"path": "/users/"}, {"path": "/admin/stats/"},
+                                  user=self.admin)
+        self.assertEqual([result["status"] for result in response.json()["responses"]], [200, 200, 200])
+        self.assertEqual(validate.call_count, 1)
+
+    def test_writes_and_reads_keep_their_order(self):
+        appointment = Appointment.objects.create(doctor=self.doctor, patient=self.patient,
+                                                 date_time="2030-01-02T09:00Z")
+        path = f"/appointments/{appointment.pk}/"
+        results = self.batch({"path": path}, {"method": "DELETE", "path": path}, {"path": path}).json()["responses"]
+        self.assertEqual([result["status"] for result in results], [200, 204, 404])
+
+    @override_settings(ROOT_URLCONF=AsgiUrlconf)
+    def test_async_read_views_are_batched_through_their_drf_views(self):
+        with self.settings(ROOT_URLCONF="backend.urls"):
+            doctors = self.client.get(reverse("doctor-list"), {"paginate": "false"}).json()
+        results = self.batch(
+            {"path": "/doctors/?paginate=false"},
+            {"path": "/departments/?paginate=false"},
+            {"path": f"/doctors/{self.doctor.pk}/"},
+            {"path": "/appointments/"},
+            {"path": "/admin/stats/"},
+            user=self.admin,
+        ).json()["responses"]
+        self.assertEqual([result["status"] for result in results], [200, 200, 200, 200, 200])
+        self.assertEqual(results[0]["body"], doctors)
+        self.assertEqual(results[2]["body"]["name"], "Dr. Batch")
+
+    def test_streaming_endpoints_cannot_be_batched(self):
+        result = self.batch({"path": "/appointments/export/?format=csv"}, user=self.admin).json()["responses"][0]
+        self.assertEqual(result["status"], 400)
+
+    def test_validation_and_authentication(self):
+        self.assertEqual(self.batch().status_code, 400)
+        self.assertEqual(self.batch(*[{"path": "/doctors/"}] * 21).status_code, 400)
+        self.assertEqual(self.batch({"method": "TRACE", "path": "/doctors/"}).status_code, 400)
+        response = self.client.post(reverse("batch"), {"requests": [{"path": "/doctors/"}]}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class ConcurrentBatchTests(TransactionTestCase):
+    """Consecutive GETs in a batch run at the same time (outside a transaction, unlike APITestCase)."""
+
+    def test_reads_run_concurrently(self):
+        admin = User.objects.create_superuser(email="admin@hope.com", password="admin-pass")
+        Department.objects.create(name="Cardiology")
+        both_running = threading.Barrier(2, timeout=5)
+
+        def stats_payload():
+            both_running.wait()  # breaks, and fails the item, if the other read is not running too
+            return admin_stats_payload()
+
+        token = RefreshToken.for_user(admin).access_token
+        with patch("accounts.views.admin_stats_payload", stats_payload):
+            response = self.client.post(
+                reverse("batch"),
+                json.dumps({"requests": [{"path": "/admin/stats/"}, {"path": "/admin/stats/"},
+                                         {"path": "/departments/"}]}),
+                content_type="application/json",
+                HTTP_AUTHORIZATION=f"Bearer {token}",
+            )
+        self.assertEqual([result["status"] for result in response.json()["responses"]], [200, 200, 200])
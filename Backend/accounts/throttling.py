@@ -0,0 +1,117 @@
+# accounts/throttling.py
+import hashlib
+import time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+BUCKET_KEY = "throttle:bucket:{}:{}"
+SHED_KEY = "throttle:shed:{}"
+
+
+def parse_rate(rate):
+    """'10/min' -> (capacity 10, refill 10/60 tokens per second); None disables."""
+    if not rate:
+        return None
+    num, period = rate.split("/")
+    capacity = int(num)
+    return capacity, capacity / DURATIONS[period[0]]
+
+
+def record_shed(rate_scope):
+    key = SHED_KEY.format(rate_scope)
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def _shed_scopes():
+    return [scope for scope in api_settings.DEFAULT_THROTTLE_RATES if scope.endswith(("_ip", "_email"))]
+
+
+def shed_counts():
+    """Requests rejected so far, per throttle scope that has a configured rate."""
+    scopes = _shed_scopes()
+    counts = cache.get_many([SHED_KEY.format(scope) for scope in scopes])
+    return {scope: counts.get(SHED_KEY.format(scope), 0) for scope in scopes}
+
+
+async def ashed_counts():
+    scopes = _shed_scopes()
+    counts = await cache.aget_many([SHED_KEY.format(scope) for scope in scopes])
+    return {scope: counts.get(SHED_KEY.format(scope), 0) for scope in scopes}
+
+
+# -------------------- TOKEN BUCKET --------------------
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Token bucket per (scope, client key), stored in the default cache.
+
+    The rate for "<scope>_<kind>" in DEFAULT_THROTTLE_RATES sets both the burst
+    size and the refill speed: "5/min" allows five back-to-back requests and
+    one more every twelve seconds. Checks only touch the cache, so a rejected
+    request costs no hashing and no queries. Concurrent workers may each
+    admit a request from the same last token; the bucket is a load shedder,
+    not an exact quota.
+    """
+    scope = None
+    kind = None
+
+    def get_key(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        self.rate_scope = f"{self.scope}_{self.kind}"
+        limits = parse_rate(api_settings.DEFAULT_THROTTLE_RATES.get(self.rate_scope))
+        key = self.get_key(request)
+        if limits is None or not key:
+            return True
+        capacity, self.refill = limits
+
+        cache_key = BUCKET_KEY.format(self.rate_scope, hashlib.sha1(key.encode()).hexdigest())
+        now = time.time()
+        tokens, updated = cache.get(cache_key) or (capacity, now)
+        tokens = min(capacity, tokens + (now - updated) * self.refill)
+
+        if tokens < 1:
+            self.tokens = tokens
+            record_shed(self.rate_scope)
+            return False
+        cache.set(cache_key, (tokens - 1, now), int(capacity / self.refill) + 1)
+        return True
+
+    def wait(self):
+        return (1 - self.tokens) / self.refill
+
+
+class IPTokenBucketThrottle(TokenBucketThrottle):
+    kind = "ip"
+
+    def get_key(self, request):
+        return self.get_ident(request)
+
+
+class EmailTokenBucketThrottle(TokenBucketThrottle):
+    kind = "email"
+
+    def get_key(self, request):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        return email.strip().lower() if isinstance(email, str) else None
+
+
+_auth_throttles = {}
+
+
+def auth_throttles(scope):
+    """Per-IP and per-email bucket classes for an unauthenticated endpoint."""
+    if scope not in _auth_throttles:
+        _auth_throttles[scope] = [
+            type(f"{base.__name__}[{scope}]", (base,), {"scope": scope})
+            for base in (IPTokenBucketThrottle, EmailTokenBucketThrottle)
+        ]
+    return _auth_throttles[scope]
@@ -1,6 +1,8 @@
 # accounts/urls.py
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import (
 RegisterView,
 LoginView,
@@ -10,6 +12,9 @@ AppointmentViewSet,
 UserViewSet,
 ChangePasswordView,
 admin_stats,
+analytics,
+catalog_search,
+batch,
 AdminLoginView,
 reset_password
 )
@@ -28,10 +33,38 @@ urlpatterns = [
     path("auth/change-password/", ChangePasswordView.as_view(), name="change-password"),
     path("reset-password/", reset_password, name="reset-password"),
 
+    # Catalog search
+    path("search/", catalog_search, name="catalog-search"),
+
     # Admin stats
     path("admin/stats/", admin_stats, name="admin-stats"),
+    path("admin/analytics/", analytics, name="admin-analytics"),
     path("admin-login/", AdminLoginView.as_view(), name="admin-login"),
 
+    # Several API calls in one request (accounts/batch.py)
+    path("batch/", batch, name="batch"),
+
     # Include all router paths
     path("", include(router.urls)),
 ]
+
+# Under ASGI the hot reads are answered by async views (accounts/async_views.py)
+# on the same paths and names, ahead of the routes above; other methods and
+# formats on those paths still reach the DRF views.
+router_views = {pattern.name: pattern.callback for pattern in router.urls}
+async_read_urlpatterns = [
+    path("doctors/", async_views.read_or(async_views.doctor_list, router_views["doctor-list"]), name="doctor-list"),
+    path(
+        "doctors/<int:pk>/",
+        async_views.read_or(async_views.doctor_detail, router_views["doctor-detail"]),
+        name="doctor-detail",
+    ),
+    path(
+        "appointments/",
+        async_views.read_or(async_views.appointment_list, router_views["appointment-list"]),
+        name="appointment-list",
+    ),
+    path("admin/stats/", async_views.read_or(async_views.admin_stats, admin_stats), name="admin-stats"),
+]
+if settings.ASYNC_READ_VIEWS:
+    urlpatterns = async_read_urlpatterns + urlpatterns
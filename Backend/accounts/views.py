@@ -1,15 +1,15 @@
 from rest_framework import viewsets, generics, status
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.decorators import api_view, permission_classes, renderer_classes, throttle_classes, action
 from rest_framework.permissions import AllowAny, IsAuthenticated, IsAdminUser
+from rest_framework.renderers import BrowsableAPIRenderer
 from rest_framework.views import APIView
+from rest_framework.exceptions import APIException
 from django.shortcuts import get_object_or_404
 from django.contrib.auth import get_user_model
-from django.db.models import Count, Sum
-from django.utils.timezone import now
+from django.db import IntegrityError, transaction
 from django.contrib.auth import authenticate
 from django.utils.crypto import get_random_string
-from datetime import timedelta
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from .models import Department, Doctor, Appointment, UserPasswordResetToken
@@ -17,9 +17,23 @@ from .serializers import (
 RegisterSerializer, LoginSerializer, UserSerializer,
 ChangePasswordSerializer,
 DepartmentSerializer, DoctorSerializer, AppointmentSerializer,
-AdminStatsSerializer,
+AdminStatsSerializer, SlotSearchSerializer, ExportFilterSerializer, AnalyticsQuerySerializer,
+CatalogSearchSerializer, BatchSerializer,
 )
 from .permissions import IsStaffOrSuperuser
+from .caching import CachedCatalogMixin
+from .projections import AppointmentProjection, DepartmentProjection, DoctorProjection, ProjectionMixin, UserProjection
+from .availability import open_slots
+from .analytics import time_series
+from .search import search
+from .throttling import auth_throttles
+from .stats import admin_stats_payload
+from .batch import run_batch
+from .renderers import FastJSONRenderer
+from .exports import (
+EXPORT_RENDERERS, APPOINTMENT_COLUMNS, USER_COLUMNS, USER_STATUSES,
+appointment_rows, user_rows, export_response,
+)
 
 User = get_user_model()
 
@@ -28,6 +42,7 @@ User = get_user_model()
 class RegisterView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [AllowAny]
+    throttle_classes = auth_throttles("register")
 
 
     def create(self, request, *args, **kwargs):
@@ -41,6 +56,7 @@ class RegisterView(generics.CreateAPIView):
 class LoginView(generics.GenericAPIView):
     serializer_class = LoginSerializer
     permission_classes = [AllowAny]
+    throttle_classes = auth_throttles("login")
 
     def post(self, request):
         serializer = self.get_serializer(data=request.data, context={"request": request})
@@ -64,7 +80,9 @@ class ChangePasswordView(generics.UpdateAPIView):
 
 
     def get_object(self):
-        return self.request.user
+        # request.user is a cached snapshot (accounts/caching.py); saving it
+        # could write back fields changed elsewhere since, so reload it.
+        return User.objects.get(pk=self.request.user.pk)
 
     def update(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -89,6 +107,7 @@ class ChangePasswordView(generics.UpdateAPIView):
 
 class ForgotPasswordAPIView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = auth_throttles("forgot_password")
 
 
     def post(self, request):
@@ -97,7 +116,7 @@ class ForgotPasswordAPIView(APIView):
             return Response({"detail": "Email is required."}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            user = User.objects.get(email=email)
+            user = User.objects.get_by_email(email)
         except User.DoesNotExist:
             return Response({"detail": "No user found with this email."}, status=400)
 
@@ -110,6 +129,7 @@ class ForgotPasswordAPIView(APIView):
 
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes(auth_throttles("reset_password"))
 def reset_password(request):
     email = request.data.get("email")
     new_password = request.data.get("new_password")
@@ -122,7 +142,7 @@ def reset_password(request):
         return Response({"detail": "Passwords do not match."}, status=400)
 
     try:
-        user = User.objects.get(email=email)
+        user = User.objects.get_by_email(email)
     except User.DoesNotExist:
         return Response({"detail": "User with this email does not exist."}, status=404)
 
@@ -134,16 +154,20 @@ def reset_password(request):
 
 # -------------------- DEPARTMENTS --------------------
 
-class DepartmentViewSet(viewsets.ModelViewSet):
-    queryset = Department.objects.all()
+class DepartmentViewSet(ProjectionMixin, viewsets.ModelViewSet):
+    queryset = Department.objects.all().order_by("id")
+    cursor_ordering = ("id",)
     serializer_class = DepartmentSerializer
+    projection = DepartmentProjection()
     permission_classes = [IsStaffOrSuperuser]
 
 # -------------------- DOCTORS --------------------
 
-class DoctorViewSet(viewsets.ModelViewSet):
-    queryset = Doctor.objects.all()
+class DoctorViewSet(CachedCatalogMixin, ProjectionMixin, viewsets.ModelViewSet):
+    queryset = Doctor.objects.all().order_by("id")
+    cursor_ordering = ("id",)
     serializer_class = DoctorSerializer
+    projection = DoctorProjection()
     permission_classes = [AllowAny]
 
 
@@ -154,23 +178,102 @@ class DoctorViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(department__name__iexact=department_name)
         return queryset
 
+    @action(detail=False, methods=["get"], url_path="slots")
+    def slots(self, request):
+        params = SlotSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        start, end = params.validated_data["start"], params.validated_data["end"]
+
+        doctors = self.get_queryset().only("id", "name")
+        if params.validated_data.get("doctor"):
+            doctors = doctors.filter(id=params.validated_data["doctor"])
+        doctors = list(doctors)
+
+        slots = open_slots([doctor.id for doctor in doctors], start, end)
+        return Response({
+            "start": start,
+            "end": end,
+            "doctors": [
+                {
+                    "doctor_id": doctor.id,
+                    "doctor_name": doctor.name,
+                    "slots": [{"start": slot_start, "end": slot_end} for slot_start, slot_end in slots[doctor.id]],
+                }
+                for doctor in doctors
+            ],
+        })
+
+
+# -------------------- CATALOG SEARCH --------------------
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def catalog_search(request):
+    params = CatalogSearchSerializer(data=request.query_params)
+    params.is_valid(raise_exception=True)
+    hits = search(params.validated_data["q"], params.validated_data.get("type"), params.validated_data["limit"])
+
+    ids = {"doctor": [], "department": []}
+    for kind, object_id in hits:
+        ids[kind].append(object_id)
+    found = {
+        "doctor": {doctor.pk: DoctorSerializer(doctor).data for doctor in Doctor.objects.filter(pk__in=ids["doctor"])}
+        if ids["doctor"] else {},
+        "department": {
+            department.pk: DepartmentSerializer(department).data
+            for department in Department.objects.filter(pk__in=ids["department"])
+        } if ids["department"] else {},
+    }
+    return Response({
+        "results": [
+            {"type": kind, kind: found[kind][object_id]}
+            for kind, object_id in hits
+            if object_id in found[kind]
+        ],
+    })
+
 
 # -------------------- APPOINTMENTS --------------------
 
-class AppointmentViewSet(viewsets.ModelViewSet):
-    queryset = Appointment.objects.all().order_by("-created_at")
+class SlotAlreadyBooked(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "This doctor is already booked at that time."
+    default_code = "slot_already_booked"
+
+
+# payment_status of a cancelled booking whose captured payment is owed back.
+REFUND_PENDING = "REFUND_PENDING"
+
+
+class AppointmentViewSet(ProjectionMixin, viewsets.ModelViewSet):
+    queryset = Appointment.objects.select_related("doctor", "patient").order_by("-created_at", "-id")
     serializer_class = AppointmentSerializer
+    projection = AppointmentProjection()
     permission_classes = [IsAuthenticated]
+    cursor_ordering = ("-created_at", "-id")
 
 
     def get_queryset(self):
         user = self.request.user
+        queryset = super().get_queryset()
         if user.is_staff or user.is_superuser:
-            return Appointment.objects.all()
-        return Appointment.objects.filter(patient=user)
+            return queryset
+        return queryset.filter(patient=user)
 
     def perform_create(self, serializer):
-        serializer.save(patient=self.request.user)
+        try:
+            with transaction.atomic():
+                serializer.save(patient=self.request.user)
+        except IntegrityError:
+            raise SlotAlreadyBooked()
+
+    def perform_update(self, serializer):
+        # Moving date_time (or doctor) onto a booked slot trips the same constraint.
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            raise SlotAlreadyBooked()
 
     @action(detail=False, methods=["post"], url_path="verify_payment")
     def verify_payment(self, request):
@@ -183,77 +286,112 @@ class AppointmentViewSet(viewsets.ModelViewSet):
         if not all([payment_id, doctor_id, date_time]):
             return Response({"error": "Missing required fields"}, status=400)
 
+        # A retried verification of a payment we already recorded.
+        existing = Appointment.objects.filter(patient=user, payment_id=payment_id).first()
+        if existing is not None:
+            return self.recorded_payment(existing)
+
         doctor = get_object_or_404(Doctor, id=doctor_id)
         amount = getattr(doctor, "fee", 500)
+        booking = dict(patient=user, doctor=doctor, date_time=date_time, notes=notes, amount=amount,
+                       payment_id=payment_id)
 
-        appointment = Appointment.objects.create(
-            patient=user,
-            doctor=doctor,
-            date_time=date_time,
-            notes=notes,
-            status="paid",
-            amount=amount,
-            payment_id=payment_id
-        )
+        try:
+            with transaction.atomic():
+                appointment = Appointment.objects.create(status="paid", **booking)
+        except IntegrityError:
+            # Either a concurrent retry recorded this payment first, or the slot is taken.
+            existing = Appointment.objects.filter(patient=user, payment_id=payment_id).first()
+            if existing is not None:
+                return self.recorded_payment(existing)
+            # The client captured the payment before calling us, so it cannot be
+            # undone here: keep it on a cancelled booking for staff to refund.
+            try:
+                with transaction.atomic():
+                    refund = Appointment.objects.create(status="cancelled", payment_status=REFUND_PENDING, **booking)
+            except IntegrityError:
+                refund = Appointment.objects.get(patient=user, payment_id=payment_id)
+            return self.recorded_payment(refund)
         return Response(AppointmentSerializer(appointment).data, status=201)
 
+    @staticmethod
+    def recorded_payment(appointment):
+        """The answer to a verification whose payment is already on `appointment`."""
+        if appointment.status == "cancelled" or appointment.payment_status == REFUND_PENDING:
+            return Response({
+                "error": f"{SlotAlreadyBooked.default_detail} Your payment has been recorded and will be refunded.",
+                "appointment_id": appointment.pk,
+            }, status=409)
+        return Response(AppointmentSerializer(appointment).data, status=200)
+
+    @action(detail=False, methods=["get"], permission_classes=[IsStaffOrSuperuser], renderer_classes=EXPORT_RENDERERS)
+    def export(self, request):
+        filters = ExportFilterSerializer(
+            data=request.query_params, context={"statuses": [value for value, _ in Appointment.STATUS_CHOICES]}
+        )
+        filters.is_valid(raise_exception=True)
+        return export_response(
+            request.accepted_renderer.format, "appointments", APPOINTMENT_COLUMNS,
+            appointment_rows(**filters.validated_data),
+        )
+
 
 # -------------------- ADMIN STATS --------------------
 
 @api_view(["GET"])
 @permission_classes([IsStaffOrSuperuser])
 def admin_stats(request):
-    total_users = User.objects.count()
-    total_doctors = Doctor.objects.count()
-    total_patients = User.objects.filter(is_patient=True).count()
-    total_appointments = Appointment.objects.count()
-
-   
-    thirty_days_ago = now() - timedelta(days=30)
-    revenue_30d = Appointment.objects.filter(status="paid", created_at__gte=thirty_days_ago).aggregate(s=Sum("amount"))["s"] or 0
-
-    appointments_by_department = list(
-        Department.objects.annotate(appts=Count("doctor__appointments")).order_by("-appts")[:6].values("name", "appts")
-    )
-
-    monthly = []
-    start = (now().replace(day=1) - timedelta(days=330)).replace(day=1)
-    current = start
-    for _ in range(12):
-        next_month = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
-        rev = Appointment.objects.filter(status="paid", created_at__gte=current, created_at__lt=next_month).aggregate(s=Sum("amount"))["s"] or 0
-        monthly.append({"month": current.strftime("%b %Y"), "revenue": float(rev)})
-        current = next_month
-
-    recent_appointments = list(
-        Appointment.objects.select_related("doctor", "patient").order_by("-created_at")[:5].values("doctor__name", "patient__email", "date_time", "status", "amount")
-    )
-
-    payload = {
-        "total_users": total_users,
-        "total_doctors": total_doctors,
-        "total_patients": total_patients,
-        "total_appointments": total_appointments,
-        "revenue_30d": revenue_30d,
-        "appointments_by_department": appointments_by_department,
-        "last_12_months_revenue": monthly,
-        "recent_appointments": recent_appointments
-    }
-    serializer = AdminStatsSerializer(payload)
+    serializer = AdminStatsSerializer(admin_stats_payload())
     return Response(serializer.data)
 
 
+# -------------------- ANALYTICS --------------------
+
+@api_view(["GET"])
+@permission_classes([IsStaffOrSuperuser])
+def analytics(request):
+    query = AnalyticsQuerySerializer(data=request.query_params)
+    query.is_valid(raise_exception=True)
+    params = query.validated_data
+    return Response({
+        **params,
+        "series": time_series(params["start"], params["end"], params["granularity"], params["group_by"]),
+    })
+
+
+# -------------------- BATCH --------------------
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@renderer_classes([FastJSONRenderer, BrowsableAPIRenderer])
+def batch(request):
+    payload = BatchSerializer(data=request.data)
+    payload.is_valid(raise_exception=True)
+    return Response({"responses": run_batch(request, payload.validated_data["requests"])})
+
+
 # -------------------- USER MANAGEMENT (ADMIN ONLY) --------------------
 
-class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+class UserViewSet(ProjectionMixin, viewsets.ModelViewSet):
+    queryset = User.objects.all().order_by("-date_joined", "-id")
+    cursor_ordering = ("-date_joined", "-id")
     serializer_class = UserSerializer
+    projection = UserProjection()
     permission_classes = [IsAdminUser]
 
+    @action(detail=False, methods=["get"], renderer_classes=EXPORT_RENDERERS)
+    def export(self, request):
+        filters = ExportFilterSerializer(data=request.query_params, context={"statuses": list(USER_STATUSES)})
+        filters.is_valid(raise_exception=True)
+        return export_response(
+            request.accepted_renderer.format, "users", USER_COLUMNS, user_rows(**filters.validated_data),
+        )
+
 # -------------------- ADMIN LOGIN --------------------
 
 class AdminLoginView(generics.GenericAPIView):
     permission_classes = []
+    throttle_classes = auth_throttles("admin_login")
 
     def post(self, request):
         email = request.data.get("email")
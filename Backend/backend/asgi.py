@@ -3,14 +3,34 @@ ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
-For more information on this file, see
-https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+Serve it with uvicorn, one event loop per worker process:
+
+    uvicorn backend.asgi:application --host 0.0.0.0 --port $PORT \
+        --workers $WEB_CONCURRENCY --proxy-headers --forwarded-allow-ips='*'
+
+Under ASGI the doctor list and detail, appointment list and admin stats GETs
+are answered by async views (accounts/async_views.py) on their usual paths;
+they never hold a thread while they wait on the database or a slow client.
+Every middleware is async-capable, static files included
+(backend/static_files.py), so those requests stay on the event loop;
+everything else runs in Django's sync thread as it would under gunicorn.
 """
 
 import os
+import threading
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+# Same default as wsgi.py: production settings unless DJANGO_SETTINGS_MODULE
+# says otherwise (set it to backend.settings for local development).
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.deployment_settings")
+os.environ.setdefault("ASYNC_READ_VIEWS", "True")
 
 application = get_asgi_application()
+if os.environ.get("RENDER") == "1":
+    from .bootstrap import ensure_render_superuser
+    # uvicorn imports this module inside its event loop, where Django refuses
+    # synchronous queries, so the one-off bootstrap runs on its own thread.
+    bootstrap = threading.Thread(target=ensure_render_superuser)
+    bootstrap.start()
+    bootstrap.join()
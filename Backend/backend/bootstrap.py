@@ -0,0 +1,20 @@
+# backend/bootstrap.py
+
+
+def ensure_render_superuser():
+    """Create the default admin account on first boot on Render (RENDER=1)."""
+    try:
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
+
+        if not User.objects.filter(email="admin@hope.com").exists():
+            User.objects.create_superuser(
+                email="admin@hope.com",
+                first_name="Admin",
+                last_name="User",
+                password="Admin@123"
+            )
+
+            print("Superuser created successfully on Render!")
+    except Exception as e:
+        print("SUPERUSER ERROR:", e)
@@ -0,0 +1,58 @@
+# backend/database.py
+# How Django holds its PostgreSQL connections, chosen with DB_POOL_MODE and
+# applied to every DATABASES entry (primary and replicas) by both settings files:
+#
+#   persistent  One connection per worker thread, kept for CONN_MAX_AGE seconds
+#               (the previous behaviour).
+#   pool        A psycopg_pool pool per process: threads borrow a connection for
+#               each request and return it, so connections are bounded by
+#               DB_POOL_MAX_SIZE per process instead of one per thread. Needs
+#               psycopg 3 (psycopg[pool]); connections are health-checked on
+#               checkout.
+#   pgbouncer   An external transaction-mode pooler: short-lived client
+#               connections, and no server-side cursors, which do not survive
+#               a pooler moving the session between transactions (psycopg 3
+#               already sends no prepared statements by default). Without
+#               them .iterator() still yields rows in chunks, but the whole
+#               result set is fetched into memory first: large exports
+#               (accounts/exports.py) are no longer memory-bounded.
+
+POOL_MODES = ("persistent", "pool", "pgbouncer")
+
+
+def connection_mode(database, mode, conn_max_age=0, min_size=2, max_size=10, timeout=10, max_idle=300,
+                    max_lifetime=3600):
+    """Return a copy of the `database` settings dict configured for `mode`."""
+    if mode not in POOL_MODES:
+        raise ValueError(f"DB_POOL_MODE must be one of {', '.join(POOL_MODES)}, not {mode!r}.")
+    database = {**database, "OPTIONS": {**database.get("OPTIONS", {})}}
+
+    if mode == "persistent":
+        database["CONN_MAX_AGE"] = conn_max_age
+    elif mode == "pool":
+        # Django refuses persistent connections with a pool: the pool keeps them.
+        database["CONN_MAX_AGE"] = 0
+        database["CONN_HEALTH_CHECKS"] = True
+        database["OPTIONS"]["pool"] = {
+            "min_size": min_size,
+            "max_size": max_size,
+            "timeout": timeout,  # seconds a request waits for a free connection
+            "max_idle": max_idle,
+            "max_lifetime": max_lifetime,
+        }
+    else:
+        database["CONN_MAX_AGE"] = 0
+        database["DISABLE_SERVER_SIDE_CURSORS"] = True
+    return database
+
+
+def pool_stats(connections):
+    """{alias: psycopg_pool stats} for every alias running a pool that has been opened."""
+    stats = {}
+    for alias in connections:
+        if not connections.settings[alias].get("OPTIONS", {}).get("pool"):
+            continue
+        pool = connections[alias].pool
+        if pool is not None and not pool.closed:
+            stats[alias] = pool.get_stats()
+    return stats
@@ -0,0 +1,173 @@
+# backend/db_routers.py
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.utils.functional import SimpleLazyObject, empty
+
+# Reads from safe (GET/HEAD/OPTIONS) requests go to a replica in
+# settings.DATABASE_REPLICAS; everything else, and all code running outside a
+# request (management commands, migrations, shell), uses the primary.
+#
+# Read-your-writes: once a request writes, the rest of it reads the primary,
+# and so does every request from the same user for REPLICA_STICKY_SECONDS
+# afterwards, which should cover the replicas' replication lag. That window
+# is kept in the default cache, so it holds across worker processes only if
+# the cache is shared (REDIS_URL); check_sticky_cache() warns when it is not.
+
+PRIMARY = "default"
+STICKY_KEY = "db:primary:{}"
+# Apps read from the primary even in safe requests: a session written at login
+# must be readable on the very next request.
+PRIMARY_APPS = {"sessions"}
+# Cache backends private to one process (or storing nothing at all).
+UNSHARED_CACHES = {"django.core.cache.backends.locmem.LocMemCache", "django.core.cache.backends.dummy.DummyCache"}
+
+routing = ContextVar("db_routing", default=None)
+primary_only = ContextVar("db_primary_only", default=False)
+
+
+class RequestRouting:
+    __slots__ = ("request", "replica", "wrote", "user_checked")
+
+    def __init__(self, request, replica):
+        self.request = request
+        self.replica = replica  # None: this request reads the primary
+        self.wrote = False
+        self.user_checked = False
+
+
+def replicas():
+    return getattr(settings, "DATABASE_REPLICAS", [])
+
+
+def request_user_id(request):
+    """
+    The authenticated user's id if authentication has already run, else None.
+
+    Never evaluates a lazy request.user: that would run the session and user
+    queries from inside the router.
+    """
+    user = request.__dict__.get("user")
+    if user is None or (isinstance(user, SimpleLazyObject) and user._wrapped is empty):
+        return None
+    return user.pk if user.is_authenticated else None
+
+
+@contextmanager
+def primary_reads():
+    """
+    Read from the primary inside the block, even in a safe request.
+
+    For anything that fills a shared cache: a lagging replica read stored under
+    a freshly bumped version key would outlive the replica's lag by the
+    entry's whole timeout.
+    """
+    token = primary_only.set(True)
+    try:
+        yield
+    finally:
+        primary_only.reset(token)
+
+
+def stick_to_primary(user_id):
+    cache.set(STICKY_KEY.format(user_id), True, getattr(settings, "REPLICA_STICKY_SECONDS", 10))
+
+
+def is_sticky(user_id):
+    return cache.get(STICKY_KEY.format(user_id)) is not None
+
+
+def check_sticky_cache(app_configs, **kwargs):
+    """System check: replicas need a shared cache for read-your-writes across workers."""
+    if replicas() and settings.CACHES["default"]["BACKEND"] in UNSHARED_CACHES:
+        return [checks.Warning(
+            "DATABASE_REPLICAS is set but the default cache is not shared between processes.",
+            hint="Set REDIS_URL. Otherwise a user's reads right after a write can reach a replica "
+                 "from another worker and miss that write.",
+            id="backend.W001",
+        )]
+    return []
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = routing.get()
+        if (
+            state is None or state.replica is None or state.wrote or primary_only.get()
+            or model._meta.app_label in PRIMARY_APPS
+        ):
+            return PRIMARY
+        if not state.user_checked:
+            # Authentication (DRF runs it lazily, inside the view) has to happen
+            # before a user's stickiness can be looked up; until then reads,
+            # including authentication's own user lookup, use the replica.
+            user_id = request_user_id(state.request)
+            if user_id is not None:
+                state.user_checked = True
+                if is_sticky(user_id):
+                    state.replica = None
+                    return PRIMARY
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = routing.get()
+        if state is not None:
+            state.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *replicas()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema through replication.
+        return False if db in replicas() else None
+
+
+class ReplicaRoutingMiddleware:
+    """Choose the database a request reads from and make its author sticky to the primary after a write."""
+
+    sync_capable = True
+    async_capable = True
+    safe_methods = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def start(self, request):
+        pool = replicas()
+        replica = random.choice(pool) if pool and request.method in self.safe_methods else None
+        return routing.set(RequestRouting(request, replica))
+
+    def finish(self, request, token):
+        state = routing.get()
+        routing.reset(token)
+        if state.wrote:
+            user_id = request_user_id(request)
+            if user_id is not None:
+                stick_to_primary(user_id)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = self.start(request)
+        try:
+            return self.get_response(request)
+        finally:
+            self.finish(request, token)
+
+    async def __acall__(self, request):
+        token = self.start(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            self.finish(request, token)
@@ -3,6 +3,9 @@ import os
 from .settings import *  # import base settings
 
 import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+from .database import connection_mode
 
 # -------------------- SECURITY OVERRIDES --------------------
 DEBUG = False
@@ -19,6 +22,16 @@ ALLOWED_HOSTS = [
     ] if host
 ] or ["*"]  # if none set, fallback to * (not ideal — set RENDER_EXTERNAL_HOSTNAME)
 
+# Render terminates TLS in one proxy hop, which appends the real client
+# address to X-Forwarded-For; trust exactly that hop for per-IP throttling.
+REST_FRAMEWORK["NUM_PROXIES"] = int(os.environ.get("NUM_PROXIES", 1))
+
+# -------------------- METRICS --------------------
+# No Server-Timing header unless asked for (the base default follows DEBUG).
+# /metrics needs METRICS_TOKEN here: accounts/metrics.py refuses to serve it
+# without one when DEBUG is off.
+SERVER_TIMING_HEADER = os.environ.get("SERVER_TIMING_HEADER", "False") == "True"
+
 # -------------------- CSRF / CORS TRUST --------------------
 if RENDER_HOSTNAME:
     CSRF_TRUSTED_ORIGINS = [
@@ -39,8 +52,8 @@ if "corsheaders.middleware.CorsMiddleware" not in MIDDLEWARE:
     MIDDLEWARE.insert(0, "corsheaders.middleware.CorsMiddleware")
 if "django.middleware.security.SecurityMiddleware" not in MIDDLEWARE:
     MIDDLEWARE.insert(1, "django.middleware.security.SecurityMiddleware")
-if "whitenoise.middleware.WhiteNoiseMiddleware" not in MIDDLEWARE:
-    MIDDLEWARE.insert(2, "whitenoise.middleware.WhiteNoiseMiddleware")
+if "backend.static_files.AsyncWhiteNoiseMiddleware" not in MIDDLEWARE:
+    MIDDLEWARE.insert(2, "backend.static_files.AsyncWhiteNoiseMiddleware")
 
 # -------------------- STATICFILES STORAGE --------------------
 STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
@@ -54,6 +67,26 @@ DATABASES = {
     )
 }
 
+# Comma-separated replica URLs; safe requests read from them (backend/db_routers.py).
+# They need REDIS_URL too: a user's reads stick to the primary for
+# REPLICA_STICKY_SECONDS after a write, and that is recorded in the cache, which
+# every worker must share or the next request may read a stale replica.
+for _number, _url in enumerate(filter(None, os.environ.get("DATABASE_REPLICA_URLS", "").split(",")), 1):
+    DATABASES[f"replica_{_number}"] = dj_database_url.parse(
+        _url.strip(),
+        conn_max_age=int(os.environ.get("DB_CONN_MAX_AGE", 600)),
+        ssl_require=bool(os.environ.get("DB_SSL_REQUIRE", "True") == "True"),
+    )
+    DATABASES[f"replica_{_number}"]["TEST"] = {"MIRROR": "default"}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith("replica_")]
+if DATABASE_REPLICAS and not REDIS_URL:
+    raise ImproperlyConfigured("DATABASE_REPLICA_URLS requires REDIS_URL (a cache shared by all workers).")
+# DB_POOL_MODE (backend/database.py) decides how these connections are held.
+DATABASES = {
+    alias: connection_mode(database, DB_POOL_MODE, int(os.environ.get("DB_CONN_MAX_AGE", 600)), **DB_POOL_OPTIONS)
+    for alias, database in DATABASES.items()
+}
+
 # -------------------- SECURITY PROXY --------------------
 SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
 
@@ -77,5 +110,3 @@ LOGGING = {
 # EMAIL_HOST_USER = os.environ.get("EMAIL_USER", "")
 # EMAIL_HOST_PASSWORD = os.environ.get("EMAIL_PASS", "")
 # DEFAULT_FROM_EMAIL = os.environ.get("DEFAULT_FROM_EMAIL", EMAIL_HOST_USER)
-
-DEFAULT_FILE_STORAGE = "backend.storage_backends.SupabaseStorage"
@@ -1,8 +1,13 @@
 # backend/settings.py
 import os
+from importlib.util import find_spec
 from pathlib import Path
 from datetime import timedelta
 from decouple import config
+from django.conf import global_settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .database import connection_mode
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -33,9 +38,12 @@ INSTALLED_APPS = [
 
 # -------------------- MIDDLEWARE --------------------
 MIDDLEWARE = [
+    "accounts.metrics.MetricsMiddleware",  # outermost, so it times the whole stack
+    "backend.db_routers.ReplicaRoutingMiddleware",
+    "accounts.compression.CompressionMiddleware",  # before anything else that reads or rewrites the body
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
-    "whitenoise.middleware.WhiteNoiseMiddleware",  # works in dev too
+    "backend.static_files.AsyncWhiteNoiseMiddleware",  # WhiteNoise, async-capable for ASGI; works in dev too
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -64,6 +72,11 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "backend.wsgi.application"
 
+# Answer the hot reads with the async views in accounts/async_views.py, on the
+# same paths. backend/asgi.py turns this on; under WSGI every async view would
+# need an event loop of its own.
+ASYNC_READ_VIEWS = config("ASYNC_READ_VIEWS", default=False, cast=bool)
+
 # -------------------- LOCAL DATABASE --------------------
 DATABASES = {
     "default": {
@@ -76,11 +89,59 @@ DATABASES = {
     }
 }
 
+# Read replicas: comma-separated hosts sharing the primary's database name and
+# credentials. Pointing one at the primary's own host (DB_REPLICA_HOSTS=127.0.0.1)
+# exercises the routing locally. Tests mirror them onto the default database.
+for _number, _host in enumerate(filter(None, config("DB_REPLICA_HOSTS", default="").split(",")), 1):
+    DATABASES[f"replica_{_number}"] = {**DATABASES["default"], "HOST": _host.strip(), "TEST": {"MIRROR": "default"}}
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias.startswith("replica_")]
+
+# Connection handling: DB_POOL_MODE is persistent (default), pool or pgbouncer;
+# see backend/database.py.
+DB_POOL_MODE = config("DB_POOL_MODE", default="persistent")
+DB_POOL_OPTIONS = {
+    "min_size": config("DB_POOL_MIN_SIZE", default=2, cast=int),
+    "max_size": config("DB_POOL_MAX_SIZE", default=10, cast=int),
+    "timeout": config("DB_POOL_TIMEOUT", default=10, cast=float),
+    "max_idle": config("DB_POOL_MAX_IDLE", default=300, cast=float),
+    "max_lifetime": config("DB_POOL_MAX_LIFETIME", default=3600, cast=float),
+}
+DATABASES = {
+    alias: connection_mode(database, DB_POOL_MODE, config("DB_CONN_MAX_AGE", default=0, cast=int), **DB_POOL_OPTIONS)
+    for alias, database in DATABASES.items()
+}
+DATABASE_ROUTERS = ["backend.db_routers.ReplicaRouter"]
+# Seconds a user keeps reading the primary after a write (covers replication lag).
+# Recorded in the default cache, so with several workers it needs REDIS_URL
+# (system check backend.W001).
+REPLICA_STICKY_SECONDS = config("REPLICA_STICKY_SECONDS", default=10, cast=int)
+
 # -------------------- AUTH --------------------
 AUTH_USER_MODEL = "accounts.User"
 AUTHENTICATION_BACKENDS = [
-    "accounts.backends.EmailBackend",  # use email login
-    "django.contrib.auth.backends.ModelBackend",  # fallback
+    # Email login only: a second backend would hash every failed password twice.
+    "accounts.backends.EmailBackend",
+]
+
+# Hasher profile for new and upgraded hashes. Every listed hasher, and every
+# one Django lists by default (bcrypt included), can still verify old hashes;
+# whichever comes first is used when rehashing on login.
+PASSWORD_HASHER_PROFILE = config("PASSWORD_HASHER_PROFILE", default="pbkdf2")
+PASSWORD_PBKDF2_ITERATIONS = config("PASSWORD_PBKDF2_ITERATIONS", default=1_000_000, cast=int)
+_PASSWORD_HASHER_PROFILES = {
+    "pbkdf2": "accounts.hashers.TunedPBKDF2PasswordHasher",
+    "argon2": "django.contrib.auth.hashers.Argon2PasswordHasher",  # requires argon2-cffi
+    "scrypt": "django.contrib.auth.hashers.ScryptPasswordHasher",
+}
+if PASSWORD_HASHER_PROFILE == "argon2" and find_spec("argon2") is None:
+    # Otherwise the first login or password change would fail instead.
+    raise ImproperlyConfigured("PASSWORD_HASHER_PROFILE=argon2 requires the argon2-cffi package.")
+PASSWORD_HASHERS = [_PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    hasher for profile, hasher in _PASSWORD_HASHER_PROFILES.items() if profile != PASSWORD_HASHER_PROFILE
+] + [
+    hasher for hasher in global_settings.PASSWORD_HASHERS
+    # TunedPBKDF2PasswordHasher verifies Django's own pbkdf2_sha256 hashes.
+    if hasher not in _PASSWORD_HASHER_PROFILES.values() and hasher != "django.contrib.auth.hashers.PBKDF2PasswordHasher"
 ]
 # -------------------- STATIC & MEDIA --------------------
 STATIC_URL = "/static/"
@@ -101,9 +162,78 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.AllowAny",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedJWTAuthentication",
     ],
+    # Cursor pagination for list endpoints; clients may pass ?page_size= (capped
+    # by API_MAX_PAGE_SIZE) or ?paginate=false for the legacy bare-list shape.
+    "DEFAULT_PAGINATION_CLASS": "accounts.pagination.KeysetPagination",
+    "PAGE_SIZE": config("API_PAGE_SIZE", default=50, cast=int),
+    # Reverse proxies in front of the app. Client IPs (per-IP throttles) are
+    # taken from X-Forwarded-For only this many hops from the right, the ones
+    # our own proxies appended; with 0 it is ignored and REMOTE_ADDR used, so a
+    # client cannot pick its own throttle bucket by sending the header.
+    "NUM_PROXIES": config("NUM_PROXIES", default=0, cast=int),
 }
+API_MAX_PAGE_SIZE = config("API_MAX_PAGE_SIZE", default=200, cast=int)
+
+# Token-bucket limits for the unauthenticated auth endpoints (accounts/throttling.py),
+# per client IP and per submitted email. Override one with e.g.
+# THROTTLE_LOGIN_EMAIL=20/min, or set it to an empty string to disable it.
+_AUTH_THROTTLE_RATES = {
+    "register_ip": "10/hour",
+    "register_email": "3/hour",
+    "login_ip": "30/min",
+    "login_email": "10/min",
+    "admin_login_ip": "10/min",
+    "admin_login_email": "5/min",
+    "forgot_password_ip": "10/hour",
+    "forgot_password_email": "3/hour",
+    "reset_password_ip": "10/hour",
+    "reset_password_email": "5/hour",
+}
+REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"] = {
+    scope: config(f"THROTTLE_{scope.upper()}", default=rate) or None
+    for scope, rate in _AUTH_THROTTLE_RATES.items()
+}
+
+# -------------------- CACHE --------------------
+# Per-process memory cache by default; set REDIS_URL so every worker shares one
+# cache (requires the `redis` package). Without it each worker process keeps its
+# own throttle buckets, so the auth rate limits above apply per worker: with N
+# workers a client gets up to N times the configured rate.
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_URL}}
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+# Seconds a cached doctor catalog response lives; writes invalidate it sooner.
+CATALOG_CACHE_TIMEOUT = config("CATALOG_CACHE_TIMEOUT", default=300, cast=int)
+
+# Seconds a JWT-authenticated user stays cached; any save or delete of the user
+# invalidates it sooner.
+AUTH_USER_CACHE_TIMEOUT = config("AUTH_USER_CACHE_TIMEOUT", default=60, cast=int)
+
+# -------------------- METRICS --------------------
+# accounts/metrics.py serves Prometheus metrics at /metrics; set METRICS_TOKEN
+# to require "Authorization: Bearer <token>" from the scraper. With DEBUG off
+# and no token, /metrics is not served at all.
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+# Send a Server-Timing header (app, db and serializer time) with every response.
+# Off unless DEBUG: it tells any client how long our queries take.
+SERVER_TIMING_HEADER = config("SERVER_TIMING_HEADER", default=DEBUG, cast=bool)
+
+# -------------------- COMPRESSION --------------------
+# accounts/compression.py compresses text responses of at least
+# COMPRESS_MIN_BYTES with brotli (if installed) or gzip, as the client accepts.
+COMPRESS_MIN_BYTES = config("COMPRESS_MIN_BYTES", default=1024, cast=int)
+COMPRESS_BROTLI_QUALITY = config("COMPRESS_BROTLI_QUALITY", default=5, cast=int)
+
+# -------------------- BATCH --------------------
+# POST /accounts/batch/ (accounts/batch.py): at most BATCH_MAX_REQUESTS calls per
+# batch, with up to BATCH_MAX_CONCURRENCY consecutive GETs running at once.
+BATCH_MAX_REQUESTS = config("BATCH_MAX_REQUESTS", default=20, cast=int)
+BATCH_MAX_CONCURRENCY = config("BATCH_MAX_CONCURRENCY", default=4, cast=int)
 
 # -------------------- JWT --------------------
 SIMPLE_JWT = {
@@ -150,7 +280,18 @@ SUPABASE_BUCKET = config("SUPABASE_BUCKET", default="media")
 # https://<project>.supabase.co/storage/v1/object/public/<bucket>/
 SUPABASE_PUBLIC_URL = f"{SUPABASE_URL}/storage/v1/object/public/{SUPABASE_BUCKET}"
 
-DEFAULT_FILE_STORAGE = "backend.storage_backends.SupabaseStorage"
+# Upload tuning: (connect, read) timeout in seconds, retries after the first
+# attempt, base backoff in seconds and keep-alive connections per worker.
+SUPABASE_TIMEOUT = (config("SUPABASE_CONNECT_TIMEOUT", default=5, cast=float), config("SUPABASE_READ_TIMEOUT", default=60, cast=float))
+SUPABASE_MAX_RETRIES = config("SUPABASE_MAX_RETRIES", default=3, cast=int)
+SUPABASE_RETRY_BACKOFF = config("SUPABASE_RETRY_BACKOFF", default=0.5, cast=float)
+SUPABASE_POOL_SIZE = config("SUPABASE_POOL_SIZE", default=10, cast=int)
+
+# Django 5.1+ ignores DEFAULT_FILE_STORAGE; media storage is chosen here.
+STORAGES = {
+    "default": {"BACKEND": "backend.storage_backends.SupabaseStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
 
 
 # settings.py
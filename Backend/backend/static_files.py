@@ -0,0 +1,50 @@
+# backend/static_files.py
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+# Bytes read per thread hop when streaming a static file under ASGI.
+CHUNK_BYTES = 64 * 1024
+
+
+class AsyncWhiteNoiseMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoiseMiddleware that can sit in an async middleware chain.
+
+    WhiteNoise's middleware is sync-only, and one sync-only middleware makes
+    Django run the whole chain below it, views included, in its sync thread
+    under ASGI. Here requests for anything but a static file go straight on to
+    the async chain; static files are found as WhiteNoise finds them and their
+    bodies read in the thread pool, a chunk at a time.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, **kwargs):
+        super().__init__(get_response, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:  # development: looks on disk on every request
+            static_file = await sync_to_async(self.find_file, thread_sensitive=False)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return await self.get_response(request)
+
+        response = self.serve(static_file, request)
+        if response.streaming and getattr(response, "file_to_stream", None) is not None:
+            response.streaming_content = read_chunks(response.file_to_stream)
+        return response
+
+
+async def read_chunks(file):
+    read = sync_to_async(file.read, thread_sensitive=False)
+    while chunk := await read(CHUNK_BYTES):
+        yield chunk
@@ -1,29 +1,136 @@
 # backend/storage_backends.py
 
+import random
+import tempfile
+import threading
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
+from django.core.files import File
 from django.core.files.storage import Storage
 from django.conf import settings
 from django.utils.deconstruct import deconstructible
 
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """One keep-alive session per process, shared by every upload thread."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=getattr(settings, "SUPABASE_POOL_SIZE", 10),
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+
+class SupabaseStorageError(Exception):
+    pass
+
+
 @deconstructible
 class SupabaseStorage(Storage):
-    def _save(self, name, content):
-        file_bytes = content.read()
+    """
+    Django storage for a Supabase bucket.
+
+    Uploads stream the file body straight from disk or the upload buffer over a
+    pooled keep-alive session, with a timeout and bounded retries with
+    exponential backoff on connection errors and retryable status codes.
+    """
 
-        upload_url = f"{settings.SUPABASE_URL}/storage/v1/object/{settings.SUPABASE_BUCKET}/{name}"
+    def _object_url(self, name):
+        return f"{settings.SUPABASE_URL}/storage/v1/object/{settings.SUPABASE_BUCKET}/{name}"
 
-        headers = {
+    def _headers(self, **extra):
+        return {
             "apikey": settings.SUPABASE_SERVICE_ROLE_KEY,
             "Authorization": f"Bearer {settings.SUPABASE_SERVICE_ROLE_KEY}",
-            "Content-Type": "application/octet-stream",
+            **extra,
         }
 
-        res = requests.post(upload_url, data=file_bytes, headers=headers)
+    def _request(self, method, name, rewind=None, **kwargs):
+        attempts = getattr(settings, "SUPABASE_MAX_RETRIES", 3) + 1
+        backoff = getattr(settings, "SUPABASE_RETRY_BACKOFF", 0.5)
+        kwargs.setdefault("timeout", getattr(settings, "SUPABASE_TIMEOUT", (5, 60)))
+
+        for attempt in range(attempts):
+            if rewind:
+                rewind()
+            try:
+                res = get_session().request(method, self._object_url(name), **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                if attempt == attempts - 1:
+                    raise SupabaseStorageError(f"Supabase {method} failed for {name}: {exc}") from exc
+            else:
+                if res.status_code not in RETRY_STATUSES or attempt == attempts - 1:
+                    return res
+                res.close()
+            time.sleep(backoff * (2 ** attempt) * (0.5 + random.random() / 2))
+
+    def _save(self, name, content):
+        content_type = getattr(content, "content_type", None) or "application/octet-stream"
+
+        # Passing the file object itself lets requests send it with a
+        # Content-Length and read it in small blocks instead of all at once.
+        res = self._request(
+            "POST",
+            name,
+            rewind=lambda: content.seek(0),
+            data=content,
+            headers=self._headers(**{"Content-Type": content_type}),
+        )
 
         if res.status_code not in (200, 201):
-            raise Exception(f"Supabase Upload Failed: {res.status_code} - {res.text}")
+            raise SupabaseStorageError(f"Supabase Upload Failed: {res.status_code} - {res.text}")
 
         return name
 
+    def _open(self, name, mode="rb"):
+        res = self._request("GET", name, headers=self._headers(), stream=True)
+        if res.status_code in (400, 404):
+            raise FileNotFoundError(name)
+        if res.status_code != 200:
+            raise SupabaseStorageError(f"Supabase Download Failed: {res.status_code}")
+
+        # Spool to disk past a few MB so large originals never sit in memory.
+        spooled = tempfile.SpooledTemporaryFile(max_size=5 * 1024 * 1024)
+        for block in res.iter_content(64 * 1024):
+            spooled.write(block)
+        spooled.seek(0)
+        return File(spooled, name=name)
+
+    def _head(self, name):
+        res = self._request("HEAD", name, headers=self._headers())
+        if res.status_code in (400, 404):
+            return None
+        if res.status_code != 200:
+            raise SupabaseStorageError(f"Supabase HEAD Failed: {res.status_code}")
+        return res
+
+    def exists(self, name):
+        return self._head(name) is not None
+
+    def size(self, name):
+        res = self._head(name)
+        if res is None:
+            raise FileNotFoundError(name)
+        return int(res.headers.get("Content-Length", 0))
+
+    def delete(self, name):
+        res = self._request("DELETE", name, headers=self._headers())
+        if res.status_code not in (200, 204, 400, 404):
+            raise SupabaseStorageError(f"Supabase Delete Failed: {res.status_code} - {res.text}")
+
     def url(self, name):
         return f"{settings.SUPABASE_PUBLIC_URL}/{name}"
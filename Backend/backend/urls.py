@@ -6,6 +6,8 @@ from django.urls import re_path
 from django.views.static import serve
 from rest_framework_simplejwt.views import TokenRefreshView
 
+from accounts.metrics import metrics_view
+
 
 def backend_home(request):
     return JsonResponse({"message": "Backend is running successfully"})
@@ -15,6 +17,7 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("accounts/", include("accounts.urls")),
     path("accounts/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("metrics", metrics_view, name="metrics"),
     path("", backend_home),
 ]
 
@@ -17,18 +17,5 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.deployment_settings")
 
 application = get_wsgi_application()
 if os.environ.get("RENDER") == "1":
-    try:
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
-
-        if not User.objects.filter(email="admin@hope.com").exists():
-            User.objects.create_superuser(
-                email="admin@hope.com",
-                first_name="Admin",
-                last_name="User",
-                password="Admin@123"
-            )
-
-            print("Superuser created successfully on Render!")
-    except Exception as e:
-        print("SUPERUSER ERROR:", e)
\ No newline at end of file
+    from .bootstrap import ensure_render_superuser
+    ensure_render_superuser()
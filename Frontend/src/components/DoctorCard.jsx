@@ -17,6 +17,7 @@ const DoctorCard = ({ doctor }) => {
     rating,
     patients_count,
     profile_image,
+    profile_image_variants,
     department,
   } = doctor;
 
@@ -36,6 +37,14 @@ const DoctorCard = ({ doctor }) => {
 
   const profileImageUrl = getImageUrl(profile_image);
 
+  // Resized copies from the backend; the avatar is 80px, so thumbnail/card cover 1x-3x screens
+  const variantSrcSet = (format) =>
+    ["thumbnail", "card"]
+      .map((size) => profile_image_variants?.[size])
+      .filter(Boolean)
+      .map((v) => `${v[format]} ${v.width}w`)
+      .join(", ");
+
   // Booking button
   const handleBook = () => {
     const user = JSON.parse(localStorage.getItem("user"));
@@ -59,7 +68,19 @@ const DoctorCard = ({ doctor }) => {
     >
       {/* Top Section */}
       <div className="flex items-center gap-4">
-        {profileImageUrl ? (
+        {profileImageUrl && profile_image_variants ? (
+          <picture>
+            <source type="image/webp" srcSet={variantSrcSet("webp")} sizes="80px" />
+            <img
+              src={profile_image_variants.thumbnail.jpeg}
+              srcSet={variantSrcSet("jpeg")}
+              sizes="80px"
+              alt={name}
+              loading="lazy"
+              className="w-20 h-20 rounded-full object-cover border border-white/30"
+            />
+          </picture>
+        ) : profileImageUrl ? (
           <img
             src={profileImageUrl}
             alt={name}
@@ -119,3 +119,19 @@ export async function adminFetchForm(endpoint, method = "POST", formData) {
 
   return safeJson(res);
 }
+
+// ------------------------------
+// BATCH (several calls, one round trip)
+// ------------------------------
+// `requests` is a list of { method, path, body }, with paths as for apiFetch /
+// adminFetch. Resolves to one { status, body } per request, in the same order;
+// consecutive GETs run concurrently on the server.
+export async function apiBatch(requests, rawToken = null) {
+  const data = await apiFetch("/batch/", "POST", { requests }, rawToken);
+  return data.responses;
+}
+
+export async function adminBatch(requests) {
+  const data = await adminFetch("/batch/", "POST", { requests });
+  return data?.responses;
+}
@@ -28,7 +28,7 @@ const CardiologyPage = () => {
         setError(null);
 
         // Correct backend endpoint
-        const data = await apiFetch(`/doctors/?department=${departmentName}`);
+        const data = await apiFetch(`/doctors/?department=${departmentName}&paginate=false`);
 
         if (data && Array.isArray(data)) {
           setDoctors(data);
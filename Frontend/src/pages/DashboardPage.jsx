@@ -36,7 +36,7 @@ const DashboardPage = () => {
   const fetchAppointments = async (token, userId) => {
     try {
       setLoading(true);
-      const data = await apiFetch(`/appointments/?user=${userId}`, "GET", null, token);
+      const data = await apiFetch(`/appointments/?user=${userId}&paginate=false`, "GET", null, token);
       const list = Array.isArray(data) ? data : data.appointments || [];
       setAppointments(
         list.map((appt) => ({
@@ -17,7 +17,7 @@ const DepartmentsPage = () => {
         setError(null);
 
         // Fetch doctors filtered by department from backend
-        const data = await apiFetch(`/doctors/?department=${department}`);
+        const data = await apiFetch(`/doctors/?department=${department}&paginate=false`);
         if (Array.isArray(data)) {
           setDoctors(data);
         } else {
@@ -26,7 +26,7 @@ const EmergencyPage = () => {
       try {
         setLoading(true);
         setError(null);
-        const data = await apiFetch(`/doctors/?department=${departmentName}`);
+        const data = await apiFetch(`/doctors/?department=${departmentName}&paginate=false`);
         setDoctors(Array.isArray(data) ? data : []);
       } catch (err) {
         console.error("Error fetching doctors:", err);
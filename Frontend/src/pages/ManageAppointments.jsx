@@ -7,9 +7,16 @@ export default function ManageAppointments() {
   const [loading, setLoading] = useState(true);
   const [confirmOpen, setConfirmOpen] = useState(false);
   const [current, setCurrent] = useState(null);
+  const [nextPage, setNextPage] = useState(null);
 
-  const fetchAppointments = async () => {
-    try { setAppointments(await adminFetch("/appointments/")); } 
+  // The list is cursor-paginated; `next` is an absolute URL, so keep only its query string.
+  const fetchAppointments = async (cursorUrl = null) => {
+    const query = cursorUrl ? new URL(cursorUrl).search : "";
+    try {
+      const data = await adminFetch(`/appointments/${query}`);
+      setAppointments(prev => (cursorUrl ? [...prev, ...data.results] : data.results));
+      setNextPage(data.next);
+    }
     catch (err) { console.error(err.message); }
   };
 
@@ -58,6 +65,13 @@ export default function ManageAppointments() {
         </table>
       )}
 
+      {!loading && nextPage && (
+        <button
+          className="mt-4 px-4 py-2 bg-gray-700 rounded hover:bg-gray-600"
+          onClick={() => fetchAppointments(nextPage)}
+        >Load more</button>
+      )}
+
       <ConfirmDialog open={confirmOpen} onClose={() => setConfirmOpen(false)} onConfirm={handleDelete} message={`Are you sure you want to delete this appointment?`} />
     </div>
   );
@@ -14,7 +14,7 @@ export default function ManageDepartments() {
 
   const fetchDepartments = async () => {
     try {
-      const data = await adminFetch("/departments/");
+      const data = await adminFetch("/departments/?paginate=false");
       setDepartments(data);
     } catch (err) {
       console.error(err.message);
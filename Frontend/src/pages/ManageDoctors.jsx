@@ -1,6 +1,6 @@
 // src/pages/ManageDoctors.jsx
 import React, { useState, useEffect } from "react";
-import { adminFetch, adminFetchForm } from "../lib/api";
+import { adminBatch, adminFetch, adminFetchForm } from "../lib/api";
 import Modal from "../components/Modal";
 import ConfirmDialog from "../components/ConfirmDialog";
 
@@ -26,26 +26,31 @@ export default function ManageDoctors() {
 
   const fetchDoctors = async () => {
     try {
-      const data = await adminFetch("/doctors/");
+      const data = await adminFetch("/doctors/?paginate=false");
       setDoctors(data);
     } catch (err) {
       console.error(err.message);
     }
   };
 
-  const fetchDepartments = async () => {
+  // Doctors and departments in one round trip.
+  const fetchAll = async () => {
     try {
-      const data = await adminFetch("/departments/");
-      setDepartments(data);
+      const [doctorsRes, departmentsRes] = await adminBatch([
+        { method: "GET", path: "/doctors/?paginate=false" },
+        { method: "GET", path: "/departments/?paginate=false" },
+      ]);
+      if (doctorsRes.status === 200) setDoctors(doctorsRes.body);
+      else console.error(doctorsRes.body?.detail);
+      if (departmentsRes.status === 200) setDepartments(departmentsRes.body);
+      else console.error(departmentsRes.body?.detail);
     } catch (err) {
       console.error(err.message);
     }
   };
 
   useEffect(() => {
-    Promise.all([fetchDoctors(), fetchDepartments()]).finally(() =>
-      setLoading(false)
-    );
+    fetchAll().finally(() => setLoading(false));
   }, []);
 
   const resetFields = () => {
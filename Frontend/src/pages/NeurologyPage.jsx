@@ -26,7 +26,7 @@ const NeurologyPage = () => {
     const fetchDoctors = async () => {
       try {
         setLoading(true);
-        const data = await apiFetch(`/doctors/?department=${departmentName}`);
+        const data = await apiFetch(`/doctors/?department=${departmentName}&paginate=false`);
         if (Array.isArray(data)) {
           setDoctors(data);
         } else {
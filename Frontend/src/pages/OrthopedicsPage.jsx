@@ -24,7 +24,7 @@ const OrthopedicsPage = () => {
     const fetchDoctors = async () => {
       try {
         setLoading(true);
-        const data = await apiFetch(`/doctors/?department=${departmentName}`);
+        const data = await apiFetch(`/doctors/?department=${departmentName}&paginate=false`);
         setDoctors(Array.isArray(data) ? data : []);
       } catch (err) {
         console.error(err);
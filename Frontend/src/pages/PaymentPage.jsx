@@ -94,7 +94,8 @@ const PaymentPage = () => {
       }, 2000);
     } catch (err) {
       console.error("Error saving appointment:", err.message);
-      toast.error("Payment succeeded but saving appointment failed.");
+      // e.g. the slot was taken meanwhile: the server records the payment for a refund and says so.
+      toast.error(err.message || "Payment succeeded but saving appointment failed.");
     }
   };
 
@@ -25,7 +25,7 @@ const PediatricsPage = () => {
     const fetchDoctors = async () => {
       try {
         setLoading(true);
-        const data = await apiFetch(`/doctors/?department=${departmentName}`);
+        const data = await apiFetch(`/doctors/?department=${departmentName}&paginate=false`);
         setDoctors(Array.isArray(data) ? data : []);
       } catch (err) {
         console.error("Error fetching doctors:", err);